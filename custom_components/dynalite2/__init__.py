@@ -1,13 +1,22 @@
 """Support for the Dynalite networks."""
 from __future__ import annotations
 
+import asyncio
+import time
 from types import MappingProxyType
-from typing import Any
+from typing import Any, Callable
 
 from homeassistant import config_entries
 from homeassistant.components.cover import DEVICE_CLASSES_SCHEMA
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_DEFAULT, CONF_HOST, CONF_NAME, CONF_PORT, CONF_TYPE
+from homeassistant.const import (
+    ATTR_SERVICE,
+    CONF_DEFAULT,
+    CONF_HOST,
+    CONF_NAME,
+    CONF_PORT,
+    CONF_TYPE,
+)
 from homeassistant.core import HomeAssistant, ServiceCall
 from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers import config_validation as cv
@@ -21,39 +30,92 @@ from .const import (
     ACTIVE_OFF,
     ACTIVE_ON,
     ATTR_AREA,
+    ATTR_AREAS,
+    ATTR_BRIDGES,
+    ATTR_BROADCAST,
     ATTR_CHANNEL,
+    ATTR_CHANNELS,
+    ATTR_CONCURRENCY,
+    ATTR_ELAPSED,
     ATTR_HOST,
+    ATTR_INTERVAL,
+    ATTR_REQUESTS,
+    BATCH_CONCURRENCY,
+    BATCH_INTERVAL,
     CONF_ACTIVE,
+    CONF_ADAPTIVE_POLL,
     CONF_AREA,
     CONF_AUTO_DISCOVER,
     CONF_BRIDGES,
+    CONF_BUDGET,
+    CONF_BUS_BUDGET,
+    CONF_CAPTURE_SIZE,
     CONF_CHANNEL,
     CONF_CHANNEL_COVER,
     CONF_CLOSE_PRESET,
+    CONF_CONCURRENCY,
+    CONF_DEADLINE,
     CONF_DEVICE_CLASS,
+    CONF_DIAGNOSTIC_SENSORS,
+    CONF_DIRECTION,
+    CONF_DISCOVERY_WINDOW,
     CONF_DURATION,
+    CONF_ENABLED,
     CONF_FADE,
+    CONF_GROUP_COMMANDS,
+    CONF_HEARTBEAT,
+    CONF_HYDRATION,
     CONF_LEVEL,
+    CONF_LIVENESS,
+    CONF_MAX_BACKOFF,
+    CONF_MAX_INTERVAL,
+    CONF_MIN_INTERVAL,
     CONF_NO_DEFAULT,
+    CONF_OPCODE,
     CONF_OPEN_PRESET,
+    CONF_PACKET_EVENTS,
     CONF_POLL_TIMER,
     CONF_PRESET,
+    CONF_PRESET_SELECT,
+    CONF_RATE_LIMIT,
+    CONF_RETRIES,
     CONF_ROOM_OFF,
     CONF_ROOM_ON,
+    CONF_SAMPLE,
     CONF_STOP_PRESET,
     CONF_TEMPLATE,
     CONF_TILT_TIME,
+    CONF_TIMEOUT,
+    CONF_UPDATE_SIGNALS,
+    DATA_ROUTER,
+    DEFAULT_BUS_BUDGET,
     DEFAULT_CHANNEL_TYPE,
+    DEFAULT_DISCOVERY_WINDOW,
+    DEFAULT_HYDRATION_CONCURRENCY,
+    DEFAULT_HYDRATION_RETRIES,
+    DEFAULT_HYDRATION_TIMEOUT,
+    DEFAULT_LIVENESS_DEADLINE,
+    DEFAULT_LIVENESS_HEARTBEAT,
+    DEFAULT_LIVENESS_MAX_BACKOFF,
     DEFAULT_NAME,
+    DEFAULT_POLL_BUDGET,
+    DEFAULT_POLL_MAX_INTERVAL,
+    DEFAULT_POLL_MIN_INTERVAL,
     DEFAULT_PORT,
     DEFAULT_TEMPLATES,
     DOMAIN,
+    DYNET_MAX_NUMBER,
     LOGGER,
+    PACKET_DIRECTION_IN,
+    PACKET_DIRECTION_OUT,
     PLATFORMS,
+    SERVICE_DUMP_CAPTURE,
     SERVICE_REQUEST_AREA_PRESET,
     SERVICE_REQUEST_CHANNEL_LEVEL,
 )
 from .convert_config import convert_config
+from .routing import BridgeRouter
+from .state_cache import state_cache_store
 
 
 def num_string(value: int | str) -> str:
@@ -64,6 +126,33 @@ def num_string(value: int | str) -> str:
     raise vol.Invalid("Not a string with numbers")
 
 
+dynet_number = vol.All(vol.Coerce(int), vol.Range(min=1, max=DYNET_MAX_NUMBER))
+
+
+def number_list(value: Any) -> list[int]:
+    """Validate a number, a range such as "1-20", or a list of them, and return the numbers.
+
+    The ends of a range are validated before it is expanded, so a range has at
+    most DYNET_MAX_NUMBER numbers.
+    """
+    numbers: dict[int, None] = {}
+    for item in cv.ensure_list(value):
+        if isinstance(item, str) and "-" in item:
+            first, _, last = item.partition("-")
+            try:
+                first_number, last_number = dynet_number(first), dynet_number(last)
+            except vol.Invalid as err:
+                raise vol.Invalid(f"Invalid range {item}") from err
+            if first_number > last_number:
+                raise vol.Invalid(f"Reversed range {item}")
+            numbers.update(dict.fromkeys(range(first_number, last_number + 1)))
+        else:
+            numbers[dynet_number(item)] = None
+    if len(numbers) == 0:
+        raise vol.Invalid("No numbers given")
+    return list(numbers)
+
+
 CHANNEL_DATA_SCHEMA = vol.Schema(
     {
         vol.Optional(CONF_NAME): cv.string,
@@ -107,16 +196,22 @@ TEMPLATE_DATA_SCHEMA = vol.Any(TEMPLATE_ROOM_SCHEMA, TEMPLATE_TIMECOVER_SCHEMA)
 TEMPLATE_SCHEMA = vol.Schema({str: TEMPLATE_DATA_SCHEMA})
 
 
+# The template parameters that an area may not use, by the template of the area
+TEMPLATE_CONFS = frozenset(
+    conf for configs in DEFAULT_TEMPLATES.values() for conf in configs
+)
+FORBIDDEN_TEMPLATE_CONFS = {
+    None: TEMPLATE_CONFS,
+    **{
+        template: TEMPLATE_CONFS - set(configs)
+        for template, configs in DEFAULT_TEMPLATES.items()
+    },
+}
+
+
 def validate_area(config: dict[str, Any]) -> dict[str, Any]:
     """Validate that template parameters are only used if area is using the relevant template."""
-    conf_set = set()
-    for configs in DEFAULT_TEMPLATES.values():
-        for conf in configs:
-            conf_set.add(conf)
-    if config.get(CONF_TEMPLATE):
-        for conf in DEFAULT_TEMPLATES[config[CONF_TEMPLATE]]:
-            conf_set.remove(conf)
-    for conf in conf_set:
+    for conf in FORBIDDEN_TEMPLATE_CONFS[config.get(CONF_TEMPLATE) or None]:
         if config.get(conf):
             raise vol.Invalid(
                 f"{conf} should not be part of area {config[CONF_NAME]} config"
@@ -150,8 +245,153 @@ AREA_DATA_SCHEMA = vol.Schema(
 
 AREA_SCHEMA = vol.Schema({num_string: vol.Any(AREA_DATA_SCHEMA, None)})
 
+# Validators of single values, for the single pass over the area tree
+coerce_float = vol.Coerce(float)
+CHANNEL_VALIDATORS = {
+    CONF_NAME: cv.string,
+    CONF_FADE: coerce_float,
+    CONF_TYPE: vol.In(["light", "switch"]),
+}
+PRESET_VALIDATORS = {
+    CONF_NAME: cv.string,
+    CONF_FADE: coerce_float,
+    CONF_LEVEL: coerce_float,
+}
+AREA_VALIDATORS = {
+    CONF_NAME: cv.string,
+    CONF_TEMPLATE: vol.In(DEFAULT_TEMPLATES),
+    CONF_FADE: coerce_float,
+    CONF_NO_DEFAULT: cv.boolean,
+    CONF_ROOM_ON: num_string,
+    CONF_ROOM_OFF: num_string,
+    CONF_CHANNEL_COVER: num_string,
+    CONF_DEVICE_CLASS: DEVICE_CLASSES_SCHEMA,
+    CONF_OPEN_PRESET: num_string,
+    CONF_CLOSE_PRESET: num_string,
+    CONF_STOP_PRESET: num_string,
+    CONF_DURATION: coerce_float,
+    CONF_TILT_TIME: coerce_float,
+}
+
+
+def validate_values(
+    config: dict[str, Any], validators: dict[str, Callable[[Any], Any]]
+) -> dict[str, Any]:
+    """Validate the values of a dict that only has known keys."""
+    return {conf: validators[conf](value) for conf, value in config.items()}
+
+
+def validate_areas_single_pass(config: dict[Any, Any]) -> dict[str, Any]:
+    """Validate the area tree in one pass, without the schema machinery.
+
+    Raises vol.Invalid, KeyError or TypeError when the config is not valid.
+    """
+    result: dict[str, Any] = {}
+    for area, area_config in config.items():
+        if area_config is None:
+            result[num_string(area)] = None
+            continue
+        channels = area_config.get(CONF_CHANNEL, {})
+        presets = area_config.get(CONF_PRESET, {})
+        if not isinstance(channels, dict) or not isinstance(presets, dict):
+            raise vol.Invalid("expected a dictionary")
+        validated = validate_values(
+            {
+                conf: value
+                for conf, value in area_config.items()
+                if conf not in (CONF_CHANNEL, CONF_PRESET)
+            },
+            AREA_VALIDATORS,
+        )
+        if CONF_NAME not in validated:
+            raise vol.Invalid("area name is missing")
+        if CONF_CHANNEL in area_config:
+            validated[CONF_CHANNEL] = {
+                num_string(channel): {
+                    CONF_TYPE: DEFAULT_CHANNEL_TYPE,
+                    **validate_values(channel_config, CHANNEL_VALIDATORS),
+                }
+                for channel, channel_config in channels.items()
+            }
+        if CONF_PRESET in area_config:
+            validated[CONF_PRESET] = {
+                num_string(preset): None
+                if preset_config is None
+                else validate_values(preset_config, PRESET_VALIDATORS)
+                for preset, preset_config in presets.items()
+            }
+        result[num_string(area)] = validate_area(validated)
+    return result
+
+
+def validate_areas(config: dict[Any, Any]) -> dict[str, Any]:
+    """Validate the areas of a bridge, with the same result as AREA_SCHEMA."""
+    try:
+        return validate_areas_single_pass(config)
+    except (vol.Invalid, KeyError, TypeError, AttributeError):
+        # the schema gives the error message with the path to the invalid value
+        return AREA_SCHEMA(config)
+
+
 PLATFORM_DEFAULTS_SCHEMA = vol.Schema({vol.Optional(CONF_FADE): vol.Coerce(float)})
 
+PACKET_EVENTS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_ENABLED, default=True): cv.boolean,
+        vol.Optional(CONF_DIRECTION, default=[PACKET_DIRECTION_IN]): vol.All(
+            cv.ensure_list, [vol.In([PACKET_DIRECTION_IN, PACKET_DIRECTION_OUT])]
+        ),
+        vol.Optional(CONF_AREA): vol.All(cv.ensure_list, [vol.Coerce(int)]),
+        vol.Optional(CONF_OPCODE): vol.All(cv.ensure_list, [vol.Coerce(int)]),
+        vol.Optional(CONF_RATE_LIMIT, default=0): cv.positive_int,
+        vol.Optional(CONF_SAMPLE, default=1): vol.All(int, vol.Range(min=1)),
+    }
+)
+
+ADAPTIVE_POLL_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_ENABLED, default=True): cv.boolean,
+        vol.Optional(CONF_MIN_INTERVAL, default=DEFAULT_POLL_MIN_INTERVAL): vol.All(
+            vol.Coerce(float), vol.Range(min=1)
+        ),
+        vol.Optional(CONF_MAX_INTERVAL, default=DEFAULT_POLL_MAX_INTERVAL): vol.All(
+            vol.Coerce(float), vol.Range(min=1)
+        ),
+        vol.Optional(CONF_BUDGET, default=DEFAULT_POLL_BUDGET): vol.All(
+            vol.Coerce(float), vol.Range(min=0, min_included=False)
+        ),
+    }
+)
+
+HYDRATION_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_AREA, default=[]): vol.All(
+            cv.ensure_list, [vol.Coerce(int)]
+        ),
+        vol.Optional(
+            CONF_CONCURRENCY, default=DEFAULT_HYDRATION_CONCURRENCY
+        ): vol.All(int, vol.Range(min=1)),
+        vol.Optional(CONF_TIMEOUT, default=DEFAULT_HYDRATION_TIMEOUT): vol.All(
+            vol.Coerce(float), vol.Range(min=0, min_included=False)
+        ),
+        vol.Optional(CONF_RETRIES, default=DEFAULT_HYDRATION_RETRIES): cv.positive_int,
+    }
+)
+
+LIVENESS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_HEARTBEAT, default=DEFAULT_LIVENESS_HEARTBEAT): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+        vol.Optional(CONF_DEADLINE, default=DEFAULT_LIVENESS_DEADLINE): vol.All(
+            vol.Coerce(float), vol.Range(min=0, min_included=False)
+        ),
+        vol.Optional(CONF_MAX_BACKOFF, default=DEFAULT_LIVENESS_MAX_BACKOFF): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+    }
+)
+
 
 BRIDGE_SCHEMA = vol.Schema(
     {
@@ -159,14 +399,29 @@ BRIDGE_SCHEMA = vol.Schema(
         vol.Required(CONF_HOST): cv.string,
         vol.Optional(CONF_PORT, default=DEFAULT_PORT): int,
         vol.Optional(CONF_AUTO_DISCOVER, default=False): vol.Coerce(bool),
+        vol.Optional(CONF_DISCOVERY_WINDOW, default=DEFAULT_DISCOVERY_WINDOW): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
         vol.Optional(CONF_POLL_TIMER, default=1.0): vol.Coerce(float),
-        vol.Optional(CONF_AREA): AREA_SCHEMA,
+        vol.Optional(CONF_AREA): validate_areas,
         vol.Optional(CONF_DEFAULT): PLATFORM_DEFAULTS_SCHEMA,
         vol.Optional(CONF_ACTIVE, default=False): vol.Any(
             ACTIVE_ON, ACTIVE_OFF, ACTIVE_INIT, cv.boolean
         ),
         vol.Optional(CONF_PRESET): PRESET_SCHEMA,
         vol.Optional(CONF_TEMPLATE): TEMPLATE_SCHEMA,
+        vol.Optional(CONF_UPDATE_SIGNALS, default=False): cv.boolean,
+        vol.Optional(CONF_PACKET_EVENTS): PACKET_EVENTS_SCHEMA,
+        vol.Optional(CONF_CAPTURE_SIZE, default=0): cv.positive_int,
+        vol.Optional(CONF_BUS_BUDGET, default=DEFAULT_BUS_BUDGET): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+        vol.Optional(CONF_GROUP_COMMANDS, default=False): cv.boolean,
+        vol.Optional(CONF_PRESET_SELECT, default=False): cv.boolean,
+        vol.Optional(CONF_ADAPTIVE_POLL): ADAPTIVE_POLL_SCHEMA,
+        vol.Optional(CONF_HYDRATION): HYDRATION_SCHEMA,
+        vol.Optional(CONF_LIVENESS): LIVENESS_SCHEMA,
+        vol.Optional(CONF_DIAGNOSTIC_SENSORS, default=False): cv.boolean,
     }
 )
 
@@ -189,6 +444,7 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
         conf = {}
 
     hass.data[DOMAIN] = {}
+    hass.data[DATA_ROUTER] = router = BridgeRouter()
 
     # User has configured bridges
     if CONF_BRIDGES not in conf:
@@ -211,44 +467,83 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     async def dynalite_service(service_call: ServiceCall):
         data = service_call.data
         host = data.get(ATTR_HOST, "")
-        bridges = []
-        for cur_bridge in hass.data[DOMAIN].values():
-            if not host or cur_bridge.host == host:
-                bridges.append(cur_bridge)
-        LOGGER.debug("Selected bridged for service call: %s", bridges)
         if service_call.service == SERVICE_REQUEST_AREA_PRESET:
             bridge_attr = "request_area_preset"
+            channels = [data.get(ATTR_CHANNEL)]
         elif service_call.service == SERVICE_REQUEST_CHANNEL_LEVEL:
             bridge_attr = "request_channel_level"
-        for bridge in bridges:
-            getattr(bridge.dynalite_devices, bridge_attr)(
-                data[ATTR_AREA], data.get(ATTR_CHANNEL)
-            )
+            channels = data[ATTR_CHANNEL]
+        bridges: dict[DynaliteBridge, None] = {}
+        requests = []
+        for area in data[ATTR_AREA]:
+            # without a host, only the bridges that own the area get the query
+            if host:
+                area_bridges = router.bridges_for_host(host)
+            elif data[ATTR_BROADCAST]:
+                area_bridges = router.bridges
+            else:
+                area_bridges = router.bridges_for_area(area)
+            for bridge in area_bridges:
+                bridges[bridge] = None
+                request = getattr(bridge.dynalite_devices, bridge_attr)
+                requests.extend((request, area, channel) for channel in channels)
+        LOGGER.debug("Selected bridged for service call: %s", list(bridges))
+        # pace the queries so other commands are not stuck behind them on the bus
+        start_time = time.monotonic()
+        concurrency = data[ATTR_CONCURRENCY]
+        for start in range(0, len(requests), concurrency):
+            if start:
+                await asyncio.sleep(data[ATTR_INTERVAL])
+            for request, area, channel in requests[start : start + concurrency]:
+                request(area, channel)
+        hass.bus.async_fire(
+            "dynalite_requests_completed",
+            {
+                ATTR_SERVICE: service_call.service,
+                ATTR_BRIDGES: len(bridges),
+                ATTR_AREAS: len(data[ATTR_AREA]),
+                ATTR_CHANNELS: len([channel for channel in channels if channel]),
+                ATTR_REQUESTS: len(requests),
+                ATTR_ELAPSED: time.monotonic() - start_time,
+            },
+        )
+
+    batch_schema = {
+        vol.Optional(ATTR_HOST): cv.string,
+        vol.Required(ATTR_AREA): number_list,
+        vol.Optional(ATTR_BROADCAST, default=False): cv.boolean,
+        vol.Optional(ATTR_CONCURRENCY, default=BATCH_CONCURRENCY): vol.All(
+            vol.Coerce(int), vol.Range(min=1)
+        ),
+        vol.Optional(ATTR_INTERVAL, default=BATCH_INTERVAL): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+    }
 
     hass.services.async_register(
         DOMAIN,
         SERVICE_REQUEST_AREA_PRESET,
         dynalite_service,
-        vol.Schema(
-            {
-                vol.Optional(ATTR_HOST): cv.string,
-                vol.Required(ATTR_AREA): int,
-                vol.Optional(ATTR_CHANNEL): int,
-            }
-        ),
+        vol.Schema({**batch_schema, vol.Optional(ATTR_CHANNEL): int}),
     )
 
     hass.services.async_register(
         DOMAIN,
         SERVICE_REQUEST_CHANNEL_LEVEL,
         dynalite_service,
-        vol.Schema(
-            {
-                vol.Optional(ATTR_HOST): cv.string,
-                vol.Required(ATTR_AREA): int,
-                vol.Required(ATTR_CHANNEL): int,
-            }
-        ),
+        vol.Schema({**batch_schema, vol.Required(ATTR_CHANNEL): number_list}),
+    )
+
+    async def dump_capture_service(service_call: ServiceCall):
+        host = service_call.data.get(ATTR_HOST, "")
+        for bridge in router.bridges_for_host(host) if host else router.bridges:
+            await bridge.async_dump_capture()
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_DUMP_CAPTURE,
+        dump_capture_service,
+        vol.Schema({vol.Optional(ATTR_HOST): cv.string}),
     )
 
     return True
@@ -258,7 +553,8 @@ async def async_entry_changed(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Reload entry since the data has changed."""
     LOGGER.debug("Reconfiguring entry data=%s, options=%s", entry.data, entry.options)
     bridge = hass.data[DOMAIN][entry.entry_id]
-    bridge.reload_config(entry.data, entry.options)
+    if bridge.reload_config(entry.data, entry.options):
+        await hass.config_entries.async_reload(entry.entry_id)
     LOGGER.debug("Reconfiguring entry finished %s", entry.data)
 
 
@@ -275,6 +571,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.data[DOMAIN][entry.entry_id] = None
         raise ConfigEntryNotReady
 
+    hass.data[DATA_ROUTER].add_bridge(bridge)
     hass.config_entries.async_setup_platforms(entry, PLATFORMS)
 
     return True
@@ -285,10 +582,19 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     LOGGER.debug("Unloading entry %s", entry.data)
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        bridge = hass.data[DOMAIN].pop(entry.entry_id)
+        hass.data[DATA_ROUTER].remove_bridge(bridge)
+        await bridge.async_reset()
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the saved state of the bridge of a removed entry."""
+    await state_cache_store(
+        hass, entry.data[CONF_HOST], entry.data.get(CONF_PORT, DEFAULT_PORT)
+    ).async_remove()
+
+
 async def async_migrate_entry(hass, config_entry: ConfigEntry):
     """Migrate old entry."""
     LOGGER.debug("Migrating from version %s", config_entry.version)
@@ -0,0 +1,72 @@
+"""The presets of an area as the options of a single device."""
+from __future__ import annotations
+
+from dynalite_devices_lib.dynalite_devices import DynaliteDevices
+from dynalite_devices_lib.switch import DynalitePresetSwitchDevice
+
+
+class AreaPresetsDevice:
+    """All the presets of an area, in place of a switch device per preset.
+
+    It has the properties of the library devices that the entities use, so it
+    is added to the select platform like them.
+    """
+
+    category = "select"
+    hidden = False
+
+    def __init__(self, area: int, dynalite_devices: DynaliteDevices) -> None:
+        """Initialize the device for an area."""
+        self.area = area
+        self._dynalite_devices = dynalite_devices
+        # The preset switch devices of the library, by preset and by option
+        self._presets: dict[int, DynalitePresetSwitchDevice] = {}
+        self._options: dict[str, int] = {}
+        self.preset: int | None = None
+
+    @property
+    def name(self) -> str:
+        """Return the name of the area."""
+        return f"{self._dynalite_devices.get_area_name(self.area)} Preset"
+
+    @property
+    def unique_id(self) -> str:
+        """Return an ID in the format of the library IDs of the area."""
+        return f"dynalite_area_{self.area}_presets"
+
+    @property
+    def available(self) -> bool:
+        """Return if any preset of the area is available."""
+        return any(device.available for device in self._presets.values())
+
+    @property
+    def options(self) -> list[str]:
+        """Return the names of the presets."""
+        return list(self._options)
+
+    @property
+    def current_option(self) -> str | None:
+        """Return the name of the selected preset, if it is known."""
+        for option, preset in self._options.items():
+            if preset == self.preset:
+                return option
+        return None
+
+    def add_preset(self, preset: int, device: DynalitePresetSwitchDevice) -> None:
+        """Add a preset, named without the name of the area."""
+        area_name = self._dynalite_devices.get_area_name(self.area)
+        option = device.name.removeprefix(f"{area_name} ")
+        if option in self._options:
+            option = f"{option} ({preset})"
+        self._presets[preset] = device
+        self._options[option] = preset
+
+    def update_preset(self) -> None:
+        """Take the preset from the preset switch that is on, as after a restore."""
+        for preset, device in self._presets.items():
+            if device.is_on:
+                self.preset = preset
+
+    async def async_select(self, option: str) -> None:
+        """Select the preset of an option."""
+        await self._presets[self._options[option]].async_turn_on()
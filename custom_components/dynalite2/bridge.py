@@ -1,9 +1,15 @@
 """Code to handle a Dynalite bridge."""
 from __future__ import annotations
 
+import asyncio
+from datetime import timedelta
+import math
+import time
 from types import MappingProxyType
-from typing import Any, Callable
+from typing import TYPE_CHECKING, Any, Callable
 
+from dynalite_devices_lib import const as dyn_const
+from dynalite_devices_lib.event import DynetEvent
 from dynalite_devices_lib.dynalite_devices import (
     CONF_AREA as dyn_CONF_AREA,
     CONF_PRESET as dyn_CONF_PRESET,
@@ -13,12 +19,67 @@ from dynalite_devices_lib.dynalite_devices import (
     DynaliteDevices,
     DynaliteNotification,
 )
+from dynalite_devices_lib.cover import DynaliteTimeCoverDevice
+from dynalite_devices_lib.switch import DynalitePresetSwitchDevice
 from homeassistant.const import CONF_HOST
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
 
-from .const import ATTR_AREA, ATTR_HOST, ATTR_PACKET, ATTR_PRESET, LOGGER, PLATFORMS
+from .area_presets import AreaPresetsDevice
+from .capture import DIRECTION_IN, DIRECTION_OUT, PacketCapture, write_capture_file
+from .const import (
+    ATTR_ANSWERED,
+    ATTR_AREA,
+    ATTR_COMPLETE,
+    ATTR_DIRECTION,
+    ATTR_ELAPSED,
+    ATTR_FAILED,
+    ATTR_HOST,
+    ATTR_PACKET,
+    ATTR_PRESET,
+    ATTR_RETRIED,
+    ATTR_TOTAL,
+    AVAILABILITY_CHUNK_SIZE,
+    AVAILABILITY_MAX_ITERATIONS,
+    CONF_ADAPTIVE_POLL,
+    CONF_BUS_BUDGET,
+    CONF_CAPTURE_SIZE,
+    CONF_DIAGNOSTIC_SENSORS,
+    CONF_DISCOVERY_WINDOW,
+    CONF_GROUP_COMMANDS,
+    CONF_HYDRATION,
+    CONF_LIVENESS,
+    CONF_PACKET_EVENTS,
+    CONF_PRESET_SELECT,
+    CONF_UPDATE_SIGNALS,
+    DEFAULT_BUS_BUDGET,
+    DEFAULT_DISCOVERY_WINDOW,
+    DEFAULT_PORT,
+    DOMAIN,
+    LOGGER,
+    PACKET_DIRECTION_IN,
+    PACKET_DIRECTION_OUT,
+    PENDING_DEVICES_MAX,
+    PLATFORMS,
+    POLL_TICK,
+    SYNC_LOGICAL,
+)
+from .config_diff import ConfigDiff
 from .convert_config import convert_config
+from .counters import BridgeCounters
+from .grouping import AreaLevelGrouper, area_level_packet
+from .hydration import StartupHydrator, area_of_unique_id, area_queries
+from .liveness import ConnectionMonitor
+from .packet_events import PacketEventFilter
+from .pending import PendingDevices
+from .poller import OPCODE_REQUEST_PRESET, AdaptivePoller
+from .scheduler import LANE_INTERACTIVE, SCHEDULED_COMMANDS, CommandScheduler
+from .state_cache import StateCache
+
+if TYPE_CHECKING:
+    from .routing import BridgeRouter
 
 
 class DynaliteBridge:
@@ -28,36 +89,533 @@ class DynaliteBridge:
         """Initialize the system based on host parameter."""
         self.hass = hass
         self.async_add_devices: dict[str, Callable] = {}
-        self.waiting_devices: dict[str, list[str]] = {}
         self.host = config[CONF_HOST]
+        self.send_update_signals = False
+        self.group_commands = False
+        self.preset_select = False
+        self.diagnostic_sensors = False
+        self.counters = BridgeCounters(time.monotonic())
+        self.autodiscover = False
+        self.discovery_window = DEFAULT_DISCOVERY_WINDOW
+        # Devices that wait for the setup of their platform
+        self.pending_devices = PendingDevices(PENDING_DEVICES_MAX)
+        # Devices discovered on the bus that are added when the window closes
+        self._discovered_devices: list[DynaliteBaseDevice] = []
+        self._discovery_timer: CALLBACK_TYPE | None = None
+        # Select devices that replace the preset switches, by area
+        self._area_presets: dict[int, AreaPresetsDevice] = {}
+        self.packet_events = PacketEventFilter()
+        self.capture: PacketCapture | None = None
+        self.scheduler = CommandScheduler(hass.loop)
+        # Cover devices, their areas are polled more often while they move
+        self._moving_cover_areas: set[int] = set()
+        self.poller: AdaptivePoller | None = None
+        self._poll_timer: CALLBACK_TYPE | None = None
+        self.hydrator: StartupHydrator | None = None
+        self._hydration_task: asyncio.Task | None = None
+        # Area of the heartbeat query that was not written yet
+        self._heartbeat_area: int | None = None
+        self._heartbeat_count = 0
+        self.monitor = ConnectionMonitor(
+            hass.loop, {}, self._send_heartbeat, self._close_dead_connection
+        )
+        self.apply_options(config)
+        # The converted config that was last applied, to find what a reload changes
+        self._config = config
+        # Areas for the routing of service calls, set by the router when added
+        self.router: BridgeRouter | None = None
+        self._configured_areas = self._areas_of_config(config)
+        self._discovered_areas: set[int] = set()
+        # State write callbacks of the entities, by unique_id
+        self._entity_updates: dict[str, Callable[[], None]] = {}
+        # Callbacks of the entities for a reloaded config, by unique_id
+        self._entity_reconfigures: dict[str, Callable[[], None]] = {}
+        # Latest-value mailbox for device updates, flushed once per loop iteration
+        self._pending_updates: dict[str, DynaliteBaseDevice] = {}
+        self._pending_wide_update = False
+        self._flush_scheduled = False
+        self._availability_task: asyncio.Task | None = None
+        self.availability_fanout_time = 0.0
         # Configure the dynalite devices
         self.dynalite_devices = DynaliteDevices(
             new_device_func=self.add_devices_when_registered,
             update_device_func=self.update_device,
             notification_func=self.handle_notification,
         )
-        self.dynalite_devices.configure(config)
+        self._capture_sent_packets()
+        self._space_reconnects()
+        self._schedule_commands()
+        self._pace_library()
+        # the startup queries of the library are sent by the hydration instead
+        self._active = config.get(dyn_const.CONF_ACTIVE, dyn_const.ACTIVE_INIT)
+        self.dynalite_devices.configure(
+            {**config, dyn_const.CONF_ACTIVE: dyn_const.ACTIVE_OFF}
+        )
+        self.dynalite_devices._active = self._active  # pylint: disable=protected-access
+        self.state_cache = StateCache(
+            hass,
+            self.host,
+            config.get(dyn_const.CONF_PORT, DEFAULT_PORT),
+            self.dynalite_devices,
+        )
 
     async def async_setup(self) -> bool:
         """Set up a Dynalite bridge."""
         # Configure the dynalite devices
         LOGGER.debug("Setting up bridge - host %s", self.host)
-        return await self.dynalite_devices.async_setup()
+        # entities start from the last known state until the bus reports
+        await self.state_cache.async_restore()
+        for area_presets in self._area_presets.values():
+            area_presets.update_preset()
+        if not await self.dynalite_devices.async_setup():
+            return False
+        self._update_poll_timer()
+        self.monitor.start()
+        if self._active != dyn_const.ACTIVE_OFF:
+            self.hydrator = StartupHydrator(
+                self._hydration_config, self._send_query, self._hydration_progress
+            )
+            # not a task of hass, setup and tests should not wait for the bus
+            self._hydration_task = self.hass.loop.create_task(self._async_hydrate())
+        return True
 
     def reload_config(
         self, config: MappingProxyType[str, Any], options: MappingProxyType[str, Any]
-    ) -> None:
-        """Reconfigure a bridge when config changes."""
+    ) -> bool:
+        """Reconfigure a bridge when config changes, applying only what changed.
+
+        Return True if the entry has to be reloaded, when the host or port changed
+        or the presets change between switches and selects.
+        """
         LOGGER.debug(
             "Reloading bridge - host %s, config %s options %s",
             self.host,
             config,
             options,
         )
-        self.dynalite_devices.configure(convert_config(config, options))
+        start_time = time.monotonic()
+        converted_config = convert_config(config, options)
+        diff = ConfigDiff(self._config, converted_config)
+        self._config = converted_config
+        if diff.connection_changed:
+            LOGGER.info("Connection of bridge %s changed, reloading", self.host)
+            return True
+        if CONF_PRESET_SELECT in diff.bridge_options_changed:
+            LOGGER.info("Preset entities of bridge %s changed, reloading", self.host)
+            return True
+        if CONF_DIAGNOSTIC_SENSORS in diff.bridge_options_changed:
+            LOGGER.info("Sensors of bridge %s changed, reloading", self.host)
+            return True
+        self.apply_options(converted_config)
+        self._update_poll_timer()
+        self._pace_library()
+        self._configured_areas = self._areas_of_config(converted_config)
+        if self.router:
+            self.router.update_bridge(self)
+        if diff.global_changed:
+            # global settings affect every area, so the library has to redo all of them
+            self.dynalite_devices.configure(converted_config)
+            unique_ids = list(self._entity_updates)
+        else:
+            self._configure_areas(converted_config, diff.areas_to_configure)
+            unique_ids = [
+                unique_id
+                for unique_id in self._entity_updates
+                if unique_id.startswith(
+                    tuple(f"dynalite_area_{area}_" for area in diff.areas_changed)
+                )
+            ]
+        for unique_id in unique_ids:
+            self._entity_reconfigures.get(
+                unique_id, self._entity_updates[unique_id]
+            )()
+        LOGGER.info(
+            "Reconfigured bridge %s in %.3f seconds - %s",
+            self.host,
+            time.monotonic() - start_time,
+            diff.summary(),
+        )
+        return False
+
+    @property
+    def areas(self) -> set[int]:
+        """Return the areas that are configured or were seen on the bus."""
+        return self._configured_areas | self._discovered_areas
+
+    @staticmethod
+    def _areas_of_config(config: dict[str, Any]) -> set[int]:
+        """Return the areas of a converted config."""
+        return {int(area) for area in config.get(dyn_const.CONF_AREA, {})}
+
+    @callback
+    def _discover_area(self, area: int) -> None:
+        """Remember an area that was seen on the bus and route to it."""
+        if area in self._discovered_areas or area in self._configured_areas:
+            return
+        self._discovered_areas.add(area)
+        if self.router:
+            self.router.add_area(self, area)
+
+    def _configure_areas(self, config: dict[str, Any], areas: set[Any]) -> None:
+        """Configure only some areas in the library and query just those."""
+        if not areas:
+            return
+        areas_config = config.get(dyn_const.CONF_AREA, {})
+        # The library keeps the areas that are missing from a new config, but it
+        # queries every area it knows, so queries are disabled and sent here
+        self.dynalite_devices.configure(
+            {
+                **config,
+                dyn_const.CONF_AREA: {area: areas_config[area] for area in areas},
+                dyn_const.CONF_ACTIVE: dyn_const.ACTIVE_OFF,
+            }
+        )
+        active = config.get(dyn_const.CONF_ACTIVE, dyn_const.ACTIVE_INIT)
+        self.dynalite_devices._active = active  # pylint: disable=protected-access
+        if active == dyn_const.ACTIVE_OFF:
+            return
+        for area in areas:
+            self.dynalite_devices.request_area_preset(int(area), None)
+            for channel in areas_config[area].get(dyn_const.CONF_CHANNEL, {}):
+                self.dynalite_devices.request_channel_level(int(area), int(channel))
+
+    def apply_options(self, config: dict[str, Any]) -> None:
+        """Apply the options that are handled by the bridge and not the library."""
+        self.send_update_signals = config.get(CONF_UPDATE_SIGNALS, False)
+        self.group_commands = config.get(CONF_GROUP_COMMANDS, False)
+        self.preset_select = config.get(CONF_PRESET_SELECT, False)
+        self.diagnostic_sensors = config.get(CONF_DIAGNOSTIC_SENSORS, False)
+        self.autodiscover = config.get(dyn_const.CONF_AUTO_DISCOVER, False)
+        self.discovery_window = config.get(
+            CONF_DISCOVERY_WINDOW, DEFAULT_DISCOVERY_WINDOW
+        )
+        self._hydration_config = config.get(CONF_HYDRATION, {})
+        self.monitor.configure(config.get(CONF_LIVENESS, {}))
+        self.packet_events.configure(config.get(CONF_PACKET_EVENTS))
+        self.scheduler.budget = config.get(CONF_BUS_BUDGET, DEFAULT_BUS_BUDGET)
+        poll_config = config.get(CONF_ADAPTIVE_POLL)
+        if poll_config is None:
+            self.poller = None
+        elif self.poller is None:
+            self.poller = AdaptivePoller(
+                poll_config, lambda: self.areas, self._poll_area, self._cover_moving
+            )
+        else:
+            self.poller.configure(poll_config)
+        capture_size = config.get(CONF_CAPTURE_SIZE, 0)
+        if not capture_size:
+            self.capture = None
+        elif self.capture is None or self.capture.size != capture_size:
+            self.capture = PacketCapture(capture_size)
+
+    async def async_reset(self) -> None:
+        """Disconnect from the gateway and stop the timers of the library."""
+        if self._availability_task:
+            self._availability_task.cancel()
+        if self._hydration_task:
+            self._hydration_task.cancel()
+        if self._poll_timer:
+            self._poll_timer()
+            self._poll_timer = None
+        if self._discovery_timer:
+            self._discovery_timer()
+            self._discovery_timer = None
+        self.monitor.stop()
+        self.scheduler.stop()
+        reset = self.hass.async_create_task(self.dynalite_devices.async_reset())
+        # the library waits for its reader to see the end of the connection
+        dynalite = self.dynalite_devices._dynalite  # pylint: disable=protected-access
+        writer = dynalite._writer  # pylint: disable=protected-access
+        if writer:
+            writer.close()
+        await reset
+
+    def _capture_sent_packets(self) -> None:
+        """Hook the library writer so packets that are sent can be captured."""
+        # The library has no callback for outgoing packets
+        dynalite = self.dynalite_devices._dynalite  # pylint: disable=protected-access
+        library_write = dynalite.write
+
+        def write(new_packet: Any = None) -> None:
+            if new_packet is not None:
+                self.counters.packets_out += 1
+                self.counters.bytes_out += len(new_packet.msg)
+            if new_packet is not None and self.capture is not None:
+                self.capture.record(DIRECTION_OUT, new_packet.msg)
+            if new_packet is not None and self.poller is not None:
+                self.poller.handle_sent(new_packet.msg, time.monotonic())
+            if new_packet is not None and self._heartbeat_area is not None:
+                self._heartbeat_written(new_packet.msg)
+            if new_packet is not None and self.packet_events.wants(
+                PACKET_DIRECTION_OUT
+            ):
+                self._fire_packet_event(new_packet.msg, PACKET_DIRECTION_OUT)
+            library_write(new_packet)
+
+        dynalite.write = write
+
+    def _space_reconnects(self) -> None:
+        """Hook the library connect so reconnects wait for the backoff."""
+        dynalite = self.dynalite_devices._dynalite  # pylint: disable=protected-access
+        library_connect = dynalite.connect_internal
+
+        async def connect_internal(host: str, port: int) -> bool:
+            await self.monitor.async_backoff()
+            return await library_connect(host, port)
+
+        dynalite.connect_internal = connect_internal
+
+    def _send_heartbeat(self) -> bool:
+        """Query the preset of an area as a sign of life, a different area each time.
+
+        Any device of an area answers for its preset, and rotating the areas
+        keeps one area that does not answer from closing the connection.
+        """
+        areas = sorted(self.areas)
+        if len(areas) == 0:
+            return False
+        area = areas[self._heartbeat_count % len(areas)]
+        self._heartbeat_count += 1
+        self._heartbeat_area = area
+        self.dynalite_devices.request_area_preset(area, None)
+        return True
+
+    def _heartbeat_written(self, packet: Any) -> None:
+        """Start the deadline of the heartbeat when its query is written."""
+        if packet[1] == self._heartbeat_area and packet[3] == OPCODE_REQUEST_PRESET:
+            self._heartbeat_area = None
+            self.monitor.heartbeat_written(time.monotonic())
+
+    @callback
+    def _close_dead_connection(self) -> None:
+        """Drop a connection that stopped carrying packets, the library reconnects."""
+        LOGGER.warning(
+            "No answer from host %s in %.1f seconds, reconnecting",
+            self.host,
+            self.monitor.last_detect_time,
+        )
+        self.dynalite_devices.connected = False
+        self.update_device()
+        dynalite = self.dynalite_devices._dynalite  # pylint: disable=protected-access
+        writer = dynalite._writer  # pylint: disable=protected-access
+        if writer:
+            # abort, a half-open connection would never flush what is left to send
+            writer.transport.abort()
+
+    def _schedule_commands(self) -> None:
+        """Send the commands of the library through the scheduler of the bridge."""
+        # the devices of the library call these on the DynaliteDevices object
+        for name in SCHEDULED_COMMANDS:
+            command = getattr(self.dynalite_devices, name)
+            setattr(self.dynalite_devices, name, self.scheduler.wrap(name, command))
+        # levels for every channel of an area are merged before they are scheduled
+        self.grouper = AreaLevelGrouper(
+            self.hass.loop,
+            self.dynalite_devices.set_channel_level,
+            self._schedule_area_level,
+            self._area_channels,
+        )
+        self.dynalite_devices.set_channel_level = self._set_channel_level
+
+    def _set_channel_level(
+        self, area: int, channel: int, level: float, fade: float
+    ) -> None:
+        """Set the level of a channel, grouped with the others of its area."""
+        if not self.group_commands:
+            self.grouper.send_channel(area, channel, level, fade)
+            return
+        # the library sends the fade of the channel config, not the one passed
+        fade = self.dynalite_devices.get_channel_fade(area, channel)
+        self.grouper.set_channel_level(area, channel, level, fade)
+
+    def _area_channels(self, area: int) -> set[int]:
+        """Return the channels of an area that the library knows."""
+        areas = self.dynalite_devices._area  # pylint: disable=protected-access
+        return set(areas.get(area, {}).get(dyn_const.CONF_CHANNEL, {}))
+
+    def _schedule_area_level(
+        self, area: int, channels: list[int], level: float, fade: float
+    ) -> None:
+        """Schedule a level for all the channels of an area."""
+        self.scheduler.schedule(
+            LANE_INTERACTIVE,
+            ("set_area_level", area),
+            self._send_area_level,
+            area,
+            channels,
+            level,
+            fade,
+        )
+
+    def _send_area_level(
+        self, area: int, channels: list[int], level: float, fade: float
+    ) -> None:
+        """Send a level to a whole area and update its channels like the library."""
+        dynalite = self.dynalite_devices._dynalite  # pylint: disable=protected-access
+        dynalite.write(area_level_packet(area, level, fade))
+        # the library does not parse its own packets, it updates the channels itself
+        for channel in channels:
+            dynalite.broadcast(
+                DynetEvent(
+                    event_type=dyn_const.EVENT_CHANNEL,
+                    data={
+                        dyn_const.CONF_AREA: area,
+                        dyn_const.CONF_CHANNEL: channel,
+                        dyn_const.CONF_TRGT_LEVEL: int(255 - 254.0 * level),
+                        dyn_const.CONF_ACTION: dyn_const.CONF_ACTION_CMD,
+                    },
+                )
+            )
+
+    def _pace_library(self) -> None:
+        """Let the library send as fast as the budget, it keeps its own delay."""
+        dynalite = self.dynalite_devices._dynalite  # pylint: disable=protected-access
+        if self.scheduler.budget > 0:
+            # pylint: disable-next=protected-access
+            dynalite._message_delay = 1 / self.scheduler.budget
+
+    def _hydration_areas(self) -> list[int]:
+        """Return the areas in the order to hydrate them.
+
+        The priority areas of the options come first, then the areas that have
+        entities which are enabled and not hidden, then the other areas.
+        """
+        priority = list(dict.fromkeys(self.hydrator.priority_areas))
+        visible: set[int] = set()
+        for entry in er.async_get(self.hass).entities.values():
+            if (
+                entry.platform == DOMAIN
+                and entry.disabled_by is None
+                and entry.hidden_by is None
+                and (area := area_of_unique_id(entry.unique_id)) is not None
+            ):
+                visible.add(area)
+        others = sorted(self.areas - set(priority))
+        return (
+            priority
+            + [area for area in others if area in visible]
+            + [area for area in others if area not in visible]
+        )
+
+    async def _async_hydrate(self) -> None:
+        """Query the areas until each answered or gave up."""
+        assert self.hydrator is not None
+        LOGGER.debug("Hydrating the state of host %s", self.host)
+        await self.hydrator.async_run(
+            area_queries(self._hydration_areas(), self._area_channels)
+        )
+        self._hydration_task = None
+
+    def _send_query(self, area: int, channel: int | None) -> None:
+        """Query the preset of an area, or the level of a channel."""
+        if channel is None:
+            self.dynalite_devices.request_area_preset(area, None)
+        else:
+            self.dynalite_devices.request_channel_level(area, channel)
+
+    @callback
+    def _hydration_progress(self, hydrator: StartupHydrator, complete: bool) -> None:
+        """Fire an event with the progress of the hydration."""
+        if complete:
+            LOGGER.info(
+                "Hydrated host %s in %.1f seconds, %s of %s queries answered",
+                self.host,
+                hydrator.elapsed,
+                hydrator.answered,
+                hydrator.total,
+            )
+        self.hass.bus.async_fire(
+            "dynalite_hydration",
+            {
+                ATTR_HOST: self.host,
+                ATTR_TOTAL: hydrator.total,
+                ATTR_ANSWERED: hydrator.answered,
+                ATTR_FAILED: hydrator.failed,
+                ATTR_RETRIED: hydrator.retried,
+                ATTR_ELAPSED: hydrator.elapsed,
+                ATTR_COMPLETE: complete,
+            },
+        )
+
+    @callback
+    def _update_poll_timer(self) -> None:
+        """Run the poll timer only while adaptive polling is configured."""
+        if self.poller is not None and self._poll_timer is None:
+            self._poll_timer = async_track_time_interval(
+                self.hass, self._async_poll_tick, timedelta(seconds=POLL_TICK)
+            )
+        elif self.poller is None and self._poll_timer is not None:
+            self._poll_timer()
+            self._poll_timer = None
+
+    @callback
+    def _async_poll_tick(self, _now: Any = None) -> None:
+        """Let the poller query the areas that are due, while connected."""
+        if self.poller is not None and self.dynalite_devices.connected:
+            self.poller.tick(time.monotonic())
+
+    def _poll_area(self, area: int) -> int:
+        """Query the preset and channels of an area and return the packets sent."""
+        channels = self._area_channels(area)
+        self.dynalite_devices.request_area_preset(area, None)
+        for channel in channels:
+            self.dynalite_devices.request_channel_level(area, channel)
+        return 1 + len(channels)
+
+    def _cover_moving(self, area: int) -> bool:
+        """Return if a cover of an area is opening or closing."""
+        return area in self._moving_cover_areas
+
+    @callback
+    def performance_stats(self) -> dict[str, float]:
+        """Return the rates since the previous call and the load of the bridge."""
+        return {
+            **self.counters.sample(time.monotonic()),
+            **self.scheduler.sample_waits(),
+            "fanout_time": self.availability_fanout_time,
+            "queue_depth": self.scheduler.depth,
+            "reconnects": self.monitor.reconnects,
+        }
+
+    async def async_dump_capture(self) -> str | None:
+        """Write the captured packets to a file in the config dir and return its path."""
+        if self.capture is None:
+            LOGGER.warning("Packet capture is not enabled for host %s", self.host)
+            return None
+        path = self.hass.config.path(
+            f"dynalite_capture_{self.host}_{int(time.time())}.bin"
+        )
+        await self.hass.async_add_executor_job(
+            write_capture_file, path, self.capture.to_bytes()
+        )
+        LOGGER.info("Wrote %s packets to %s", len(self.capture), path)
+        return path
+
+    @callback
+    def register_entity(
+        self,
+        unique_id: str,
+        write_state: Callable[[], None],
+        reconfigure: Callable[[], None] | None = None,
+    ) -> CALLBACK_TYPE:
+        """Register the state write callback of an entity and return a function to unregister it.
+
+        reconfigure is called in place of write_state when the config was reloaded.
+        """
+        self._entity_updates[unique_id] = write_state
+        if reconfigure is not None:
+            self._entity_reconfigures[unique_id] = reconfigure
+
+        @callback
+        def unregister_entity() -> None:
+            if self._entity_updates.get(unique_id) is write_state:
+                del self._entity_updates[unique_id]
+                self._entity_reconfigures.pop(unique_id, None)
+
+        return unregister_entity
 
     def update_signal(self, device: DynaliteBaseDevice | None = None) -> str:
-        """Create signal to use to trigger entity update."""
+        """Create signal to use to trigger entity update, for listeners outside the component."""
         if device:
             signal = f"dynalite-update-{self.host}-{device.unique_id}"
         else:
@@ -73,22 +631,113 @@ class DynaliteBridge:
                 "Connected" if self.dynalite_devices.connected else "Disconnected"
             )
             LOGGER.info("%s to dynalite host", log_string)
-            async_dispatcher_send(self.hass, self.update_signal())
+            self.monitor.connection_changed(
+                self.dynalite_devices.connected, time.monotonic()
+            )
+            self._pending_wide_update = True
         else:
-            async_dispatcher_send(self.hass, self.update_signal(device))
+            # only the latest state matters, so repeated updates of a device collapse
+            self._pending_updates[device.unique_id] = device
+            if isinstance(device, DynaliteTimeCoverDevice):
+                self._update_moving_cover(device)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.hass.loop.call_soon(self._flush_updates)
+
+    def _update_moving_cover(self, cover: DynaliteTimeCoverDevice) -> None:
+        """Keep track of the areas that have an opening or closing cover."""
+        # the library has one time cover per area, with the area in its unique_id
+        if (area := area_of_unique_id(cover.unique_id)) is None:
+            return
+        if cover.is_opening or cover.is_closing:
+            self._moving_cover_areas.add(area)
+        else:
+            self._moving_cover_areas.discard(area)
 
     @callback
-    def handle_notification(self, notification: DynaliteNotification) -> None:
-        """Handle a notification from the platform and issue events."""
-        if notification.notification == NOTIFICATION_PACKET:
+    def _flush_updates(self) -> None:
+        """Send the updates that were collected during the last loop iteration."""
+        self._flush_scheduled = False
+        pending_updates = self._pending_updates
+        self._pending_updates = {}
+        if len(pending_updates) > 0:
+            self.state_cache.schedule_save()
+        if self._pending_wide_update:
+            # a wide update writes every entity, so the specific ones are redundant
+            self._pending_wide_update = False
+            if self._availability_task:
+                self._availability_task.cancel()
+            self._availability_task = self.hass.async_create_task(
+                self._async_write_availability(list(self._entity_updates.items()))
+            )
+            if self.send_update_signals:
+                async_dispatcher_send(self.hass, self.update_signal())
+            return
+        for unique_id, device in pending_updates.items():
+            write_state = self._entity_updates.get(unique_id)
+            if write_state:
+                write_state()
+                self.counters.state_writes += 1
+            if self.send_update_signals:
+                async_dispatcher_send(self.hass, self.update_signal(device))
+
+    async def _async_write_availability(
+        self, entity_updates: list[tuple[str, Callable[[], None]]]
+    ) -> None:
+        """Write the state of all the entities after a connection change, a chunk per loop iteration."""
+        start_time = time.monotonic()
+        chunk_size = max(
+            AVAILABILITY_CHUNK_SIZE,
+            math.ceil(len(entity_updates) / AVAILABILITY_MAX_ITERATIONS),
+        )
+        for start in range(0, len(entity_updates), chunk_size):
+            if start:
+                await asyncio.sleep(0)
+            for unique_id, write_state in entity_updates[start : start + chunk_size]:
+                # skip entities that were removed since the fan-out started
+                if self._entity_updates.get(unique_id) is write_state:
+                    write_state()
+                    self.counters.state_writes += 1
+        self.availability_fanout_time = time.monotonic() - start_time
+        self._availability_task = None
+        LOGGER.debug(
+            "Availability of %s entities on host %s written in %.3f seconds",
+            len(entity_updates),
+            self.host,
+            self.availability_fanout_time,
+        )
+
+    def _fire_packet_event(self, packet: list[int], direction: str) -> None:
+        """Fire a dynalite_packet event if the filter lets the packet through."""
+        if self.packet_events.forward(packet, direction):
             self.hass.bus.async_fire(
                 "dynalite_packet",
-                {
-                    ATTR_HOST: self.host,
-                    ATTR_PACKET: notification.data[NOTIFICATION_PACKET],
-                },
+                {ATTR_HOST: self.host, ATTR_PACKET: packet, ATTR_DIRECTION: direction},
             )
+
+    @callback
+    def handle_notification(self, notification: DynaliteNotification) -> None:
+        """Handle a notification from the platform and issue events."""
+        if notification.notification == NOTIFICATION_PACKET:
+            packet = notification.data[NOTIFICATION_PACKET]
+            self.counters.packets_in += 1
+            self.counters.bytes_in += len(packet)
+            self.monitor.packet_received(time.monotonic())
+            if packet[0] == SYNC_LOGICAL:
+                self._discover_area(packet[1])
+            if self.capture is not None:
+                self.capture.record(DIRECTION_IN, packet)
+            if self.poller is not None:
+                self.poller.handle_packet(packet, time.monotonic())
+            if self._hydration_task is not None:
+                self.hydrator.handle_packet(packet)
+            self._fire_packet_event(packet, PACKET_DIRECTION_IN)
         if notification.notification == NOTIFICATION_PRESET:
+            self.counters.presets += 1
+            area_presets = self._area_presets.get(notification.data[dyn_CONF_AREA])
+            if area_presets:
+                area_presets.preset = notification.data[dyn_CONF_PRESET]
+                self.update_device(area_presets)
             self.hass.bus.async_fire(
                 "dynalite_preset",
                 {
@@ -102,18 +751,77 @@ class DynaliteBridge:
     def register_add_devices(self, platform: str, async_add_devices: Callable) -> None:
         """Add an async_add_entities for a category."""
         self.async_add_devices[platform] = async_add_devices
-        if platform in self.waiting_devices:
-            self.async_add_devices[platform](self.waiting_devices[platform])
+        devices = self.pending_devices.drain(platform)
+        if len(devices) > 0:
+            async_add_devices(devices)
 
+    @callback
     def add_devices_when_registered(self, devices: list[DynaliteBaseDevice]) -> None:
-        """Add the devices to HA if the add devices callback was registered, otherwise queue until it is."""
+        """Add the devices to HA if the add devices callback was registered, otherwise queue until it is.
+
+        With autodiscover the library reports the devices one at a time as they
+        appear on the bus, so they are collected for the discovery window and
+        added together. The configured ones come together from configure.
+        """
+        new_devices = self.pending_devices.new_devices(devices)
+        if self.preset_select:
+            new_devices = self._presets_as_selects(new_devices)
+        configured = self.dynalite_devices._configured  # pylint: disable=protected-access
+        if not (self.autodiscover and configured and self.discovery_window > 0):
+            self._add_devices(new_devices, discovered=configured)
+            return
+        self._discovered_devices.extend(new_devices)
+        if self._discovery_timer is None and len(self._discovered_devices) > 0:
+            self._discovery_timer = async_call_later(
+                self.hass, self.discovery_window, self._add_discovered_devices
+            )
+
+    @callback
+    def _add_discovered_devices(self, _now: Any = None) -> None:
+        """Add the devices that were discovered during the window."""
+        self._discovery_timer = None
+        devices = self._discovered_devices
+        self._discovered_devices = []
+        LOGGER.debug("Adding %s discovered devices", len(devices))
+        self._add_devices(devices, discovered=True)
+
+    def _add_devices(self, devices: list[DynaliteBaseDevice], discovered: bool) -> None:
+        """Add the devices in a call per platform that has any.
+
+        Only the discovered devices that wait for their platform are bounded,
+        the configured ones are all kept.
+        """
+        platform_devices: dict[str, list[DynaliteBaseDevice]] = {}
+        for device in devices:
+            platform_devices.setdefault(device.category, []).append(device)
         for platform in PLATFORMS:
-            platform_devices = [
-                device for device in devices if device.category == platform
-            ]
+            if platform not in platform_devices:
+                continue
             if platform in self.async_add_devices:
-                self.async_add_devices[platform](platform_devices)
+                self.async_add_devices[platform](platform_devices[platform])
             else:  # handle it later when it is registered
-                if platform not in self.waiting_devices:
-                    self.waiting_devices[platform] = []
-                self.waiting_devices[platform].extend(platform_devices)
+                self.pending_devices.queue(
+                    platform, platform_devices[platform], bounded=discovered
+                )
+
+    def _presets_as_selects(
+        self, devices: list[DynaliteBaseDevice]
+    ) -> list[DynaliteBaseDevice]:
+        """Replace the preset switches with a select device per area."""
+        result = []
+        for device in devices:
+            if not isinstance(device, DynalitePresetSwitchDevice):
+                result.append(device)
+                continue
+            # pylint: disable-next=protected-access
+            area, preset = device._area, device._preset
+            area_presets = self._area_presets.get(area)
+            if area_presets is None:
+                area_presets = AreaPresetsDevice(area, self.dynalite_devices)
+                self._area_presets[area] = area_presets
+                result.append(area_presets)
+            else:
+                # a preset that was discovered later is a new option of the select
+                self.update_device(area_presets)
+            area_presets.add_preset(preset, device)
+        return result
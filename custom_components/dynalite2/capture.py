@@ -0,0 +1,83 @@
+"""Fixed size in-memory capture of the DyNet packets of a bridge."""
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterator
+import struct
+import time
+
+CAPTURE_MAGIC = b"DYNCAP1\x00"
+DIRECTION_IN = 0
+DIRECTION_OUT = 1
+PACKET_SIZE = 8
+RECORD_FORMAT = struct.Struct(f"<dB{PACKET_SIZE}s")  # timestamp, direction, packet
+
+
+class PacketCapture:
+    """Ring buffer of timestamped packets. Memory use is fixed by the size."""
+
+    def __init__(self, size: int) -> None:
+        """Initialize the buffers."""
+        self.size = size
+        self._packets = bytearray(size * PACKET_SIZE)
+        self._directions = bytearray(size)
+        self._timestamps = array("d", bytes(8 * size))
+        self._next = 0
+        self.count = 0  # total packets recorded, including overwritten ones
+
+    def __len__(self) -> int:
+        """Return the number of packets currently in the buffer."""
+        return min(self.count, self.size)
+
+    def record(self, direction: int, packet: bytes | bytearray | list[int]) -> None:
+        """Record a packet, overwriting the oldest one when full."""
+        index = self._next
+        offset = index * PACKET_SIZE
+        data = bytes(packet[:PACKET_SIZE])
+        self._packets[offset : offset + len(data)] = data
+        if len(data) < PACKET_SIZE:
+            self._packets[offset + len(data) : offset + PACKET_SIZE] = bytes(
+                PACKET_SIZE - len(data)
+            )
+        self._directions[index] = direction
+        self._timestamps[index] = time.time()
+        self._next = (index + 1) % self.size
+        self.count += 1
+
+    def records(self) -> Iterator[tuple[float, int, bytes]]:
+        """Return the packets in the buffer from oldest to newest."""
+        start = self._next if self.count > self.size else 0
+        for position in range(len(self)):
+            index = (start + position) % self.size
+            offset = index * PACKET_SIZE
+            yield (
+                self._timestamps[index],
+                self._directions[index],
+                bytes(self._packets[offset : offset + PACKET_SIZE]),
+            )
+
+    def to_bytes(self) -> bytes:
+        """Serialize the buffer to the capture file format."""
+        return CAPTURE_MAGIC + b"".join(
+            RECORD_FORMAT.pack(*record) for record in self.records()
+        )
+
+    def clear(self) -> None:
+        """Drop all the recorded packets."""
+        self._next = 0
+        self.count = 0
+
+
+def write_capture_file(path: str, data: bytes) -> None:
+    """Write a serialized capture to a file."""
+    with open(path, "wb") as capture_file:
+        capture_file.write(data)
+
+
+def read_capture_file(path: str) -> list[tuple[float, int, bytes]]:
+    """Read a capture file into a list of (timestamp, direction, packet)."""
+    with open(path, "rb") as capture_file:
+        data = capture_file.read()
+    if not data.startswith(CAPTURE_MAGIC):
+        raise ValueError(f"{path} is not a Dynalite capture file")
+    return list(RECORD_FORMAT.iter_unpack(data[len(CAPTURE_MAGIC) :]))
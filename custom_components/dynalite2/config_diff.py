@@ -0,0 +1,100 @@
+"""Find what changed between two converted configs."""
+from __future__ import annotations
+
+from typing import Any
+
+from dynalite_devices_lib import const as dyn_const
+
+from .convert_config import BRIDGE_OPTIONS
+
+CONNECTION_KEYS = [dyn_const.CONF_HOST, dyn_const.CONF_PORT]
+
+
+def diff_keys(
+    old: dict[Any, Any], new: dict[Any, Any]
+) -> tuple[set[Any], set[Any], set[Any]]:
+    """Return the keys that were added, removed and changed between two dicts."""
+    added = new.keys() - old.keys()
+    removed = old.keys() - new.keys()
+    changed = {key for key in new.keys() & old.keys() if new[key] != old[key]}
+    return added, removed, changed
+
+
+class ConfigDiff:
+    """Differences between the previous and the new converted config of a bridge."""
+
+    def __init__(self, old: dict[str, Any], new: dict[str, Any]) -> None:
+        """Compare the configs at area, channel, preset and template granularity."""
+        self.connection_changed = any(
+            old.get(conf) != new.get(conf) for conf in CONNECTION_KEYS
+        )
+        skip = {dyn_const.CONF_AREA, *CONNECTION_KEYS, *BRIDGE_OPTIONS}
+        self.global_changed = sorted(
+            conf
+            for conf in old.keys() | new.keys()
+            if conf not in skip and old.get(conf) != new.get(conf)
+        )
+        self.bridge_options_changed = sorted(
+            conf for conf in BRIDGE_OPTIONS if old.get(conf) != new.get(conf)
+        )
+        old_areas = old.get(dyn_const.CONF_AREA, {})
+        new_areas = new.get(dyn_const.CONF_AREA, {})
+        self.areas_added, self.areas_removed, self.areas_changed = diff_keys(
+            old_areas, new_areas
+        )
+        self.counts = {
+            "channels": [0, 0, 0],
+            "presets": [0, 0, 0],
+            "templates": [0, 0, 0],
+        }
+        for area in self.areas_changed:
+            for name, conf in (
+                ("channels", dyn_const.CONF_CHANNEL),
+                ("presets", dyn_const.CONF_PRESET),
+            ):
+                delta = diff_keys(
+                    old_areas[area].get(conf, {}), new_areas[area].get(conf, {})
+                )
+                for index, keys in enumerate(delta):
+                    self.counts[name][index] += len(keys)
+            old_template = old_areas[area].get(dyn_const.CONF_TEMPLATE)
+            new_template = new_areas[area].get(dyn_const.CONF_TEMPLATE)
+            if old_template is None and new_template is not None:
+                self.counts["templates"][0] += 1
+            elif new_template is None and old_template is not None:
+                self.counts["templates"][1] += 1
+            elif old_template != new_template:
+                self.counts["templates"][2] += 1
+
+    @property
+    def changed(self) -> bool:
+        """Return whether anything changed."""
+        return bool(
+            self.connection_changed
+            or self.global_changed
+            or self.bridge_options_changed
+            or self.areas_added
+            or self.areas_removed
+            or self.areas_changed
+        )
+
+    @property
+    def areas_to_configure(self) -> set[Any]:
+        """Return the areas that the library has to configure again."""
+        return self.areas_added | self.areas_changed
+
+    def summary(self) -> str:
+        """Return a short description of the changes for the log."""
+        areas = (self.areas_added, self.areas_removed, self.areas_changed)
+        parts = ["areas +{} -{} ~{}".format(*(len(keys) for keys in areas))]
+        parts.extend(
+            f"{name} +{added} -{removed} ~{changed}"
+            for name, (added, removed, changed) in self.counts.items()
+        )
+        if self.global_changed:
+            parts.append(f"globals {', '.join(self.global_changed)}")
+        if self.bridge_options_changed:
+            parts.append(f"options {', '.join(self.bridge_options_changed)}")
+        if self.connection_changed:
+            parts.append("connection")
+        return ", ".join(parts)
@@ -1,6 +1,7 @@
 """Config flow to configure Dynalite hub."""
 from __future__ import annotations
 
+import asyncio
 import copy
 from typing import Any
 
@@ -11,9 +12,24 @@ from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import config_validation as cv
 import voluptuous as vol
 
-from .bridge import DynaliteBridge
-from .const import DEFAULT_PORT, DOMAIN, LOGGER
-from .convert_config import convert_config
+from .const import CONNECT_PROBE_TIMEOUT, DEFAULT_PORT, DOMAIN, LOGGER
+
+
+async def async_probe_gateway(host: str, port: int) -> bool:
+    """Return if the gateway accepts a TCP connection, and close it again."""
+    try:
+        _, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port), CONNECT_PROBE_TIMEOUT
+        )
+    except (OSError, asyncio.TimeoutError) as err:
+        LOGGER.debug("Could not connect to %s:%s - %s", host, port, err)
+        return False
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return True
 
 
 class DynaliteFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
@@ -25,11 +41,9 @@ class DynaliteFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         """Initialize the Dynalite flow."""
         self.host = None
 
-    async def _validate_connection(
-        self, config: dict[str, Any], options: dict[str, Any]
-    ) -> None:
-        bridge = DynaliteBridge(self.hass, convert_config(config, options))
-        if not await bridge.async_setup():
+    async def _validate_connection(self, config: dict[str, Any]) -> None:
+        # the entry connects when it is set up, so the flow only checks the port
+        if not await async_probe_gateway(config[CONF_HOST], config[CONF_PORT]):
             raise CannotConnect
 
     async def async_step_import(self, import_info: dict[str, Any]) -> Any:
@@ -50,7 +64,7 @@ class DynaliteFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
 
         # New entry
         try:
-            await self._validate_connection(data, options)
+            await self._validate_connection(data)
         except CannotConnect:
             LOGGER.error("Unable to setup bridge - import info=%s", import_info)
             return self.async_abort(reason="no_connection")
@@ -84,7 +98,7 @@ class DynaliteFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             host = user_input[CONF_HOST]
             data = {CONF_HOST: host, CONF_PORT: user_input[CONF_PORT]}
             options: dict[str, Any] = {}
-            await self._validate_connection(data, options)
+            await self._validate_connection(data)
         except CannotConnect:
             errors["base"] = "cannot_connect"
         except Exception:  # pylint: disable=broad-except
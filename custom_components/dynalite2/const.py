@@ -6,36 +6,91 @@ from homeassistant.const import CONF_ROOM
 LOGGER = logging.getLogger(__package__)
 DOMAIN = "dynalite2"
 
-PLATFORMS = ["light", "switch", "cover"]
+PLATFORMS = ["light", "switch", "cover", "select", "sensor"]
 
 
 CONF_ACTIVE = "active"
+CONF_ADAPTIVE_POLL = "adaptive_poll"
 ACTIVE_INIT = "init"
 ACTIVE_OFF = "off"
 ACTIVE_ON = "on"
 CONF_AREA = "area"
 CONF_AUTO_DISCOVER = "autodiscover"
 CONF_BRIDGES = "bridges"
+CONF_BUDGET = "budget"
+CONF_BUS_BUDGET = "bus_budget"
+CONF_CAPTURE_SIZE = "capture_size"
 CONF_CHANNEL = "channel"
 CONF_CHANNEL_COVER = "channel_cover"
 CONF_CLOSE_PRESET = "close"
+CONF_CONCURRENCY = "concurrency"
+CONF_DEADLINE = "deadline"
 CONF_DEVICE_CLASS = "class"
+CONF_DIAGNOSTIC_SENSORS = "diagnostic_sensors"
+CONF_DIRECTION = "direction"
+CONF_DISCOVERY_WINDOW = "discovery_window"
 CONF_DURATION = "duration"
+CONF_ENABLED = "enabled"
+CONF_GROUP_COMMANDS = "group_commands"
+CONF_HEARTBEAT = "heartbeat"
+CONF_HYDRATION = "hydration"
 CONF_FADE = "fade"
 CONF_LEVEL = "level"
+CONF_LIVENESS = "liveness"
+CONF_MAX_BACKOFF = "max_backoff"
+CONF_MAX_INTERVAL = "max_interval"
+CONF_MIN_INTERVAL = "min_interval"
 CONF_NO_DEFAULT = "nodefault"
+CONF_OPCODE = "opcode"
 CONF_OPEN_PRESET = "open"
+CONF_PACKET_EVENTS = "packet_events"
 CONF_POLL_TIMER = "polltimer"
 CONF_PRESET = "preset"
+CONF_PRESET_SELECT = "preset_select"
+CONF_RATE_LIMIT = "rate_limit"
+CONF_RETRIES = "retries"
 CONF_ROOM_OFF = "room_off"
 CONF_ROOM_ON = "room_on"
+CONF_SAMPLE = "sample"
 CONF_STOP_PRESET = "stop"
 CONF_TEMPLATE = "template"
 CONF_TILT_TIME = "tilt"
+CONF_TIMEOUT = "timeout"
 CONF_TIME_COVER = "time_cover"
+CONF_UPDATE_SIGNALS = "update_signals"
 
+BATCH_CONCURRENCY = 5  # bus queries sent together by a service call
+BATCH_INTERVAL = 1.0  # seconds between those groups of queries
+AVAILABILITY_CHUNK_SIZE = 200  # entities written per loop iteration
+AVAILABILITY_MAX_ITERATIONS = 20  # larger chunks are used above this
+PENDING_DEVICES_MAX = 20000  # devices that wait for their platform
+
+CONNECT_PROBE_TIMEOUT = 5.0  # seconds for the config flow to reach a gateway
+
+DIAGNOSTIC_SENSORS_INTERVAL = 30  # seconds between updates of the counters
+
+DATA_ROUTER = f"{DOMAIN}_router"
+
+HYDRATION_PROGRESS_INTERVAL = 1.0  # seconds between progress events
+
+RECONNECT_BACKOFF_BASE = 1.0  # seconds, doubled after every failed reconnect
+
+POLL_BACKOFF = 2  # interval factor after a poll that found no change
+POLL_TICK = 1.0  # seconds between the checks for areas to poll
+
+DEFAULT_BUS_BUDGET = 5.0  # packets per second, the pace of the library
 DEFAULT_CHANNEL_TYPE = "light"
+DEFAULT_DISCOVERY_WINDOW = 0.5  # seconds that discovered devices are collected
+DEFAULT_HYDRATION_CONCURRENCY = 8  # startup queries waiting for an answer
+DEFAULT_HYDRATION_RETRIES = 2
+DEFAULT_HYDRATION_TIMEOUT = 5.0  # seconds for an answer, including the queue
+DEFAULT_LIVENESS_DEADLINE = 10.0  # seconds for an answer to a heartbeat
+DEFAULT_LIVENESS_HEARTBEAT = 30.0  # seconds without packets before a heartbeat
+DEFAULT_LIVENESS_MAX_BACKOFF = 60.0  # seconds, the longest wait to reconnect
 DEFAULT_NAME = "dynalite"
+DEFAULT_POLL_BUDGET = 1.0  # queries per second, out of the bus budget
+DEFAULT_POLL_MAX_INTERVAL = 900.0  # seconds, for areas that never change
+DEFAULT_POLL_MIN_INTERVAL = 10.0  # seconds, for areas that just changed
 DEFAULT_PORT = 12345
 DEFAULT_TEMPLATES = {
     CONF_ROOM: [CONF_ROOM_ON, CONF_ROOM_OFF],
@@ -50,11 +105,36 @@ DEFAULT_TEMPLATES = {
     ],
 }
 
+ATTR_ANSWERED = "answered"
 ATTR_AREA = "area"
+ATTR_AREAS = "areas"
+ATTR_BRIDGES = "bridges"
+ATTR_BROADCAST = "broadcast"
 ATTR_CHANNEL = "channel"
+ATTR_CHANNELS = "channels"
+ATTR_COMPLETE = "complete"
+ATTR_CONCURRENCY = "concurrency"
+ATTR_DIRECTION = "direction"
+ATTR_ELAPSED = "elapsed"
+ATTR_FAILED = "failed"
 ATTR_HOST = "host"
+ATTR_INTERVAL = "interval"
 ATTR_PACKET = "packet"
 ATTR_PRESET = "preset"
+ATTR_REQUESTS = "requests"
+ATTR_RETRIED = "retried"
+ATTR_TOTAL = "total"
 
+PACKET_DIRECTION_IN = "in"
+PACKET_DIRECTION_OUT = "out"
+SYNC_LOGICAL = 0x1C  # first byte of a logical DyNet packet
+DYNET_MAX_NUMBER = 255  # highest area, channel or preset number of a packet
+
+SERVICE_DUMP_CAPTURE = "dump_capture"
 SERVICE_REQUEST_AREA_PRESET = "request_area_preset"
 SERVICE_REQUEST_CHANNEL_LEVEL = "request_channel_level"
+
+# Last known levels, presets and cover positions, with the host appended
+STATE_CACHE_STORAGE_KEY = f"{DOMAIN}.state"
+STATE_CACHE_STORAGE_VERSION = 1
+STATE_CACHE_SAVE_DELAY = 10  # seconds, changes until then are saved together
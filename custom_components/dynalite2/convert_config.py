@@ -1,6 +1,9 @@
 """Convert the HA config to the dynalite config."""
 from __future__ import annotations
 
+from collections import OrderedDict
+import hashlib
+import pickle
 from types import MappingProxyType
 from typing import Any
 
@@ -19,25 +22,36 @@ from .const import (
     ACTIVE_OFF,
     ACTIVE_ON,
     CONF_ACTIVE,
+    CONF_ADAPTIVE_POLL,
     CONF_AREA,
     CONF_AUTO_DISCOVER,
+    CONF_BUS_BUDGET,
+    CONF_CAPTURE_SIZE,
     CONF_CHANNEL,
     CONF_CHANNEL_COVER,
     CONF_CLOSE_PRESET,
     CONF_DEVICE_CLASS,
+    CONF_DIAGNOSTIC_SENSORS,
+    CONF_DISCOVERY_WINDOW,
     CONF_DURATION,
     CONF_FADE,
+    CONF_GROUP_COMMANDS,
+    CONF_HYDRATION,
     CONF_LEVEL,
+    CONF_LIVENESS,
     CONF_NO_DEFAULT,
     CONF_OPEN_PRESET,
+    CONF_PACKET_EVENTS,
     CONF_POLL_TIMER,
     CONF_PRESET,
+    CONF_PRESET_SELECT,
     CONF_ROOM_OFF,
     CONF_ROOM_ON,
     CONF_STOP_PRESET,
     CONF_TEMPLATE,
     CONF_TILT_TIME,
     CONF_TIME_COVER,
+    CONF_UPDATE_SIGNALS,
 )
 
 ACTIVE_MAP = {
@@ -48,58 +62,95 @@ ACTIVE_MAP = {
     True: dyn_const.ACTIVE_ON,
 }
 
+# Options that are only used by the component and passed to the bridge unchanged
+BRIDGE_OPTIONS = [
+    CONF_ADAPTIVE_POLL,
+    CONF_BUS_BUDGET,
+    CONF_CAPTURE_SIZE,
+    CONF_DIAGNOSTIC_SENSORS,
+    CONF_DISCOVERY_WINDOW,
+    CONF_GROUP_COMMANDS,
+    CONF_HYDRATION,
+    CONF_LIVENESS,
+    CONF_PACKET_EVENTS,
+    CONF_PRESET_SELECT,
+    CONF_UPDATE_SIGNALS,
+]
+
 TEMPLATE_MAP = {
     CONF_ROOM: dyn_const.CONF_ROOM,
     CONF_TIME_COVER: dyn_const.CONF_TIME_COVER,
 }
 
+# Key maps from component consts to library consts, built once at import
+CHANNEL_MAP = {
+    CONF_NAME: dyn_const.CONF_NAME,
+    CONF_FADE: dyn_const.CONF_FADE,
+    CONF_TYPE: dyn_const.CONF_CHANNEL_TYPE,
+}
+
+PRESET_MAP = {
+    CONF_NAME: dyn_const.CONF_NAME,
+    CONF_FADE: dyn_const.CONF_FADE,
+    CONF_LEVEL: dyn_const.CONF_LEVEL,
+}
+
+TEMPLATE_CONF_MAP = {
+    CONF_ROOM_ON: dyn_const.CONF_ROOM_ON,
+    CONF_ROOM_OFF: dyn_const.CONF_ROOM_OFF,
+    CONF_CHANNEL_COVER: dyn_const.CONF_CHANNEL_COVER,
+    CONF_DEVICE_CLASS: dyn_const.CONF_DEVICE_CLASS,
+    CONF_OPEN_PRESET: dyn_const.CONF_OPEN_PRESET,
+    CONF_CLOSE_PRESET: dyn_const.CONF_CLOSE_PRESET,
+    CONF_STOP_PRESET: dyn_const.CONF_STOP_PRESET,
+    CONF_DURATION: dyn_const.CONF_DURATION,
+    CONF_TILT_TIME: dyn_const.CONF_TILT_TIME,
+}
+
+AREA_MAP = {
+    CONF_NAME: dyn_const.CONF_NAME,
+    CONF_FADE: dyn_const.CONF_FADE,
+    CONF_NO_DEFAULT: dyn_const.CONF_NO_DEFAULT,
+    **TEMPLATE_CONF_MAP,
+}
+
+DEFAULT_MAP = {CONF_FADE: dyn_const.CONF_FADE}
+
+BRIDGE_MAP = {
+    CONF_NAME: dyn_const.CONF_NAME,
+    CONF_HOST: dyn_const.CONF_HOST,
+    CONF_PORT: dyn_const.CONF_PORT,
+    CONF_AUTO_DISCOVER: dyn_const.CONF_AUTO_DISCOVER,
+    CONF_POLL_TIMER: dyn_const.CONF_POLL_TIMER,
+}
+
+# Converted configs of the last entries, by a hash of their data and options
+CONVERT_CACHE_SIZE = 8
+_convert_cache: OrderedDict[str, dict[str, Any]] = OrderedDict()
+
 
 def convert_with_map(config, conf_map):
     """Create the initial converted map with just the basic key:value pairs updated."""
     result = {}
-    for conf in conf_map:
+    for conf, dyn_conf in conf_map.items():
         if conf in config:
-            result[conf_map[conf]] = config[conf]
+            result[dyn_conf] = config[conf]
     return result
 
 
 def convert_channel(config: dict[str, Any]) -> dict[str, Any]:
     """Convert the config for a channel."""
-    my_map = {
-        CONF_NAME: dyn_const.CONF_NAME,
-        CONF_FADE: dyn_const.CONF_FADE,
-        CONF_TYPE: dyn_const.CONF_CHANNEL_TYPE,
-    }
-    return convert_with_map(config, my_map)
+    return convert_with_map(config, CHANNEL_MAP)
 
 
 def convert_preset(config: dict[str, Any]) -> dict[str, Any]:
     """Convert the config for a preset."""
-    my_map = {
-        CONF_NAME: dyn_const.CONF_NAME,
-        CONF_FADE: dyn_const.CONF_FADE,
-        CONF_LEVEL: dyn_const.CONF_LEVEL,
-    }
-    return convert_with_map(config, my_map)
+    return convert_with_map(config, PRESET_MAP)
 
 
 def convert_area(config: dict[str, Any]) -> dict[str, Any]:
     """Convert the config for an area."""
-    my_map = {
-        CONF_NAME: dyn_const.CONF_NAME,
-        CONF_FADE: dyn_const.CONF_FADE,
-        CONF_NO_DEFAULT: dyn_const.CONF_NO_DEFAULT,
-        CONF_ROOM_ON: dyn_const.CONF_ROOM_ON,
-        CONF_ROOM_OFF: dyn_const.CONF_ROOM_OFF,
-        CONF_CHANNEL_COVER: dyn_const.CONF_CHANNEL_COVER,
-        CONF_DEVICE_CLASS: dyn_const.CONF_DEVICE_CLASS,
-        CONF_OPEN_PRESET: dyn_const.CONF_OPEN_PRESET,
-        CONF_CLOSE_PRESET: dyn_const.CONF_CLOSE_PRESET,
-        CONF_STOP_PRESET: dyn_const.CONF_STOP_PRESET,
-        CONF_DURATION: dyn_const.CONF_DURATION,
-        CONF_TILT_TIME: dyn_const.CONF_TILT_TIME,
-    }
-    result = convert_with_map(config, my_map)
+    result = convert_with_map(config, AREA_MAP)
     if CONF_CHANNEL in config:
         result[dyn_const.CONF_CHANNEL] = {
             channel: convert_channel(channel_conf)
@@ -117,38 +168,58 @@ def convert_area(config: dict[str, Any]) -> dict[str, Any]:
 
 def convert_default(config: dict[str, Any]) -> dict[str, Any]:
     """Convert the config for the platform defaults."""
-    return convert_with_map(config, {CONF_FADE: dyn_const.CONF_FADE})
+    return convert_with_map(config, DEFAULT_MAP)
 
 
 def convert_template(config: dict[str, Any]) -> dict[str, Any]:
     """Convert the config for a template."""
-    my_map = {
-        CONF_ROOM_ON: dyn_const.CONF_ROOM_ON,
-        CONF_ROOM_OFF: dyn_const.CONF_ROOM_OFF,
-        CONF_CHANNEL_COVER: dyn_const.CONF_CHANNEL_COVER,
-        CONF_DEVICE_CLASS: dyn_const.CONF_DEVICE_CLASS,
-        CONF_OPEN_PRESET: dyn_const.CONF_OPEN_PRESET,
-        CONF_CLOSE_PRESET: dyn_const.CONF_CLOSE_PRESET,
-        CONF_STOP_PRESET: dyn_const.CONF_STOP_PRESET,
-        CONF_DURATION: dyn_const.CONF_DURATION,
-        CONF_TILT_TIME: dyn_const.CONF_TILT_TIME,
-    }
-    return convert_with_map(config, my_map)
+    return convert_with_map(config, TEMPLATE_CONF_MAP)
+
+
+def config_hash(
+    config: dict[str, Any] | MappingProxyType[str, Any],
+    options: dict[str, Any] | MappingProxyType[str, Any],
+) -> str:
+    """Return a hash of the content of an entry's data and options."""
+    # pickle is lossless and several times faster than repr or json for large configs
+    content = pickle.dumps((dict(config), dict(options)), pickle.HIGHEST_PROTOCOL)
+    return hashlib.sha256(content).hexdigest()
 
 
 def convert_config(
     config: dict[str, Any] | MappingProxyType[str, Any],
     options: dict[str, Any] | MappingProxyType[str, Any],
 ) -> dict[str, Any]:
-    """Convert a config dict by replacing component consts with library consts."""
-    my_map = {
-        CONF_NAME: dyn_const.CONF_NAME,
-        CONF_HOST: dyn_const.CONF_HOST,
-        CONF_PORT: dyn_const.CONF_PORT,
-        CONF_AUTO_DISCOVER: dyn_const.CONF_AUTO_DISCOVER,
-        CONF_POLL_TIMER: dyn_const.CONF_POLL_TIMER,
+    """Convert a config dict by replacing component consts with library consts.
+
+    Conversions are cached by content, so the result is shared and must not be
+    modified.
+    """
+    key = config_hash(config, options)
+    if key in _convert_cache:
+        _convert_cache.move_to_end(key)
+        return _convert_cache[key]
+    result = _convert_config(config, options)
+    _convert_cache[key] = result
+    if len(_convert_cache) > CONVERT_CACHE_SIZE:
+        _convert_cache.popitem(last=False)
+    return result
+
+
+def clear_convert_cache() -> None:
+    """Clear the cache of converted configs."""
+    _convert_cache.clear()
+
+
+def _convert_config(
+    config: dict[str, Any] | MappingProxyType[str, Any],
+    options: dict[str, Any] | MappingProxyType[str, Any],
+) -> dict[str, Any]:
+    """Convert a config without the cache."""
+    result = {
+        **convert_with_map(config, BRIDGE_MAP),
+        **convert_with_map(options, BRIDGE_MAP),
     }
-    result = {**convert_with_map(config, my_map), **convert_with_map(options, my_map)}
     if CONF_AREA in options:
         result[dyn_const.CONF_AREA] = {
             area: convert_area(area_conf)
@@ -168,4 +239,7 @@ def convert_config(
             TEMPLATE_MAP[template]: convert_template(template_conf)
             for (template, template_conf) in options[CONF_TEMPLATE].items()
         }
+    for conf in BRIDGE_OPTIONS:
+        if conf in options:
+            result[conf] = options[conf]
     return result
@@ -0,0 +1,65 @@
+"""Counters of the work that a bridge does, turned into rates when sampled."""
+from __future__ import annotations
+
+
+class BridgeCounters:
+    """Integer counters that the bridge increments as it handles packets.
+
+    They are only read by sample, at a fixed interval, so counting costs an
+    addition per event and nothing is computed per packet.
+    """
+
+    __slots__ = (
+        "packets_in",
+        "packets_out",
+        "bytes_in",
+        "bytes_out",
+        "presets",
+        "state_writes",
+        "_last_sample",
+        "_last_time",
+    )
+
+    def __init__(self, now: float) -> None:
+        """Initialize the counters at zero."""
+        self.packets_in = 0
+        self.packets_out = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.presets = 0
+        self.state_writes = 0
+        self._last_sample = self._totals()
+        self._last_time = now
+
+    def _totals(self) -> tuple[int, int, int, int, int]:
+        """Return the counters that are reported as rates."""
+        return (
+            self.packets_in,
+            self.packets_out,
+            self.bytes_in + self.bytes_out,
+            self.presets,
+            self.state_writes,
+        )
+
+    def sample(self, now: float) -> dict[str, float]:
+        """Return the rates per second since the previous sample."""
+        totals = self._totals()
+        elapsed = now - self._last_time
+        rates = [
+            (total - last) / elapsed if elapsed > 0 else 0.0
+            for total, last in zip(totals, self._last_sample)
+        ]
+        self._last_sample = totals
+        self._last_time = now
+        return dict(
+            zip(
+                (
+                    "packets_in_rate",
+                    "packets_out_rate",
+                    "bytes_rate",
+                    "presets_rate",
+                    "state_writes_rate",
+                ),
+                rates,
+            )
+        )
@@ -35,34 +35,21 @@ async def async_setup_entry(
 class DynaliteCover(DynaliteBase, CoverEntity):
     """Representation of a Dynalite Channel as a Home Assistant Cover."""
 
-    @property
-    def device_class(self) -> str:
-        """Return the class of the device."""
+    def _update_config_attributes(self) -> None:
+        """Copy the class of the cover, which is set in the config."""
+        super()._update_config_attributes()
         dev_cls = self._device.device_class
-        ret_val = DEFAULT_COVER_CLASS
-        if dev_cls in DEVICE_CLASSES:
-            ret_val = dev_cls
-        return ret_val
-
-    @property
-    def current_cover_position(self) -> int:
-        """Return the position of the cover from 0 to 100."""
-        return self._device.current_cover_position
-
-    @property
-    def is_opening(self) -> bool:
-        """Return true if cover is opening."""
-        return self._device.is_opening
-
-    @property
-    def is_closing(self) -> bool:
-        """Return true if cover is closing."""
-        return self._device.is_closing
-
-    @property
-    def is_closed(self) -> bool:
-        """Return true if cover is closed."""
-        return self._device.is_closed
+        self._attr_device_class = (
+            dev_cls if dev_cls in DEVICE_CLASSES else DEFAULT_COVER_CLASS
+        )
+
+    def _update_attributes(self) -> None:
+        """Copy the position and motion of the cover."""
+        super()._update_attributes()
+        self._attr_current_cover_position = self._device.current_cover_position
+        self._attr_is_opening = self._device.is_opening
+        self._attr_is_closing = self._device.is_closing
+        self._attr_is_closed = self._device.is_closed
 
     async def async_open_cover(self, **kwargs) -> None:
         """Open the cover."""
@@ -84,10 +71,12 @@ class DynaliteCover(DynaliteBase, CoverEntity):
 class DynaliteCoverWithTilt(DynaliteCover):
     """Representation of a Dynalite Channel as a Home Assistant Cover that uses up and down for tilt."""
 
-    @property
-    def current_cover_tilt_position(self) -> int:
-        """Return the current tilt position."""
-        return self._device.current_cover_tilt_position
+    def _update_attributes(self) -> None:
+        """Copy the tilt of the cover as well."""
+        super()._update_attributes()
+        self._attr_current_cover_tilt_position = (
+            self._device.current_cover_tilt_position
+        )
 
     async def async_open_cover_tilt(self, **kwargs) -> None:
         """Open cover tilt."""
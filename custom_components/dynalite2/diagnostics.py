@@ -0,0 +1,26 @@
+"""Diagnostics of a Dynalite bridge."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .bridge import DynaliteBridge
+from .const import DOMAIN
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return the measurements of the bridge of an entry."""
+    bridge: DynaliteBridge = hass.data[DOMAIN][entry.entry_id]
+    return {
+        "host": bridge.host,
+        "connected": bridge.dynalite_devices.connected,
+        "connection": bridge.monitor.stats,
+        "scheduler": bridge.scheduler.stats,
+        "poller": bridge.poller.stats if bridge.poller is not None else None,
+        "packet_events": bridge.packet_events.stats,
+        "pending_devices": bridge.pending_devices.stats,
+    }
@@ -5,7 +5,6 @@ from typing import Any, Callable
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import DeviceInfo, Entity
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
@@ -37,59 +36,62 @@ def async_setup_entry_base(
 
 
 class DynaliteBase(Entity):
-    """Base class for the Dynalite entities."""
+    """Base class for the Dynalite entities.
+
+    The attributes are copied from the device when it is updated, so the state
+    writes of HA read plain attributes instead of going to the library.
+    """
+
+    _attr_should_poll = False
 
     def __init__(self, device: Any, bridge: DynaliteBridge) -> None:
         """Initialize the base class."""
         self._device = device
         self._bridge = bridge
-        self._unsub_dispatchers: list[Callable[[], None]] = []
-
-    @property
-    def name(self) -> str:
-        """Return the name of the entity."""
-        return self._device.name
-
-    @property
-    def unique_id(self) -> str:
-        """Return the unique ID of the entity."""
-        return self._device.unique_id
-
-    @property
-    def available(self) -> bool:
-        """Return if entity is available."""
-        return self._device.available
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Device info for this entity."""
-        return {
-            "identifiers": {(DOMAIN, self._device.unique_id)},
-            "name": self.name,
-            "manufacturer": "Dynalite",
-        }
+        self._unsub_listeners: list[Callable[[], None]] = []
+        self._attr_unique_id = device.unique_id
+        self._update_config_attributes()
+        self._update_attributes()
+
+    def _update_config_attributes(self) -> None:
+        """Copy the attributes that only change when the config changes."""
+        self._attr_name = self._device.name
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, self._device.unique_id)},
+            name=self._attr_name,
+            manufacturer="Dynalite",
+        )
+
+    def _update_attributes(self) -> None:
+        """Copy the state of the device."""
+        self._attr_available = self._device.available
+
+    @callback
+    def _async_device_updated(self) -> None:
+        """Write the state of the device after it was updated."""
+        self._update_attributes()
+        self.async_write_ha_state()
+
+    @callback
+    def _async_device_reconfigured(self) -> None:
+        """Write the state and the names after the config was reloaded."""
+        self._update_config_attributes()
+        self._async_device_updated()
 
     async def async_added_to_hass(self) -> None:
-        """Added to hass so need to register to dispatch."""
-        # register for device specific update
-        self._unsub_dispatchers.append(
-            async_dispatcher_connect(
-                self.hass,
-                self._bridge.update_signal(self._device),
-                self.async_schedule_update_ha_state,
-            )
-        )
-        # register for wide update
-        self._unsub_dispatchers.append(
-            async_dispatcher_connect(
-                self.hass,
-                self._bridge.update_signal(),
-                self.async_schedule_update_ha_state,
+        """Added to hass so need to register with the bridge for updates."""
+        # updates before the registration were not sent to the entity
+        self._update_attributes()
+        self._unsub_listeners.append(
+            self._bridge.register_entity(
+                self.unique_id,
+                self._async_device_updated,
+                self._async_device_reconfigured,
             )
         )
 
     async def async_will_remove_from_hass(self) -> None:
-        """Unregister signal dispatch listeners when being removed."""
-        for unsub in self._unsub_dispatchers:
+        """Unregister from the bridge when being removed."""
+        for unsub in self._unsub_listeners:
             unsub()
-        self._unsub_dispatchers = []
+        self._unsub_listeners = []
@@ -0,0 +1,75 @@
+"""Group channel level commands to a whole area into a single command."""
+from __future__ import annotations
+
+import asyncio
+from typing import Callable
+
+from dynalite_devices_lib.dynet import DynetPacket
+
+OPCODE_FADE_TO_LEVEL = 0x71  # fade in steps of 0.02 seconds
+ALL_CHANNELS = 0xFF  # channel byte that selects every channel of the area
+
+
+def area_level_packet(area: int, level: float, fade: float) -> DynetPacket:
+    """Create a packet that fades all the channels of an area to a level."""
+    fade_time = min(int(fade / 0.02), 0xFF)
+    return DynetPacket(
+        area=area,
+        command=OPCODE_FADE_TO_LEVEL,
+        data=[ALL_CHANNELS, int(255 - 254 * level), fade_time],
+    )
+
+
+class AreaLevelGrouper:
+    """Collect the level commands of a loop iteration and merge them by area.
+
+    When every channel known in an area gets the same level and fade, one
+    command for the area replaces the commands for the channels.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        send_channel: Callable[[int, int, float, float], None],
+        send_area: Callable[[int, list[int], float, float], None],
+        area_channels: Callable[[int], set[int]],
+    ) -> None:
+        """Initialize the grouper with the functions to send and look up channels."""
+        self._loop = loop
+        self.send_channel = send_channel
+        self._send_area = send_area
+        self._area_channels = area_channels
+        # Latest level and fade of each channel, by area
+        self._pending: dict[int, dict[int, tuple[float, float]]] = {}
+        self._flush_scheduled = False
+        self.grouped = 0
+        self.saved = 0
+
+    def set_channel_level(
+        self, area: int, channel: int, level: float, fade: float
+    ) -> None:
+        """Queue a level for a channel until the end of the loop iteration."""
+        self._pending.setdefault(area, {})[channel] = (level, fade)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self._loop.call_soon(self._flush)
+
+    def _flush(self) -> None:
+        """Send the commands that were collected, an area at a time."""
+        self._flush_scheduled = False
+        pending = self._pending
+        self._pending = {}
+        for area, channels in pending.items():
+            values = set(channels.values())
+            if (
+                len(channels) > 1
+                and len(values) == 1
+                and self._area_channels(area) == set(channels)
+            ):
+                level, fade = values.pop()
+                self.grouped += 1
+                self.saved += len(channels) - 1
+                self._send_area(area, sorted(channels), level, fade)
+                continue
+            for channel, (level, fade) in channels.items():
+                self.send_channel(area, channel, level, fade)
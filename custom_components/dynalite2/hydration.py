@@ -0,0 +1,134 @@
+"""Query the state of the areas of a bridge after it connects."""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+import re
+import time
+from typing import Any, Callable, Optional
+
+from .const import (
+    CONF_AREA,
+    CONF_CONCURRENCY,
+    CONF_RETRIES,
+    CONF_TIMEOUT,
+    DEFAULT_HYDRATION_CONCURRENCY,
+    DEFAULT_HYDRATION_RETRIES,
+    DEFAULT_HYDRATION_TIMEOUT,
+    HYDRATION_PROGRESS_INTERVAL,
+)
+from .poller import KEY_CHANNEL, KEY_PRESET, classify_packet
+
+UNIQUE_ID_AREA = re.compile(r"dynalite_area_(\d+)_")
+
+# A query for the preset of an area, with channel None, or the level of a channel
+Query = tuple[int, Optional[int]]
+
+
+def area_of_unique_id(unique_id: str) -> int | None:
+    """Return the area of a unique_id of the library, if it has one."""
+    if (match := UNIQUE_ID_AREA.match(unique_id)) is None:
+        return None
+    return int(match.group(1))
+
+
+def area_queries(areas: list[int], channels: Callable[[int], set[int]]) -> list[Query]:
+    """Return the queries of some areas, the preset of each area first."""
+    queries: list[Query] = []
+    for area in areas:
+        queries.append((area, None))
+        queries.extend((area, channel) for channel in sorted(channels(area)))
+    return queries
+
+
+def query_of_packet(packet: list[int]) -> Query | None:
+    """Return the query that a packet answers, if any."""
+    if (info := classify_packet(packet)) is None:
+        return None
+    area, key, _, _ = info
+    if key == KEY_PRESET:
+        return area, None
+    if isinstance(key, tuple) and key[0] == KEY_CHANNEL:
+        return area, key[1]
+    return None
+
+
+class StartupHydrator:
+    """Send the startup queries with a bound on the ones waiting for an answer.
+
+    Queries are sent in the order given. A query that is not answered within
+    the timeout is sent again, up to the number of retries.
+    """
+
+    def __init__(
+        self,
+        config: dict[str, Any],
+        send: Callable[[int, Optional[int]], None],
+        progress: Callable[[StartupHydrator, bool], None],
+    ) -> None:
+        """Initialize with the function to send a query and one to report."""
+        self.concurrency: int = config.get(
+            CONF_CONCURRENCY, DEFAULT_HYDRATION_CONCURRENCY
+        )
+        self.timeout: float = config.get(CONF_TIMEOUT, DEFAULT_HYDRATION_TIMEOUT)
+        self.retries: int = config.get(CONF_RETRIES, DEFAULT_HYDRATION_RETRIES)
+        # Areas to hydrate before all the others, in order
+        self.priority_areas: list[int] = config.get(CONF_AREA, [])
+        self._send = send
+        self._progress = progress
+        self._waiting: dict[Query, asyncio.Future[None]] = {}
+        self.total = 0
+        self.answered = 0
+        self.failed = 0
+        self.retried = 0
+        self.elapsed = 0.0
+        self._start = 0.0
+        self._last_progress = 0.0
+
+    def handle_packet(self, packet: list[int]) -> None:
+        """Complete the query that a packet from the bus answers."""
+        if len(self._waiting) == 0 or (query := query_of_packet(packet)) is None:
+            return
+        future = self._waiting.get(query)
+        if future is not None and not future.done():
+            future.set_result(None)
+
+    async def async_run(self, queries: list[Query]) -> None:
+        """Send all the queries and wait until each is answered or gave up."""
+        self.total = len(queries)
+        self._start = self._last_progress = time.monotonic()
+        pending = deque(queries)
+        await asyncio.gather(
+            *(
+                self._async_worker(pending)
+                for _ in range(min(self.concurrency, len(queries)))
+            )
+        )
+        self.elapsed = time.monotonic() - self._start
+        self._progress(self, True)
+
+    async def _async_worker(self, pending: deque[Query]) -> None:
+        """Send queries one at a time until none are left."""
+        loop = asyncio.get_running_loop()
+        while len(pending) > 0:
+            query = pending.popleft()
+            for attempt in range(self.retries + 1):
+                if attempt:
+                    self.retried += 1
+                future = self._waiting[query] = loop.create_future()
+                self._send(*query)
+                try:
+                    await asyncio.wait_for(future, self.timeout)
+                except asyncio.TimeoutError:
+                    continue
+                finally:
+                    del self._waiting[query]
+                self.answered += 1
+                break
+            else:
+                self.failed += 1
+            now = time.monotonic()
+            if now - self._last_progress >= HYDRATION_PROGRESS_INTERVAL:
+                self._last_progress = now
+                self.elapsed = now - self._start
+                self._progress(self, False)
@@ -22,15 +22,13 @@ async def async_setup_entry(
 class DynaliteLight(DynaliteBase, LightEntity):
     """Representation of a Dynalite Channel as a Home Assistant Light."""
 
-    @property
-    def brightness(self) -> int:
-        """Return the brightness of this light between 0..255."""
-        return self._device.brightness
+    _attr_supported_features = SUPPORT_BRIGHTNESS
 
-    @property
-    def is_on(self) -> bool:
-        """Return true if device is on."""
-        return self._device.is_on
+    def _update_attributes(self) -> None:
+        """Copy the brightness of the channel."""
+        super()._update_attributes()
+        self._attr_brightness = self._device.brightness
+        self._attr_is_on = self._device.is_on
 
     async def async_turn_on(self, **kwargs) -> None:
         """Turn the light on."""
@@ -39,8 +37,3 @@ class DynaliteLight(DynaliteBase, LightEntity):
     async def async_turn_off(self, **kwargs) -> None:
         """Turn the light off."""
         await self._device.async_turn_off(**kwargs)
-
-    @property
-    def supported_features(self) -> int:
-        """Flag supported features."""
-        return SUPPORT_BRIGHTNESS
@@ -0,0 +1,167 @@
+"""Find connections to a gateway that stopped working and space the reconnects."""
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from typing import Any, Callable
+
+from .const import (
+    CONF_DEADLINE,
+    CONF_HEARTBEAT,
+    CONF_MAX_BACKOFF,
+    DEFAULT_LIVENESS_DEADLINE,
+    DEFAULT_LIVENESS_HEARTBEAT,
+    DEFAULT_LIVENESS_MAX_BACKOFF,
+    RECONNECT_BACKOFF_BASE,
+)
+
+
+class ConnectionMonitor:
+    """Query an idle gateway and declare the connection dead if it stays silent.
+
+    A half-open TCP connection only ends when the library times out, so when
+    nothing was received for the heartbeat interval a cheap query is sent, and
+    if nothing arrives within the deadline after it was written the connection
+    is closed. A query that waits in the queue for longer than the heartbeat
+    interval counts as written then.
+    Reconnects wait a random time that doubles with every failed attempt, so
+    bridges that lost the same network do not reconnect in lockstep.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        config: dict[str, Any],
+        heartbeat: Callable[[], bool],
+        declare_dead: Callable[[], None],
+    ) -> None:
+        """Initialize with a function that sends a query and one to disconnect.
+
+        heartbeat returns False if there is nothing to query.
+        """
+        self._loop = loop
+        self._heartbeat = heartbeat
+        self._declare_dead = declare_dead
+        self._timer: asyncio.TimerHandle | None = None
+        self._started = False
+        self.connected = False
+        self._last_received = 0.0
+        self._heartbeat_requested: float | None = None
+        self._heartbeat_sent: float | None = None
+        self._disconnected_at: float | None = None
+        self._failures = 0
+        self.heartbeats = 0
+        self.detections = 0
+        self.reconnects = 0
+        self.last_detect_time = 0.0
+        self.last_recover_time = 0.0
+        self.configure(config)
+
+    def configure(self, config: dict[str, Any]) -> None:
+        """Apply new settings, a heartbeat of 0 turns the detection off."""
+        self.heartbeat_interval: float = config.get(
+            CONF_HEARTBEAT, DEFAULT_LIVENESS_HEARTBEAT
+        )
+        self.deadline: float = config.get(CONF_DEADLINE, DEFAULT_LIVENESS_DEADLINE)
+        self.max_backoff: float = config.get(
+            CONF_MAX_BACKOFF, DEFAULT_LIVENESS_MAX_BACKOFF
+        )
+        self._update_timer()
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return the measurements of the connection."""
+        return {
+            "heartbeats": self.heartbeats,
+            "detections": self.detections,
+            "reconnects": self.reconnects,
+            "last_detect_time": self.last_detect_time,
+            "last_recover_time": self.last_recover_time,
+        }
+
+    def start(self) -> None:
+        """Start checking the connection, while it is connected."""
+        self._started = True
+        self._last_received = time.monotonic()
+        self._update_timer()
+
+    def stop(self) -> None:
+        """Stop checking the connection."""
+        self._started = False
+        self._update_timer()
+
+    def _update_timer(self) -> None:
+        """Run the timer only when there is a connection to check."""
+        active = self._started and self.connected and self.heartbeat_interval > 0
+        if active and self._timer is None:
+            self._schedule_check()
+        elif not active and self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _schedule_check(self) -> None:
+        """Check again in a fraction of the shortest interval."""
+        delay = min(self.heartbeat_interval, self.deadline) / 2
+        self._timer = self._loop.call_later(delay, self._scheduled_check)
+
+    def _scheduled_check(self) -> None:
+        """Check the connection and schedule the next check."""
+        self._timer = None
+        self.check(time.monotonic())
+        self._update_timer()
+
+    def packet_received(self, now: float) -> None:
+        """Note that the connection carries packets."""
+        self._last_received = now
+        self._heartbeat_requested = None
+        self._heartbeat_sent = None
+
+    def heartbeat_written(self, now: float) -> None:
+        """Start the deadline when the query is written to the connection."""
+        if self._heartbeat_requested is not None and self._heartbeat_sent is None:
+            self._heartbeat_sent = now
+
+    def connection_changed(self, connected: bool, now: float) -> None:
+        """Measure how long it took to reconnect."""
+        if connected == self.connected:
+            return
+        self.connected = connected
+        self._heartbeat_requested = None
+        self._heartbeat_sent = None
+        self._update_timer()
+        if not connected:
+            self._disconnected_at = now
+            return
+        self._last_received = now
+        if self._disconnected_at is not None:
+            self.reconnects += 1
+            self.last_recover_time = now - self._disconnected_at
+            self._disconnected_at = None
+        self._failures = 0
+
+    def check(self, now: float) -> None:
+        """Send a heartbeat to an idle connection or declare a silent one dead."""
+        if not self.connected or self.heartbeat_interval <= 0:
+            return
+        if self._heartbeat_requested is not None:
+            sent = self._heartbeat_sent
+            if sent is None:
+                sent = self._heartbeat_requested + self.heartbeat_interval
+            if now - sent >= self.deadline:
+                self.detections += 1
+                self.last_detect_time = now - self._last_received
+                self.connection_changed(False, now)
+                self._declare_dead()
+        elif now - self._last_received >= self.heartbeat_interval:
+            if self._heartbeat():
+                self.heartbeats += 1
+                self._heartbeat_requested = now
+
+    async def async_backoff(self) -> None:
+        """Wait before a reconnect, longer after each attempt that failed."""
+        if self._disconnected_at is None:
+            return  # the first connection does not wait
+        limit = min(self.max_backoff, RECONNECT_BACKOFF_BASE * 2**self._failures)
+        self._failures += 1
+        await asyncio.sleep(random.uniform(0, limit))
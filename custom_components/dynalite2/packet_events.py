@@ -0,0 +1,89 @@
+"""Filter and rate limit the dynalite_packet events of a bridge."""
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from .const import (
+    CONF_AREA,
+    CONF_DIRECTION,
+    CONF_ENABLED,
+    CONF_OPCODE,
+    CONF_RATE_LIMIT,
+    CONF_SAMPLE,
+    PACKET_DIRECTION_IN,
+    SYNC_LOGICAL,
+)
+
+
+class PacketEventFilter:
+    """Decide which raw packets are fired as events on the bus."""
+
+    def __init__(self, config: dict[str, Any] | None = None) -> None:
+        """Initialize the filter. An empty config forwards every received packet."""
+        self.forwarded = 0
+        self.dropped = 0
+        self.configure(config)
+
+    def configure(self, config: dict[str, Any] | None) -> None:
+        """Apply a new config, keeping the counters."""
+        config = config or {}
+        self.enabled: bool = config.get(CONF_ENABLED, True)
+        self.directions: set[str] = set(
+            config.get(CONF_DIRECTION, [PACKET_DIRECTION_IN])
+        )
+        self.areas: set[int] | None = (
+            set(config[CONF_AREA]) if config.get(CONF_AREA) else None
+        )
+        self.opcodes: set[int] | None = (
+            set(config[CONF_OPCODE]) if config.get(CONF_OPCODE) else None
+        )
+        self.rate_limit: int = config.get(CONF_RATE_LIMIT, 0)
+        self.sample: int = config.get(CONF_SAMPLE, 1)
+        self._sample_count = 0
+        self._window_start = 0.0
+        self._window_count = 0
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Return the counters of the filter."""
+        return {"forwarded": self.forwarded, "dropped": self.dropped}
+
+    def wants(self, direction: str) -> bool:
+        """Return whether packets in the direction are considered at all."""
+        return self.enabled and direction in self.directions
+
+    def forward(self, packet: list[int], direction: str = PACKET_DIRECTION_IN) -> bool:
+        """Return whether an event should be fired for the packet and count it."""
+        if self._accept(packet, direction):
+            self.forwarded += 1
+            return True
+        self.dropped += 1
+        return False
+
+    def _accept(self, packet: list[int], direction: str) -> bool:
+        """Apply the filters in order of cost."""
+        if not self.wants(direction):
+            return False
+        if self.areas is not None or self.opcodes is not None:
+            # area and opcode only have a meaning in logical packets
+            if len(packet) < 4 or packet[0] != SYNC_LOGICAL:
+                return False
+            if self.areas is not None and packet[1] not in self.areas:
+                return False
+            if self.opcodes is not None and packet[3] not in self.opcodes:
+                return False
+        if self.sample > 1:
+            self._sample_count += 1
+            if self._sample_count < self.sample:
+                return False
+            self._sample_count = 0
+        if self.rate_limit:
+            now = time.monotonic()
+            if now - self._window_start >= 1.0:
+                self._window_start = now
+                self._window_count = 0
+            if self._window_count >= self.rate_limit:
+                return False
+            self._window_count += 1
+        return True
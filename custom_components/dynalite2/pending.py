@@ -0,0 +1,83 @@
+"""Devices of a bridge that wait for their platform to be set up."""
+from __future__ import annotations
+
+from typing import Any
+
+from dynalite_devices_lib.dynalite_devices import DynaliteBaseDevice
+
+from .const import LOGGER
+
+
+class PendingDevices:
+    """Queue of devices by platform and unique_id, emptied when it is replayed.
+
+    The unique_ids of all the devices that went through are kept, so a device
+    that the library reports again is not added twice. Discovered devices are
+    dropped with a warning once the queue holds max_size devices, and they are
+    forgotten so a later report adds them. Configured devices are always kept.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        """Initialize an empty queue."""
+        self.max_size = max_size
+        self._devices: dict[str, dict[str, DynaliteBaseDevice]] = {}
+        self._known: set[str] = set()
+        self.queued = 0
+        self.replayed = 0
+        self.deduped = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        """Return the number of devices in the queue."""
+        return sum(len(devices) for devices in self._devices.values())
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return the counters of the queue."""
+        return {
+            "pending": len(self),
+            "queued": self.queued,
+            "replayed": self.replayed,
+            "deduped": self.deduped,
+            "dropped": self.dropped,
+        }
+
+    def new_devices(
+        self, devices: list[DynaliteBaseDevice]
+    ) -> list[DynaliteBaseDevice]:
+        """Return the devices that were not seen before and remember them."""
+        result = []
+        for device in devices:
+            if device.unique_id in self._known:
+                self.deduped += 1
+                continue
+            self._known.add(device.unique_id)
+            result.append(device)
+        return result
+
+    def queue(
+        self, platform: str, devices: list[DynaliteBaseDevice], bounded: bool = True
+    ) -> None:
+        """Keep the devices until their platform is set up, up to max_size if bounded."""
+        platform_devices = self._devices.setdefault(platform, {})
+        size = len(self)
+        for device in devices:
+            if device.unique_id in platform_devices:
+                self.deduped += 1
+            elif bounded and size >= self.max_size:
+                self.dropped += 1
+                self._known.discard(device.unique_id)
+                LOGGER.warning(
+                    "Too many devices wait for their platform, dropping %s",
+                    device.unique_id,
+                )
+            else:
+                platform_devices[device.unique_id] = device
+                self.queued += 1
+                size += 1
+
+    def drain(self, platform: str) -> list[DynaliteBaseDevice]:
+        """Remove the devices of a platform from the queue and return them."""
+        devices = list(self._devices.pop(platform, {}).values())
+        self.replayed += len(devices)
+        return devices
@@ -0,0 +1,206 @@
+"""Poll the areas of a bridge as often as they change."""
+from __future__ import annotations
+
+from typing import Any, Callable, Hashable
+
+from .const import (
+    CONF_BUDGET,
+    CONF_ENABLED,
+    CONF_MAX_INTERVAL,
+    CONF_MIN_INTERVAL,
+    DEFAULT_POLL_BUDGET,
+    DEFAULT_POLL_MAX_INTERVAL,
+    DEFAULT_POLL_MIN_INTERVAL,
+    POLL_BACKOFF,
+    SYNC_LOGICAL,
+)
+
+OPCODE_REPORT_CHANNEL_LEVEL = 0x60
+OPCODE_REQUEST_CHANNEL_LEVEL = 0x61
+OPCODE_REPORT_PRESET = 0x62
+OPCODE_REQUEST_PRESET = 0x63
+OPCODE_LINEAR_PRESET = 0x65
+PRESET_OPCODES = {0: 0, 1: 1, 2: 2, 3: 3, 10: 4, 11: 5, 12: 6, 13: 7}
+OPCODE_SET_CHANNEL = range(0x80, 0x84)
+QUERY_OPCODES = [OPCODE_REQUEST_CHANNEL_LEVEL, OPCODE_REQUEST_PRESET]
+KEY_PRESET = "preset"
+KEY_CHANNEL = "channel"
+
+
+def classify_packet(
+    packet: list[int] | bytes,
+) -> tuple[int, Hashable | None, int | None, bool] | None:
+    """Return the area, what the packet is about, its value and if it is a reply.
+
+    Queries and packets that are not logical return None. Other packets that
+    change an area have no key and value.
+    """
+    if len(packet) < 8 or packet[0] != SYNC_LOGICAL:
+        return None
+    area, opcode = packet[1], packet[3]
+    if opcode in QUERY_OPCODES:
+        return None
+    if opcode == OPCODE_REPORT_PRESET:
+        return area, KEY_PRESET, packet[2] + 1, True
+    if opcode == OPCODE_REPORT_CHANNEL_LEVEL:
+        return area, (KEY_CHANNEL, packet[2] + 1), packet[4], True
+    if opcode in PRESET_OPCODES:
+        return area, KEY_PRESET, PRESET_OPCODES[opcode] + packet[5] * 8 + 1, False
+    if opcode == OPCODE_LINEAR_PRESET:
+        return area, KEY_PRESET, packet[2] + 1, False
+    if opcode in OPCODE_SET_CHANNEL:
+        channel = ((packet[4] + 1) % 256) * 4 + opcode - 0x7F
+        return area, (KEY_CHANNEL, channel), packet[2], False
+    return area, None, None, False
+
+
+class AreaPollState:
+    """What is known about polling an area."""
+
+    def __init__(self, interval: float, due: float) -> None:
+        """Initialize the state of an area that was just seen."""
+        self.interval = interval
+        self.due = due
+        self.polls = 0
+        self.changes = 0
+        self.pushes = 0
+        self.commands = 0
+        self.pushing = False
+        self.changed_since_poll = False
+        # Last preset and channel levels seen, to tell if a reply is a change
+        self.values: dict[Hashable, int] = {}
+
+
+class AdaptivePoller:
+    """Decide which areas to query, within a budget of packets per second.
+
+    Areas that changed since they were last polled, or where HA sent a
+    command or a cover moves, are polled at the minimum interval. Areas
+    whose polls find nothing back off up to the maximum interval. Areas that
+    report changes on the bus by themselves only need the maximum interval.
+    """
+
+    def __init__(
+        self,
+        config: dict[str, Any],
+        areas: Callable[[], set[int]],
+        poll_area: Callable[[int], int],
+        moving: Callable[[int], bool],
+    ) -> None:
+        """Initialize the poller with functions to find and query the areas.
+
+        poll_area queries an area and returns the number of packets it sent.
+        """
+        self._areas = areas
+        self._poll_area = poll_area
+        self._moving = moving
+        self._states: dict[int, AreaPollState] = {}
+        self._tokens = 0.0
+        self._last_tick: float | None = None
+        self.configure(config)
+
+    def configure(self, config: dict[str, Any]) -> None:
+        """Apply new settings and keep what was learnt about the areas."""
+        self.enabled: bool = config.get(CONF_ENABLED, True)
+        self.min_interval: float = config.get(
+            CONF_MIN_INTERVAL, DEFAULT_POLL_MIN_INTERVAL
+        )
+        self.max_interval: float = config.get(
+            CONF_MAX_INTERVAL, DEFAULT_POLL_MAX_INTERVAL
+        )
+        self.budget: float = config.get(CONF_BUDGET, DEFAULT_POLL_BUDGET)
+        for state in self._states.values():
+            state.interval = min(
+                max(state.interval, self.min_interval), self.max_interval
+            )
+
+    def _state(self, area: int, now: float) -> AreaPollState:
+        """Return the state of an area, first polled after the minimum interval."""
+        if area not in self._states:
+            self._states[area] = AreaPollState(
+                self.min_interval, now + self.min_interval
+            )
+        return self._states[area]
+
+    def tick(self, now: float) -> None:
+        """Poll the areas that are due, the longest overdue first."""
+        elapsed = 0.0 if self._last_tick is None else now - self._last_tick
+        self._last_tick = now
+        # unused budget is kept for a second at most, so polls do not burst
+        self._tokens = min(self._tokens + elapsed * self.budget, max(self.budget, 1))
+        if not self.enabled:
+            return
+        for area in self._areas():
+            state = self._state(area, now)
+            if self._moving(area) and state.interval > self.min_interval:
+                # a moving cover is followed at the minimum interval from now on
+                state.interval = self.min_interval
+                state.due = min(state.due, now)
+        due = sorted(
+            (state.due, area)
+            for area, state in self._states.items()
+            if state.due <= now
+        )
+        for _, area in due:
+            if self._tokens < 1:
+                return
+            self._poll(area, now)
+
+    def _poll(self, area: int, now: float) -> None:
+        """Query an area and back off if the last poll found nothing."""
+        state = self._states[area]
+        if state.polls > 0 and not state.changed_since_poll:
+            state.interval = min(state.interval * POLL_BACKOFF, self.max_interval)
+        if self._moving(area):
+            state.interval = self.min_interval
+        state.changed_since_poll = False
+        state.polls += 1
+        state.due = now + state.interval
+        self._tokens -= self._poll_area(area)
+
+    def handle_packet(self, packet: list[int] | bytes, now: float) -> None:
+        """Learn from a packet that was received from the bus."""
+        if (info := classify_packet(packet)) is None:
+            return
+        area, key, value, reply = info
+        state = self._state(area, now)
+        changed = key is not None and state.values.get(key, value) != value
+        if key is not None:
+            state.values[key] = value
+        if not reply:
+            # the area reports its own changes, the bus tells when it changes
+            state.pushes += 1
+            state.pushing = True
+            state.interval = self.max_interval
+            state.due = now + self.max_interval
+        elif changed and not state.changed_since_poll:
+            # the area changed without telling, so it is watched more closely
+            state.changed_since_poll = True
+            state.changes += 1
+            state.interval = self.min_interval
+            state.due = min(state.due, now + self.min_interval)
+
+    def handle_sent(self, packet: list[int] | bytes, now: float) -> None:
+        """Poll an area soon after HA sent it a command, unless it reports itself."""
+        if (info := classify_packet(packet)) is None:
+            return
+        state = self._state(info[0], now)
+        state.commands += 1
+        if not state.pushing:
+            state.interval = self.min_interval
+            state.due = min(state.due, now + self.min_interval)
+
+    @property
+    def stats(self) -> dict[int, dict[str, Any]]:
+        """Return the poll interval and how often polls found a change, by area."""
+        return {
+            area: {
+                "interval": state.interval,
+                "polls": state.polls,
+                "changes": state.changes,
+                "change_ratio": state.changes / state.polls if state.polls else 0.0,
+                "pushes": state.pushes,
+                "commands": state.commands,
+            }
+            for area, state in sorted(self._states.items())
+        }
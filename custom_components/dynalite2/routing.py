@@ -0,0 +1,66 @@
+"""Route service calls to the bridges that own an area."""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from homeassistant.core import callback
+
+if TYPE_CHECKING:
+    from .bridge import DynaliteBridge
+
+
+class BridgeRouter:
+    """Index of the bridges by host and by the areas on their bus."""
+
+    def __init__(self) -> None:
+        """Initialize the router."""
+        # dicts with None values are used as ordered sets
+        self._bridges: dict[DynaliteBridge, None] = {}
+        self._areas: dict[int, dict[DynaliteBridge, None]] = {}
+
+    @property
+    def bridges(self) -> list[DynaliteBridge]:
+        """Return all the bridges."""
+        return list(self._bridges)
+
+    @callback
+    def add_bridge(self, bridge: DynaliteBridge) -> None:
+        """Add a bridge and the areas it knows."""
+        self._bridges[bridge] = None
+        bridge.router = self
+        for area in bridge.areas:
+            self.add_area(bridge, area)
+
+    @callback
+    def remove_bridge(self, bridge: DynaliteBridge) -> None:
+        """Remove a bridge from the index."""
+        self._bridges.pop(bridge, None)
+        self._remove_areas(bridge)
+        bridge.router = None
+
+    @callback
+    def update_bridge(self, bridge: DynaliteBridge) -> None:
+        """Index the areas of a bridge again, after its config changed."""
+        self._remove_areas(bridge)
+        for area in bridge.areas:
+            self.add_area(bridge, area)
+
+    @callback
+    def add_area(self, bridge: DynaliteBridge, area: int) -> None:
+        """Add an area that was configured or discovered on a bridge."""
+        self._areas.setdefault(area, {})[bridge] = None
+
+    def _remove_areas(self, bridge: DynaliteBridge) -> None:
+        """Remove a bridge from all the areas."""
+        for area, bridges in list(self._areas.items()):
+            bridges.pop(bridge, None)
+            if not bridges:
+                del self._areas[area]
+
+    def bridges_for_host(self, host: str) -> list[DynaliteBridge]:
+        """Return the bridges of a host."""
+        return [bridge for bridge in self._bridges if bridge.host == host]
+
+    def bridges_for_area(self, area: int) -> list[DynaliteBridge]:
+        """Return the bridges that own an area, all of them if no bridge knows it."""
+        return list(self._areas.get(area, self._bridges))
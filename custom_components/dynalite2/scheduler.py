@@ -0,0 +1,170 @@
+"""Queue, coalesce and pace the commands that a bridge sends to the bus."""
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+import time
+from typing import Any, Callable, Hashable
+
+from .const import LOGGER
+
+LANE_INTERACTIVE = "interactive"
+LANE_POLL = "poll"
+# Lanes in order of priority, a lane is only sent when the ones before are empty
+LANES = [LANE_INTERACTIVE, LANE_POLL]
+
+# Commands of the library that are scheduled, with their lane and the number of
+# leading arguments that say what they act on. A later command for the same
+# target replaces one that was not sent yet.
+SCHEDULED_COMMANDS = {
+    "set_channel_level": (LANE_INTERACTIVE, 2),  # area, channel
+    "select_preset": (LANE_INTERACTIVE, 1),  # area
+    "request_area_preset": (LANE_POLL, 2),  # area, query channel
+    "request_channel_level": (LANE_POLL, 2),  # area, channel
+}
+
+# Queued commands by key, each with the time it was first queued
+CommandQueue = OrderedDict[Hashable, tuple[float, Callable[..., None], tuple]]
+
+
+def key_area(key: Hashable) -> Hashable:
+    """Return what a command acts on as a whole, the area of the library commands."""
+    if isinstance(key, tuple) and len(key) > 1:
+        return key[1]
+    return key
+
+
+class CommandScheduler:
+    """Send commands by priority, at most budget per second, last write wins."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, budget: float = 0) -> None:
+        """Initialize the scheduler. A budget of 0 sends without pacing."""
+        self._loop = loop
+        self.budget = budget
+        self._lanes: dict[str, CommandQueue] = {lane: OrderedDict() for lane in LANES}
+        # the key of the command that was queued last for each area, by lane
+        self._last_keys: dict[str, dict[Hashable, Hashable]] = {
+            lane: {} for lane in LANES
+        }
+        self._timer: asyncio.TimerHandle | None = None
+        self._last_sent = 0.0
+        self.sent = 0
+        self.coalesced = 0
+        self.last_wait = 0.0
+        self.max_wait = 0.0
+        self._total_wait = 0.0
+        # waits of the commands sent since the previous sample
+        self._sample_sent = 0
+        self._sample_total_wait = 0.0
+        self._sample_max_wait = 0.0
+
+    @property
+    def depth(self) -> int:
+        """Return the number of commands waiting to be sent."""
+        return sum(len(queue) for queue in self._lanes.values())
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return the measurements of the queue."""
+        return {
+            "depth": {lane: len(queue) for lane, queue in self._lanes.items()},
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "last_wait": self.last_wait,
+            "max_wait": self.max_wait,
+            "mean_wait": self._total_wait / self.sent if self.sent else 0.0,
+        }
+
+    def sample_waits(self) -> dict[str, float]:
+        """Return the mean and longest wait of the commands sent since the previous call."""
+        waits = {
+            "mean_wait": self._sample_total_wait / self._sample_sent
+            if self._sample_sent
+            else 0.0,
+            "max_wait": self._sample_max_wait,
+        }
+        self._sample_sent = 0
+        self._sample_total_wait = 0.0
+        self._sample_max_wait = 0.0
+        return waits
+
+    def wrap(self, name: str, func: Callable[..., None]) -> Callable[..., None]:
+        """Return a function that schedules a command of the library."""
+        lane, key_args = SCHEDULED_COMMANDS[name]
+
+        def scheduled(*args: Any) -> None:
+            self.schedule(lane, (name, *args[:key_args]), func, *args)
+
+        return scheduled
+
+    def schedule(
+        self, lane: str, key: Hashable, func: Callable[..., None], *args: Any
+    ) -> None:
+        """Queue a command, replacing a waiting one with the same key.
+
+        A replaced command keeps its place in the queue, so a target that keeps
+        getting new commands is not pushed behind the ones queued after it.
+        If another command for the same area was queued after it, the replaced
+        command moves to the back instead, so the commands of an area are sent
+        in the order they were given.
+        """
+        queue = self._lanes[lane]
+        last_keys = self._last_keys[lane]
+        area = key_area(key)
+        queued_at = time.monotonic()
+        replaced = queue.get(key)
+        if replaced is not None:
+            # the wait counts from the first command, the latest one is sent
+            self.coalesced += 1
+            queued_at = replaced[0]
+        queue[key] = (queued_at, func, args)
+        if replaced is not None and last_keys.get(area) != key:
+            queue.move_to_end(key)
+        last_keys[area] = key
+        if self._timer is None:
+            self._send()
+
+    def _send(self) -> None:
+        """Send the waiting commands until the budget says to wait."""
+        self._timer = None
+        while (lane := self._next_lane()) is not None:
+            queue = self._lanes[lane]
+            now = time.monotonic()
+            if self.budget > 0:
+                delay = self._last_sent + 1 / self.budget - now
+                if delay > 0:
+                    self._timer = self._loop.call_later(delay, self._send)
+                    return
+            key, (queued_at, func, args) = queue.popitem(last=False)
+            last_keys = self._last_keys[lane]
+            if last_keys.get(key_area(key)) == key:
+                del last_keys[key_area(key)]
+            self._last_sent = now
+            self.sent += 1
+            self.last_wait = now - queued_at
+            self.max_wait = max(self.max_wait, self.last_wait)
+            self._total_wait += self.last_wait
+            self._sample_sent += 1
+            self._sample_total_wait += self.last_wait
+            self._sample_max_wait = max(self._sample_max_wait, self.last_wait)
+            try:
+                func(*args)
+            except Exception:  # pylint: disable=broad-except
+                LOGGER.exception("Error sending command %s", key)
+
+    def _next_lane(self) -> str | None:
+        """Return the lane of the highest priority that has commands."""
+        for lane, queue in self._lanes.items():
+            if len(queue) > 0:
+                return lane
+        return None
+
+    def stop(self) -> None:
+        """Drop the waiting commands and stop the timer."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for queue in self._lanes.values():
+            queue.clear()
+        for last_keys in self._last_keys.values():
+            last_keys.clear()
@@ -0,0 +1,33 @@
+"""Support for the presets of a Dynalite area as a select."""
+
+from homeassistant.components.select import SelectEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .dynalitebase import DynaliteBase, async_setup_entry_base
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Record the async_add_entities function to add them later when received from Dynalite."""
+    async_setup_entry_base(
+        hass, config_entry, async_add_entities, "select", DynaliteSelect
+    )
+
+
+class DynaliteSelect(DynaliteBase, SelectEntity):
+    """Representation of the presets of a Dynalite area as a Home Assistant Select."""
+
+    def _update_attributes(self) -> None:
+        """Copy the presets of the area and the selected one."""
+        super()._update_attributes()
+        self._attr_options = self._device.options
+        self._attr_current_option = self._device.current_option
+
+    async def async_select_option(self, option: str) -> None:
+        """Select a preset."""
+        await self._device.async_select(option)
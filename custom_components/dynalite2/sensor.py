@@ -0,0 +1,146 @@
+"""Support for the performance counters of a Dynalite bridge as sensors."""
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Any
+
+from homeassistant.components.sensor import (
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import UnitOfDataRate, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity import DeviceInfo, EntityCategory
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .bridge import DynaliteBridge
+from .const import DIAGNOSTIC_SENSORS_INTERVAL, DOMAIN, LOGGER
+
+RATE = "1/s"
+
+SENSOR_TYPES = (
+    SensorEntityDescription(
+        key="packets_in_rate",
+        name="Packets received",
+        native_unit_of_measurement=RATE,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    SensorEntityDescription(
+        key="packets_out_rate",
+        name="Packets sent",
+        native_unit_of_measurement=RATE,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    SensorEntityDescription(
+        key="bytes_rate",
+        name="Bus traffic",
+        native_unit_of_measurement=UnitOfDataRate.BYTES_PER_SECOND,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    SensorEntityDescription(
+        key="presets_rate",
+        name="Preset notifications",
+        native_unit_of_measurement=RATE,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    SensorEntityDescription(
+        key="state_writes_rate",
+        name="State writes",
+        native_unit_of_measurement=RATE,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    SensorEntityDescription(
+        key="fanout_time",
+        name="Availability fan-out time",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    SensorEntityDescription(
+        key="queue_depth",
+        name="Command queue depth",
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    SensorEntityDescription(
+        key="mean_wait",
+        name="Command mean wait",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    SensorEntityDescription(
+        key="max_wait",
+        name="Command max wait",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    SensorEntityDescription(
+        key="reconnects",
+        name="Reconnects",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Add the sensors of the bridge if they are turned on in the options."""
+    bridge: DynaliteBridge = hass.data[DOMAIN][config_entry.entry_id]
+    if not bridge.diagnostic_sensors:
+        return
+    LOGGER.debug("Setting up sensors of host %s", bridge.host)
+    entities = [
+        DynalitePerformanceSensor(bridge, description) for description in SENSOR_TYPES
+    ]
+    async_add_entities(entities)
+    # the first sample starts the rates from here
+    bridge.performance_stats()
+
+    @callback
+    def async_update_sensors(_now: Any = None) -> None:
+        stats = bridge.performance_stats()
+        for entity in entities:
+            entity.async_update_value(stats)
+
+    config_entry.async_on_unload(
+        async_track_time_interval(
+            hass,
+            async_update_sensors,
+            timedelta(seconds=DIAGNOSTIC_SENSORS_INTERVAL),
+        )
+    )
+
+
+class DynalitePerformanceSensor(SensorEntity):
+    """A counter of the work that a Dynalite bridge does.
+
+    The values are pushed by a timer of the platform, not read per packet.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_should_poll = False
+
+    def __init__(
+        self, bridge: DynaliteBridge, description: SensorEntityDescription
+    ) -> None:
+        """Initialize the sensor of a counter of the bridge."""
+        self.entity_description = description
+        self._attr_unique_id = f"dynalite_{bridge.host}_{description.key}"
+        self._attr_name = f"Dynalite {bridge.host} {description.name}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, bridge.host)},
+            name=f"Dynalite {bridge.host}",
+            manufacturer="Dynalite",
+        )
+
+    @callback
+    def async_update_value(self, stats: dict[str, float]) -> None:
+        """Write the value of the counter from the stats of the bridge."""
+        value = stats[self.entity_description.key]
+        self._attr_native_value = round(value, 3) if isinstance(value, float) else value
+        if self.hass is not None:
+            self.async_write_ha_state()
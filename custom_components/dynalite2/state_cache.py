@@ -0,0 +1,115 @@
+"""Keep the last known state of the devices of a bridge across restarts."""
+from __future__ import annotations
+
+from typing import Any
+
+from dynalite_devices_lib.dynalite_devices import DynaliteDevices
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    LOGGER,
+    STATE_CACHE_SAVE_DELAY,
+    STATE_CACHE_STORAGE_KEY,
+    STATE_CACHE_STORAGE_VERSION,
+)
+
+KEY_COVERS = "covers"
+KEY_LEVELS = "levels"
+KEY_PRESETS = "presets"
+
+# The library has no API to read or set the state of its devices, so the
+# private dicts of the devices it created are used
+# pylint: disable=protected-access
+
+
+def state_cache_store(hass: HomeAssistant, host: str, port: int) -> Store:
+    """Return the Store of the state of the bridge at a host and port."""
+    return Store(
+        hass, STATE_CACHE_STORAGE_VERSION, f"{STATE_CACHE_STORAGE_KEY}.{host}.{port}"
+    )
+
+
+def level_to_byte(level: float) -> int:
+    """Return a level from 0 to 1 in the 0 to 254 steps of the bus."""
+    return round(level * 254)
+
+
+class StateCache:
+    """Save the levels, presets and cover positions of a bridge in a Store.
+
+    Levels are kept as a list per area indexed by channel, with None for the
+    channels that are not known, so a large site is a few kilobytes of JSON.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        host: str,
+        port: int,
+        dynalite_devices: DynaliteDevices,
+    ) -> None:
+        """Initialize the cache of the devices of a bridge."""
+        self._store = state_cache_store(hass, host, port)
+        self._dynalite_devices = dynalite_devices
+        self._save_scheduled = False
+        # nothing is saved before the saved state was read
+        self._loaded = False
+        self.restored = 0
+
+    async def async_restore(self) -> None:
+        """Load the saved state and set it in the devices of the library."""
+        data = await self._store.async_load()
+        self._loaded = True
+        if not isinstance(data, dict):
+            return
+        channels = self._dynalite_devices._added_channels
+        presets = self._dynalite_devices._added_presets
+        covers = self._dynalite_devices._added_time_covers
+        for area, levels in data.get(KEY_LEVELS, {}).items():
+            area_channels = channels.get(int(area), {})
+            for index, level in enumerate(levels):
+                if level is not None and (device := area_channels.get(index + 1)):
+                    device.update_level(level / 254, level / 254)
+                    self.restored += 1
+        for area, preset in data.get(KEY_PRESETS, {}).items():
+            if device := presets.get(int(area), {}).get(preset):
+                device.set_level(1)
+                self.restored += 1
+        for area, position in data.get(KEY_COVERS, {}).items():
+            if device := covers.get(int(area)):
+                device._current_position = position
+                device._initialized = True
+                self.restored += 1
+        LOGGER.debug("Restored the state of %s devices", self.restored)
+
+    @callback
+    def schedule_save(self) -> None:
+        """Save the state after a delay, with the changes made until then."""
+        if self._save_scheduled or not self._loaded:
+            return
+        self._save_scheduled = True
+        self._store.async_delay_save(self._data_to_save, STATE_CACHE_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the state of the devices of the library."""
+        self._save_scheduled = False
+        levels: dict[str, list[int | None]] = {}
+        for area, area_channels in self._dynalite_devices._added_channels.items():
+            area_levels: list[int | None] = [None] * max(area_channels, default=0)
+            for channel, device in area_channels.items():
+                area_levels[channel - 1] = level_to_byte(device._level)
+            levels[str(area)] = area_levels
+        presets = {
+            str(area): preset
+            for area, area_presets in self._dynalite_devices._added_presets.items()
+            for preset, device in area_presets.items()
+            if device.is_on
+        }
+        covers = {
+            str(area): device._current_position
+            for area, device in self._dynalite_devices._added_time_covers.items()
+            if device._initialized
+        }
+        return {KEY_LEVELS: levels, KEY_PRESETS: presets, KEY_COVERS: covers}
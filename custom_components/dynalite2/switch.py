@@ -22,10 +22,10 @@ async def async_setup_entry(
 class DynaliteSwitch(DynaliteBase, SwitchEntity):
     """Representation of a Dynalite Channel as a Home Assistant Switch."""
 
-    @property
-    def is_on(self) -> bool:
-        """Return true if switch is on."""
-        return self._device.is_on
+    def _update_attributes(self) -> None:
+        """Copy the state of the channel or preset."""
+        super()._update_attributes()
+        self._attr_is_on = self._device.is_on
 
     async def async_turn_on(self, **kwargs) -> None:
         """Turn the switch on."""
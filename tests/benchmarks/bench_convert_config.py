@@ -0,0 +1,37 @@
+"""Benchmark the conversion of large configs."""
+from homeassistant.components import dynalite
+
+from custom_components.dynalite2.convert_config import (
+    _convert_config,
+    clear_convert_cache,
+    convert_config,
+)
+
+from .common import Timer, create_synthetic_options, report
+
+NUM_AREAS = 2000
+NUM_CHANNELS = 8
+NUM_PRESETS = 4
+ROUNDS = 20
+
+
+def test_bench_convert_config():
+    """Compare uncached conversion with a cache hit for an unchanged entry."""
+    data = {dynalite.CONF_HOST: "1.2.3.4", dynalite.CONF_PORT: 12345}
+    options = create_synthetic_options(NUM_AREAS, NUM_CHANNELS, NUM_PRESETS, 10)
+    clear_convert_cache()
+    with Timer() as uncached_timer:
+        for _ in range(ROUNDS):
+            _convert_config(data, options)
+    first = convert_config(data, options)
+    with Timer() as cached_timer:
+        for _ in range(ROUNDS):
+            assert convert_config(data, options) is first
+    clear_convert_cache()
+    report(
+        f"convert_config - {NUM_AREAS} areas x {NUM_CHANNELS} channels",
+        {
+            "uncached_seconds_per_call": uncached_timer.elapsed / ROUNDS,
+            "cached_seconds_per_call": cached_timer.elapsed / ROUNDS,
+        },
+    )
@@ -0,0 +1,40 @@
+"""Benchmark replayed production traffic patterns."""
+from homeassistant.const import CONF_NAME
+
+from custom_components.dynalite2.const import CONF_AREA, CONF_CHANNEL
+
+from ..common import create_bridge_with_library
+from ..replay import PacketReplay, evening_scenes, morning_all_on
+from .common import report
+
+NUM_AREAS = 50
+CHANNELS = list(range(1, 9))
+
+
+def create_options():
+    """Create a config with areas of channels."""
+    return {
+        CONF_AREA: {
+            str(area): {
+                CONF_NAME: f"Area {area}",
+                CONF_CHANNEL: {str(channel): {} for channel in CHANNELS},
+            }
+            for area in range(1, NUM_AREAS + 1)
+        }
+    }
+
+
+async def test_bench_replay_morning(hass, enable_custom_integrations):
+    """Replay the morning all on as fast as possible."""
+    bridge = await create_bridge_with_library(hass, create_options())
+    packets = morning_all_on(list(range(1, NUM_AREAS + 1)), CHANNELS)
+    result = await PacketReplay(hass, bridge).async_replay(packets)
+    report(f"replay morning all on - {NUM_AREAS} areas x {len(CHANNELS)}", result)
+
+
+async def test_bench_replay_evening(hass, enable_custom_integrations):
+    """Replay evening scene changes at 10 times the original speed."""
+    bridge = await create_bridge_with_library(hass, create_options())
+    packets = evening_scenes(list(range(1, NUM_AREAS + 1)), [1, 2, 3, 4])
+    result = await PacketReplay(hass, bridge).async_replay(packets, speed=10.0)
+    report(f"replay evening scenes - {NUM_AREAS} areas", result)
@@ -0,0 +1,125 @@
+"""Benchmark entry setup, entity creation and update throughput at scale."""
+import time
+import tracemalloc
+from unittest.mock import patch
+
+from homeassistant.components import dynalite
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.dynalite2.bridge import DynaliteBridge
+
+from ..common import DOMAIN
+from .common import Timer, count_tasks, create_synthetic_options, report
+
+NUM_PRESETS = 4
+COVER_EVERY = 10  # every tenth area is a time cover
+UPDATE_ROUNDS = 5
+SCALES = [(10, 8), (100, 8), (250, 16)]  # areas x channels per area
+
+
+def timed(method, timings, key):
+    """Wrap a bridge method so the time spent in it is added to the timings."""
+
+    def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            timings[key] += time.perf_counter() - start
+
+    return wrapper
+
+
+async def setup_synthetic_entry(hass, gateway, num_areas, num_channels):
+    """Set up a synthetic site and return the bridge, its devices and the timings."""
+    options = create_synthetic_options(
+        num_areas, num_channels, NUM_PRESETS, COVER_EVERY
+    )
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={dynalite.CONF_HOST: gateway.host, dynalite.CONF_PORT: gateway.port},
+        options=options,
+        version=2,
+    )
+    entry.add_to_hass(hass)
+    timings = {"add_devices": 0.0}
+    added_devices = []
+    add_devices = timed(
+        DynaliteBridge.add_devices_when_registered, timings, "add_devices"
+    )
+    register_add_devices = timed(
+        DynaliteBridge.register_add_devices, timings, "add_devices"
+    )
+
+    def add_devices_when_registered(self, devices):
+        added_devices.extend(devices)
+        add_devices(self, devices)
+
+    with patch.object(
+        DynaliteBridge, "add_devices_when_registered", add_devices_when_registered
+    ), patch.object(
+        DynaliteBridge, "register_add_devices", register_add_devices
+    ), Timer() as setup_timer:
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+    timings["setup"] = setup_timer.elapsed
+    bridge = hass.data[DOMAIN][entry.entry_id]
+    assert len(bridge._entity_updates) == len(added_devices)
+    return bridge, added_devices, timings
+
+
+@pytest.mark.parametrize("num_areas, num_channels", SCALES)
+async def test_bench_scale(
+    hass, enable_custom_integrations, gateway, num_areas, num_channels
+):
+    """Set up a synthetic site against the gateway simulator and update every device."""
+    bridge, devices, timings = await setup_synthetic_entry(
+        hass, gateway, num_areas, num_channels
+    )
+    with count_tasks(hass) as tasks, Timer() as update_timer:
+        for _ in range(UPDATE_ROUNDS):
+            for device in devices:
+                bridge.update_device(device)
+            await hass.async_block_till_done()
+    num_updates = UPDATE_ROUNDS * len(devices)
+    assert tasks["state_writes"] == num_updates
+
+    report(
+        f"scale - {num_areas} areas x {num_channels} channels",
+        {
+            "areas": num_areas,
+            "channels_per_area": num_channels,
+            "presets_per_area": NUM_PRESETS,
+            "entities": len(devices),
+            "setup_seconds": timings["setup"],
+            "add_devices_seconds": timings["add_devices"],
+            "updates": num_updates,
+            "update_seconds": update_timer.elapsed,
+            "updates_per_second": num_updates / update_timer.elapsed,
+        },
+    )
+
+
+@pytest.mark.parametrize("num_areas, num_channels", SCALES)
+async def test_bench_scale_memory(
+    hass, enable_custom_integrations, gateway, num_areas, num_channels
+):
+    """Measure the memory that a synthetic site allocates per entity."""
+    # tracing slows the setup down, so this is kept apart from the timings
+    tracemalloc.start()
+    try:
+        _, devices, _ = await setup_synthetic_entry(
+            hass, gateway, num_areas, num_channels
+        )
+        memory, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    report(
+        f"scale memory - {num_areas} areas x {num_channels} channels",
+        {
+            "entities": len(devices),
+            "memory_bytes": memory,
+            "memory_per_entity_bytes": memory // len(devices),
+        },
+    )
@@ -0,0 +1,49 @@
+"""Benchmark the cost of a state write per entity."""
+from typing import Any
+
+from .common import Timer, create_mock_channels, get_entities, report, setup_mock_bridge
+
+NUM_CHANNELS = 500
+WRITES_PER_ENTITY = 20
+
+
+class CountingDevice:
+    """Count the attributes that are read from a device."""
+
+    def __init__(self, device: Any) -> None:
+        """Wrap the device."""
+        self.__dict__["_device"] = device
+        self.__dict__["reads"] = 0
+
+    def __getattr__(self, name: str) -> Any:
+        """Count the read and return the attribute of the device."""
+        self.__dict__["reads"] += 1
+        return getattr(self._device, name)
+
+
+async def test_bench_state_write(hass, enable_custom_integrations):
+    """Measure a state write alone and with the copy of the device attributes."""
+    devices = create_mock_channels(NUM_CHANNELS)
+    await setup_mock_bridge(hass, devices)
+    entities = get_entities(hass, "light", devices)
+    counters = []
+    for entity in entities:
+        entity._device = CountingDevice(entity._device)
+        counters.append(entity._device)
+    num_writes = NUM_CHANNELS * WRITES_PER_ENTITY
+    results = {}
+    for label, write in (
+        ("write", lambda entity: entity.async_write_ha_state()),
+        ("update_and_write", lambda entity: entity._async_device_updated()),
+    ):
+        for counter in counters:
+            counter.reads = 0
+        with Timer() as timer:
+            for _ in range(WRITES_PER_ENTITY):
+                for entity in entities:
+                    write(entity)
+        results[f"{label}_device_reads"] = sum(c.reads for c in counters) / num_writes
+        results[f"{label}_us_per_entity"] = timer.elapsed / num_writes * 1e6
+    report(f"state write - {NUM_CHANNELS} lights x {WRITES_PER_ENTITY}", results)
+    # the state write reads the cached attributes only
+    assert results["write_device_reads"] == 0
@@ -0,0 +1,71 @@
+"""Benchmark a burst of device updates through the bridge."""
+
+from .common import (
+    Timer,
+    count_tasks,
+    create_mock_channels,
+    get_entities,
+    report,
+    setup_mock_bridge,
+)
+
+NUM_CHANNELS = 500
+UPDATES_PER_CHANNEL = 3  # a fade reports a channel several times
+NUM_AVAILABILITY_ENTITIES = 3000
+
+
+async def test_bench_update_burst(hass, enable_custom_integrations):
+    """Compare a per-entity scheduled update with the coalesced bridge flush."""
+    devices = create_mock_channels(NUM_CHANNELS)
+    bridge, _ = await setup_mock_bridge(hass, devices)
+    entities = get_entities(hass, "light", devices)
+    assert len(entities) == NUM_CHANNELS
+
+    # Before: every update scheduled its own state write task, which is what
+    # async_schedule_update_ha_state did on the Home Assistant versions we support
+    with count_tasks(hass) as before_tasks, Timer() as before_timer:
+        for _ in range(UPDATES_PER_CHANNEL):
+            for entity in entities:
+                hass.async_create_task(entity.async_update_ha_state())
+        await hass.async_block_till_done()
+
+    # After: updates go through the bridge and are flushed once per iteration
+    with count_tasks(hass) as after_tasks, Timer() as after_timer:
+        for _ in range(UPDATES_PER_CHANNEL):
+            for device in devices:
+                bridge.update_device(device)
+        await hass.async_block_till_done()
+
+    report(
+        f"update burst - {NUM_CHANNELS} channels x {UPDATES_PER_CHANNEL} updates",
+        {
+            "before_tasks": before_tasks["tasks"],
+            "before_state_writes": before_tasks["state_writes"],
+            "before_seconds": before_timer.elapsed,
+            "after_tasks": after_tasks["tasks"],
+            "after_state_writes": after_tasks["state_writes"],
+            "after_seconds": after_timer.elapsed,
+        },
+    )
+    assert after_tasks["tasks"] == 0
+    assert after_tasks["state_writes"] == NUM_CHANNELS
+
+
+async def test_bench_availability_fanout(hass, enable_custom_integrations):
+    """Measure a gateway disconnect and reconnect on a large bridge."""
+    devices = create_mock_channels(NUM_AVAILABILITY_ENTITIES)
+    bridge, _ = await setup_mock_bridge(hass, devices)
+    results = {}
+    for available in (False, True):
+        for device in devices:
+            device.available = available
+        with count_tasks(hass) as tasks, Timer() as timer:
+            bridge.update_device()
+            await hass.async_block_till_done()
+        label = "reconnect" if available else "disconnect"
+        results[f"{label}_tasks"] = tasks["tasks"]
+        results[f"{label}_state_writes"] = tasks["state_writes"]
+        results[f"{label}_seconds"] = timer.elapsed
+        results[f"{label}_fanout_seconds"] = bridge.availability_fanout_time
+        assert tasks["state_writes"] == NUM_AVAILABILITY_ENTITIES
+    report(f"availability fan-out - {NUM_AVAILABILITY_ENTITIES} entities", results)
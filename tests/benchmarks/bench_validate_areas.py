@@ -0,0 +1,49 @@
+"""Benchmark the validation of a large YAML area config."""
+import homeassistant.components.dynalite.const as dynalite
+from homeassistant.const import CONF_NAME
+
+from custom_components.dynalite2 import AREA_SCHEMA, validate_areas_single_pass
+
+from .common import Timer, report
+
+NUM_AREAS = 5000
+NUM_CHANNELS = 8
+NUM_PRESETS = 4
+
+
+def create_yaml_areas():
+    """Create areas as the YAML loader returns them, with integer keys."""
+    areas = {}
+    for area in range(1, NUM_AREAS + 1):
+        areas[area] = {
+            CONF_NAME: f"Area {area}",
+            dynalite.CONF_FADE: 2,
+            dynalite.CONF_CHANNEL: {
+                channel: {CONF_NAME: f"Channel {channel}"}
+                for channel in range(1, NUM_CHANNELS + 1)
+            },
+            dynalite.CONF_PRESET: {
+                preset: {CONF_NAME: f"Preset {preset}"}
+                for preset in range(1, NUM_PRESETS + 1)
+            },
+        }
+        if area % 10 == 0:
+            areas[area][dynalite.CONF_TEMPLATE] = dynalite.CONF_TIME_COVER
+            areas[area][dynalite.CONF_DURATION] = 30
+    return areas
+
+
+def test_bench_validate_areas():
+    """Compare the schema and the single pass."""
+    areas = create_yaml_areas()
+    with Timer() as schema_timer:
+        expected = AREA_SCHEMA(areas)
+    with Timer() as single_pass_timer:
+        assert validate_areas_single_pass(areas) == expected
+    report(
+        f"validate areas - {NUM_AREAS} areas",
+        {
+            "schema_seconds": schema_timer.elapsed,
+            "single_pass_seconds": single_pass_timer.elapsed,
+        },
+    )
@@ -0,0 +1,160 @@
+"""Common functions for benchmarks.
+
+The benchmark modules are not collected by default. Run them explicitly, e.g.
+``pytest -s --no-cov -o asyncio_mode=auto tests/benchmarks/bench_update_device.py``.
+The results are also merged into a JSON file, ``benchmark_results.json`` or the
+path in ``DYNALITE_BENCHMARK_RESULTS``, so runs can be compared between releases.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable
+from contextlib import contextmanager
+import json
+import os
+from pathlib import Path
+import platform as py_platform
+import time
+from typing import Any
+from unittest.mock import AsyncMock, Mock, patch
+
+from dynalite_devices_lib.light import DynaliteChannelLightDevice
+from homeassistant.components import dynalite
+from homeassistant.const import CONF_TYPE
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from ..common import DOMAIN
+
+RESULTS_FILE = os.environ.get("DYNALITE_BENCHMARK_RESULTS", "benchmark_results.json")
+MANIFEST = Path(__file__).parents[2] / "custom_components" / DOMAIN / "manifest.json"
+
+
+def create_mock_channels(
+    num_channels: int, platform: str = "light", spec: Any = DynaliteChannelLightDevice
+) -> list[Mock]:
+    """Create mock channel devices with distinct unique ids and names."""
+    devices = []
+    for index in range(num_channels):
+        device = Mock(spec=spec)
+        device.category = platform
+        device.unique_id = f"dynalite_area_{index // 8 + 1}_channel_{index % 8 + 1}"
+        device.name = f"bench {index}"
+        device.available = True
+        device.is_on = False
+        device.brightness = 0
+        devices.append(device)
+    return devices
+
+
+async def setup_mock_bridge(hass, devices: list[Mock]) -> tuple[Any, Callable]:
+    """Set up an entry with a mocked library and add the devices as entities."""
+    host = "1.2.3.4"
+    entry = MockConfigEntry(domain=DOMAIN, data={dynalite.CONF_HOST: host})
+    entry.add_to_hass(hass)
+    with patch("custom_components.dynalite2.bridge.DynaliteDevices") as mock_dyn_dev:
+        mock_dyn_dev().async_setup = AsyncMock(return_value=True)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        new_device_func = mock_dyn_dev.mock_calls[1][2]["new_device_func"]
+        new_device_func(devices)
+    await hass.async_block_till_done()
+    return hass.data[DOMAIN][entry.entry_id], new_device_func
+
+
+def create_synthetic_options(
+    num_areas: int, num_channels: int, num_presets: int, cover_every: int = 0
+) -> dict[str, Any]:
+    """Create entry options for areas of channels and presets, some as time covers."""
+    areas = {}
+    for area in range(1, num_areas + 1):
+        area_config: dict[str, Any] = {
+            dynalite.CONF_NAME: f"Area {area}",
+            dynalite.CONF_CHANNEL: {
+                str(channel): {
+                    dynalite.CONF_NAME: f"Channel {channel}",
+                    CONF_TYPE: "light",
+                }
+                for channel in range(1, num_channels + 1)
+            },
+            dynalite.CONF_PRESET: {
+                str(preset): {dynalite.CONF_NAME: f"Preset {preset}"}
+                for preset in range(1, num_presets + 1)
+            },
+        }
+        if cover_every and area % cover_every == 0:
+            area_config[dynalite.CONF_TEMPLATE] = "time_cover"
+        areas[str(area)] = area_config
+    return {dynalite.CONF_AREA: areas}
+
+
+def get_entities(hass, platform: str, devices: list[Mock]) -> list[Any]:
+    """Return the entity objects that were created for the devices."""
+    ent_reg = er.async_get(hass)
+    component = hass.data[platform]
+    entities = []
+    for device in devices:
+        entity_id = ent_reg.async_get_entity_id(platform, DOMAIN, device.unique_id)
+        entities.append(component.get_entity(entity_id))
+    return entities
+
+
+@contextmanager
+def count_tasks(hass):
+    """Count the tasks and state writes that hass performs inside the block."""
+    counter = {"tasks": 0, "state_writes": 0}
+    orig_create_task = hass.async_create_task
+    orig_set_state = hass.states.async_set
+
+    def counting_create_task(*args, **kwargs):
+        counter["tasks"] += 1
+        return orig_create_task(*args, **kwargs)
+
+    def counting_set_state(*args, **kwargs):
+        counter["state_writes"] += 1
+        return orig_set_state(*args, **kwargs)
+
+    with patch.object(hass, "async_create_task", counting_create_task), patch.object(
+        hass.states, "async_set", counting_set_state
+    ):
+        yield counter
+
+
+class Timer:
+    """Measure wall time of a block."""
+
+    def __init__(self) -> None:
+        """Initialize the timer."""
+        self.elapsed = 0.0
+        self._start = 0.0
+
+    def __enter__(self) -> Timer:
+        """Start the timer."""
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """Stop the timer."""
+        self.elapsed = time.perf_counter() - self._start
+
+
+def report(name: str, results: dict[str, Any]) -> None:
+    """Print the results of a benchmark and add them to the results file."""
+    print(f"\n{name}")
+    for key, value in results.items():
+        if isinstance(value, float):
+            print(f"  {key:<32} {value:.6f}")
+        else:
+            print(f"  {key:<32} {value}")
+    write_results(name, results)
+
+
+def write_results(name: str, results: dict[str, Any]) -> None:
+    """Merge the results of a benchmark into the JSON results file."""
+    path = Path(RESULTS_FILE)
+    data: dict[str, Any] = {"benchmarks": {}}
+    if path.exists():
+        data = json.loads(path.read_text())
+    data["version"] = json.loads(MANIFEST.read_text())["version"]
+    data["python"] = py_platform.python_version()
+    data["benchmarks"][name] = {**results, "timestamp": time.time()}
+    path.write_text(json.dumps(data, indent=2, sort_keys=True))
@@ -46,6 +46,32 @@ async def create_entity_from_device(hass, device):
     return mock_dyn_dev.mock_calls[1][2]["update_device_func"]
 
 
+async def create_bridge_with_library(hass, options=None, host="1.2.3.4"):
+    """Set up an entry with the real library, as if the gateway connected."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={dynalite.CONF_HOST: host},
+        options=options or {},
+        version=2,
+    )
+    entry.add_to_hass(hass)
+    with patch(
+        "custom_components.dynalite2.bridge.DynaliteDevices.async_setup",
+        return_value=True,
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+    bridge = hass.data[DOMAIN][entry.entry_id]
+    # what a successful connection would have set in the library
+    dynalite_devices = bridge.dynalite_devices
+    dynalite_devices._loop = hass.loop
+    dynalite_devices._dynalite._loop = hass.loop
+    dynalite_devices.connected = True
+    bridge.update_device()
+    await hass.async_block_till_done()
+    return bridge
+
+
 async def run_service_tests(hass, device, platform, services):
     """Run a series of service calls and check that the entity and device behave correctly."""
     for cur_item in services:
@@ -0,0 +1,48 @@
+"""Fixtures for the Dynalite tests."""
+import asyncio
+from unittest.mock import patch
+
+from homeassistant.config_entries import ConfigEntryState
+import pytest
+
+from .common import DOMAIN
+from .gateway import DynetGatewaySimulator
+
+
+@pytest.fixture(autouse=True)
+def probe_gateway(request):
+    """Let the config flow reach any gateway, unless the simulator is used."""
+    if "gateway" in request.fixturenames:
+        yield
+        return
+    with patch(
+        "custom_components.dynalite2.config_flow.async_probe_gateway",
+        return_value=True,
+    ):
+        yield
+
+
+@pytest.fixture
+async def hass(hass):
+    """Unload the entries that a test left loaded, so their timers stop."""
+    yield hass
+    await hass.async_block_till_done()
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        if entry.state is ConfigEntryState.LOADED:
+            await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+@pytest.fixture
+async def gateway(hass, socket_enabled):
+    """Run a gateway simulator and disconnect the bridges from it at the end."""
+    simulator = DynetGatewaySimulator()
+    await simulator.start()
+    yield simulator
+    resets = [
+        asyncio.create_task(bridge.dynalite_devices.async_reset())
+        for bridge in hass.data.get(DOMAIN, {}).values()
+        if bridge is not None
+    ]
+    await simulator.stop()
+    await asyncio.wait_for(asyncio.gather(*resets), 5)
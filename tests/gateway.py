@@ -0,0 +1,296 @@
+"""Local simulator of a Dynalite PDEG gateway.
+
+The simulator listens on localhost and models the areas, channels, presets,
+fades and time covers behind a gateway. It answers preset and channel level
+queries, echoes commands to the other connected clients as the DyNet bus
+would, and can inject latency, packet loss and disconnects.
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from typing import Callable
+
+from dynalite_devices_lib.dynet import DynetPacket
+
+SYNC_LOGICAL = 0x1C
+PRESET_OPCODES = {0: 0, 1: 1, 2: 2, 3: 3, 10: 4, 11: 5, 12: 6, 13: 7}
+OPCODE_SET_CHANNEL = range(128, 132)
+OPCODE_REQUEST_CHANNEL_LEVEL = 97
+OPCODE_REQUEST_PRESET = 99
+OPCODE_STOP_FADING = 118
+OPCODE_FADE_TO_LEVEL = 0x71
+
+
+def checksum(msg: list[int] | bytes) -> int:
+    """Calculate the checksum of the first 7 bytes of a packet."""
+    return -(sum(msg[:7]) % 256) & 0xFF
+
+
+class SimulatedChannel:
+    """A channel whose level fades linearly to a target."""
+
+    def __init__(self, level: float = 0.0) -> None:
+        """Initialize the channel."""
+        self._start_level = level
+        self.target = level
+        self._start_time = 0.0
+        self._fade = 0.0
+
+    def level(self, now: float | None = None) -> float:
+        """Return the actual level."""
+        now = time.monotonic() if now is None else now
+        if self._fade <= 0 or now >= self._start_time + self._fade:
+            return self.target
+        progress = (now - self._start_time) / self._fade
+        return self._start_level + (self.target - self._start_level) * progress
+
+    def set_level(self, target: float, fade: float) -> None:
+        """Start fading to a level."""
+        now = time.monotonic()
+        self._start_level = self.level(now)
+        self._start_time = now
+        self._fade = fade
+        self.target = target
+
+    def stop(self) -> None:
+        """Stop fading at the current level."""
+        self.set_level(self.level(), 0)
+
+
+class SimulatedCover:
+    """A time cover that moves with its open, close and stop presets."""
+
+    def __init__(
+        self, open_preset: int, close_preset: int, stop_preset: int, duration: float
+    ) -> None:
+        """Initialize the cover."""
+        self.open_preset = open_preset
+        self.close_preset = close_preset
+        self.stop_preset = stop_preset
+        self.duration = duration
+        self._start_position = 0.0
+        self._start_time = 0.0
+        self._direction = 0
+
+    def position(self, now: float | None = None) -> float:
+        """Return the position between 0 (closed) and 1 (open)."""
+        now = time.monotonic() if now is None else now
+        moved = self._direction * (now - self._start_time) / self.duration
+        return max(0.0, min(1.0, self._start_position + moved))
+
+    def select_preset(self, preset: int) -> None:
+        """Move or stop according to the preset."""
+        directions = {self.open_preset: 1, self.close_preset: -1, self.stop_preset: 0}
+        if preset in directions:
+            now = time.monotonic()
+            self._start_position = self.position(now)
+            self._start_time = now
+            self._direction = directions[preset]
+
+
+class SimulatedArea:
+    """An area with channels and presets that set channel levels."""
+
+    def __init__(
+        self,
+        channels: int = 0,
+        presets: dict[int, dict[int, float]] | None = None,
+        cover: SimulatedCover | None = None,
+    ) -> None:
+        """Initialize the area."""
+        self.channels = {
+            channel: SimulatedChannel() for channel in range(1, channels + 1)
+        }
+        self.presets = presets or {}
+        self.preset: int | None = None
+        self.cover = cover
+
+    def channel(self, channel: int) -> SimulatedChannel:
+        """Return a channel, creating it if it was not modelled."""
+        if channel not in self.channels:
+            self.channels[channel] = SimulatedChannel()
+        return self.channels[channel]
+
+    def select_preset(self, preset: int, fade: float) -> None:
+        """Select a preset and fade the channels to its levels."""
+        self.preset = preset
+        for channel, level in self.presets.get(preset, {}).items():
+            self.channel(channel).set_level(level, fade)
+        if self.cover:
+            self.cover.select_preset(preset)
+
+
+class DynetGatewaySimulator:
+    """Asyncio TCP server that behaves like a Dynalite gateway."""
+
+    def __init__(
+        self,
+        areas: dict[int, SimulatedArea] | None = None,
+        latency: float = 0.0,
+        packet_loss: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        """Initialize the simulator."""
+        self.areas = areas or {}
+        self.latency = latency
+        self.packet_loss = packet_loss
+        self.received: list[bytes] = []
+        self.port = 0
+        self._random = random.Random(seed)
+        self._server: asyncio.AbstractServer | None = None
+        self._writers: set[asyncio.StreamWriter] = set()
+
+    @property
+    def host(self) -> str:
+        """Return the host the simulator listens on."""
+        return "127.0.0.1"
+
+    @property
+    def clients(self) -> int:
+        """Return the number of connected clients."""
+        return len(self._writers)
+
+    async def start(self) -> None:
+        """Start listening, on the same port as before if restarted."""
+        self._server = await asyncio.start_server(
+            self._handle_client, self.host, self.port
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        """Stop listening and drop all the clients."""
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        await self.disconnect()
+
+    async def disconnect(self) -> None:
+        """Drop all the clients but keep listening."""
+        writers = list(self._writers)
+        self._writers.clear()
+        for writer in writers:
+            writer.close()
+        for writer in writers:
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    def area(self, area: int) -> SimulatedArea:
+        """Return an area, creating it if it was not modelled."""
+        if area not in self.areas:
+            self.areas[area] = SimulatedArea()
+        return self.areas[area]
+
+    def press_preset(self, area: int, preset: int, fade: float = 0.0) -> None:
+        """Select a preset from a panel on the bus."""
+        packet = DynetPacket.select_area_preset_packet(area, preset, fade)
+        self._apply(bytes(packet.msg))
+        self._broadcast(bytes(packet.msg))
+
+    def set_channel_level(
+        self, area: int, channel: int, level: float, fade: float = 0.0
+    ) -> None:
+        """Set a channel level from a device on the bus."""
+        packet = DynetPacket.set_channel_level_packet(area, channel, level, fade)
+        self._apply(bytes(packet.msg))
+        self._broadcast(bytes(packet.msg))
+
+    async def _handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Read the packets of a client until it disconnects."""
+        self._writers.add(writer)
+        buffer = b""
+        try:
+            while data := await reader.read(100):
+                buffer += data
+                while len(buffer) >= 8:
+                    if buffer[0] != SYNC_LOGICAL or checksum(buffer) != buffer[7]:
+                        buffer = buffer[1:]
+                        continue
+                    msg, buffer = buffer[:8], buffer[8:]
+                    self._receive(writer, msg)
+        except ConnectionError:
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    def _receive(self, writer: asyncio.StreamWriter, msg: bytes) -> None:
+        """Handle a packet that a client sent on the bus."""
+        if self.packet_loss and self._random.random() < self.packet_loss:
+            return
+        self.received.append(msg)
+        reply = self._apply(msg)
+        if reply:
+            self._send(writer, reply)
+        else:
+            self._broadcast(msg, exclude=writer)
+
+    def _apply(self, msg: bytes) -> bytes | None:
+        """Apply a packet to the model and return the reply for queries."""
+        area = self.area(msg[1])
+        opcode = msg[3]
+        if opcode in PRESET_OPCODES:
+            preset = PRESET_OPCODES[opcode] + msg[5] * 8 + 1
+            area.select_preset(preset, (msg[2] + msg[4] * 256) * 0.02)
+        elif opcode in OPCODE_SET_CHANNEL:
+            channel = ((msg[4] + 1) % 256) * 4 + opcode - 127
+            area.channel(channel).set_level((255 - msg[2]) / 254, msg[5] * 0.02)
+        elif opcode == OPCODE_FADE_TO_LEVEL:
+            channels = area.channels if msg[2] == 255 else [msg[2] + 1]
+            for channel in list(channels):
+                area.channel(channel).set_level((255 - msg[4]) / 254, msg[5] * 0.02)
+        elif opcode == OPCODE_STOP_FADING:
+            channels = area.channels if msg[2] == 255 else [msg[2] + 1]
+            for channel in list(channels):
+                area.channel(channel).stop()
+        elif opcode == OPCODE_REQUEST_PRESET:
+            if area.preset is None:
+                return None
+            return bytes(DynetPacket.report_area_preset_packet(msg[1], area.preset).msg)
+        elif opcode == OPCODE_REQUEST_CHANNEL_LEVEL:
+            channel = area.channel(msg[2] + 1)
+            return bytes(
+                DynetPacket.report_channel_level_packet(
+                    msg[1], msg[2] + 1, channel.target, channel.level()
+                ).msg
+            )
+        return None
+
+    def _send(self, writer: asyncio.StreamWriter, msg: bytes) -> None:
+        """Send a packet to a client, after the simulated latency."""
+        if self.packet_loss and self._random.random() < self.packet_loss:
+            return
+        if self.latency:
+            asyncio.get_running_loop().call_later(
+                self.latency, self._write, writer, msg
+            )
+        else:
+            self._write(writer, msg)
+
+    def _write(self, writer: asyncio.StreamWriter, msg: bytes) -> None:
+        """Write to a client that may have disconnected in the meantime."""
+        if writer in self._writers:
+            writer.write(msg)
+
+    def _broadcast(
+        self, msg: bytes, exclude: asyncio.StreamWriter | None = None
+    ) -> None:
+        """Send a packet to all the clients, as the bus would."""
+        for writer in list(self._writers):
+            if writer is not exclude:
+                self._send(writer, msg)
+
+
+async def async_wait_for(condition: Callable[[], bool], timeout: float = 2.0) -> None:
+    """Wait until a condition holds, polling while the event loop runs."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise asyncio.TimeoutError
+        await asyncio.sleep(0.01)
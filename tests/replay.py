@@ -0,0 +1,165 @@
+"""Replay DyNet traffic through a real bridge and its entities.
+
+Packets are fed into the library of a bridge created with
+create_bridge_with_library, so they go through the real parsing, the real
+DynaliteDevices and the bridge to the light, switch and cover entities.
+"""
+from __future__ import annotations
+
+import asyncio
+import re
+import statistics
+import time
+from typing import Any
+from unittest.mock import patch
+
+from dynalite_devices_lib.dynet import DynetPacket
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.dynalite2.capture import DIRECTION_IN
+
+LOOP_LAG_INTERVAL = 0.005
+UNIQUE_ID_AREA = re.compile(r"dynalite_area_(\d+)_")
+
+
+def morning_all_on(
+    areas: list[int], channels: list[int], interval: float = 0.01
+) -> list[tuple[float, bytes]]:
+    """Every area recalls preset 1 and its channels report fading up."""
+    packets = []
+    timestamp = 0.0
+    for area in areas:
+        packets.append(
+            (timestamp, bytes(DynetPacket.select_area_preset_packet(area, 1, 2).msg))
+        )
+        timestamp += interval
+    for actual_level in (0.5, 1.0):
+        for area in areas:
+            for channel in channels:
+                packet = DynetPacket.report_channel_level_packet(
+                    area, channel, 1.0, actual_level
+                )
+                packets.append((timestamp, bytes(packet.msg)))
+                timestamp += interval
+    return packets
+
+
+def evening_scenes(
+    areas: list[int], presets: list[int], rounds: int = 3, interval: float = 0.05
+) -> list[tuple[float, bytes]]:
+    """Areas go through scene changes one after the other."""
+    packets = []
+    timestamp = 0.0
+    for scene in range(rounds):
+        for area in areas:
+            preset = presets[(scene + area) % len(presets)]
+            packet = DynetPacket.select_area_preset_packet(area, preset, 0)
+            packets.append((timestamp, bytes(packet.msg)))
+            timestamp += interval
+    return packets
+
+
+def packets_from_capture(
+    records: list[tuple[float, int, bytes]]
+) -> list[tuple[float, bytes]]:
+    """Take the received packets of a capture file, relative to the first one."""
+    received = [record for record in records if record[1] == DIRECTION_IN]
+    if not received:
+        return []
+    start = received[0][0]
+    return [(timestamp - start, packet) for (timestamp, _, packet) in received]
+
+
+class PacketReplay:
+    """Feed packets into a bridge and measure how they reach the state machine.
+
+    The latency of a packet is the time until the next state write of an entity
+    in the same area. Packets that cause no state write are counted separately.
+    """
+
+    def __init__(self, hass, bridge) -> None:
+        """Initialize the replay."""
+        self.hass = hass
+        self.bridge = bridge
+        self._dynalite = bridge.dynalite_devices._dynalite
+        self._entity_areas: dict[str, int | None] = {}
+        self._pending_feeds: dict[int, list[float]] = {}
+        self._latencies: list[float] = []
+        self._state_writes = 0
+
+    def _entity_area(self, entity_id: str) -> int | None:
+        """Return the area of an entity from its unique_id."""
+        if entity_id not in self._entity_areas:
+            entry = er.async_get(self.hass).async_get(entity_id)
+            match = entry and UNIQUE_ID_AREA.match(entry.unique_id)
+            self._entity_areas[entity_id] = int(match.group(1)) if match else None
+        return self._entity_areas[entity_id]
+
+    async def _async_sample_loop_lag(self, lags: list[float]) -> None:
+        """Measure how late the loop runs a timer."""
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + LOOP_LAG_INTERVAL
+            await asyncio.sleep(LOOP_LAG_INTERVAL)
+            lags.append(max(0.0, loop.time() - expected))
+
+    async def async_replay(
+        self, packets: list[tuple[float, bytes]], speed: float | None = None
+    ) -> dict[str, Any]:
+        """Replay the packets.
+
+        speed None replays as fast as possible, 1.0 at the original timing and
+        other values scale the timing.
+        """
+        orig_set_state = self.hass.states.async_set
+
+        def timed_set_state(entity_id, *args, **kwargs):
+            self._state_writes += 1
+            area = self._entity_area(entity_id)
+            feeds = self._pending_feeds.pop(area, None)
+            if feeds:
+                now = time.perf_counter()
+                self._latencies.extend(now - feed for feed in feeds)
+            return orig_set_state(entity_id, *args, **kwargs)
+
+        lags: list[float] = []
+        lag_sampler = self.hass.loop.create_task(self._async_sample_loop_lag(lags))
+        with patch.object(self.hass.states, "async_set", timed_set_state):
+            start = time.perf_counter()
+            for timestamp, packet in packets:
+                if speed:
+                    delay = start + timestamp / speed - time.perf_counter()
+                    await asyncio.sleep(max(0.0, delay))
+                self._pending_feeds.setdefault(packet[1], []).append(
+                    time.perf_counter()
+                )
+                self._dynalite.receive(packet)
+                # a connection also yields to the loop between reads
+                await asyncio.sleep(0)
+            await self._async_drain()
+            elapsed = time.perf_counter() - start
+        lag_sampler.cancel()
+        latencies = sorted(self._latencies)
+        return {
+            "packets": len(packets),
+            "seconds": elapsed,
+            "packets_per_second": len(packets) / elapsed if elapsed else 0.0,
+            "state_writes": self._state_writes,
+            "packets_without_state_change": sum(
+                len(feeds) for feeds in self._pending_feeds.values()
+            ),
+            "latency_mean": statistics.fmean(latencies) if latencies else 0.0,
+            "latency_p95": latencies[int(len(latencies) * 0.95)] if latencies else 0.0,
+            "latency_max": latencies[-1] if latencies else 0.0,
+            "loop_lag_mean": statistics.fmean(lags) if lags else 0.0,
+            "loop_lag_max": max(lags) if lags else 0.0,
+        }
+
+    async def _async_drain(self) -> None:
+        """Wait until the library processed its buffer and the bridge flushed."""
+        while len(self._dynalite._in_buffer) >= 8:
+            await asyncio.sleep(0)
+        # broadcast, handle event and flush are each a loop iteration
+        for _ in range(3):
+            await asyncio.sleep(0)
+        await self.hass.async_block_till_done()
@@ -1,7 +1,10 @@
 """Test Dynalite bridge."""
 
+from datetime import timedelta
+from unittest.mock import AsyncMock, Mock, call, patch
 
-from unittest.mock import AsyncMock, Mock, patch
+from dynalite_devices_lib import const as dyn_const
+from dynalite_devices_lib.cover import DynaliteTimeCoverDevice
 
 from dynalite_devices_lib.dynalite_devices import (
     CONF_AREA as dyn_CONF_AREA,
@@ -17,16 +20,42 @@ from homeassistant.components.dynalite.const import (
     ATTR_PACKET,
     ATTR_PRESET,
 )
+from homeassistant.const import ATTR_FRIENDLY_NAME, CONF_TYPE
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
-from pytest_homeassistant_custom_component.common import MockConfigEntry
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
 
-from .common import DOMAIN
+from custom_components.dynalite2.capture import (
+    DIRECTION_IN,
+    DIRECTION_OUT,
+    read_capture_file,
+)
+from custom_components.dynalite2.const import (
+    CONF_BUS_BUDGET,
+    CONF_CAPTURE_SIZE,
+    CONF_PACKET_EVENTS,
+    CONF_UPDATE_SIGNALS,
+)
+
+from custom_components.dynalite2.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+
+from .common import DOMAIN, create_bridge_with_library, create_mock_device
 
 
 async def test_update_device(hass, enable_custom_integrations):
     """Test that update works."""
     host = "1.2.3.4"
-    entry = MockConfigEntry(domain=DOMAIN, data={dynalite.CONF_HOST: host})
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={dynalite.CONF_HOST: host},
+        options={CONF_UPDATE_SIGNALS: True},
+        version=2,
+    )
     entry.add_to_hass(hass)
     with patch("custom_components.dynalite2.bridge.DynaliteDevices") as mock_dyn_dev:
         mock_dyn_dev().async_setup = AsyncMock(return_value=True)
@@ -51,6 +80,118 @@ async def test_update_device(hass, enable_custom_integrations):
     specific_func.assert_called_once()
 
 
+async def test_update_device_no_signals(hass, enable_custom_integrations):
+    """Test that update signals are only sent when enabled."""
+    host = "1.2.3.4"
+    entry = MockConfigEntry(domain=DOMAIN, data={dynalite.CONF_HOST: host})
+    entry.add_to_hass(hass)
+    with patch("custom_components.dynalite2.bridge.DynaliteDevices") as mock_dyn_dev:
+        mock_dyn_dev().async_setup = AsyncMock(return_value=True)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        new_device_func = mock_dyn_dev.mock_calls[1][2]["new_device_func"]
+        update_device_func = mock_dyn_dev.mock_calls[1][2]["update_device_func"]
+    device = Mock()
+    device.category = "switch"
+    device.name = "NAME"
+    device.unique_id = "abcdef"
+    device.is_on = False
+    new_device_func([device])
+    await hass.async_block_till_done()
+    assert hass.states.get("switch.name").state == "off"
+    wide_func = Mock()
+    async_dispatcher_connect(hass, f"dynalite-update-{host}", wide_func)
+    specific_func = Mock()
+    async_dispatcher_connect(
+        hass, f"dynalite-update-{host}-{device.unique_id}", specific_func
+    )
+    device.is_on = True
+    update_device_func(device)
+    await hass.async_block_till_done()
+    assert hass.states.get("switch.name").state == "on"
+    device.available = False
+    update_device_func()
+    await hass.async_block_till_done()
+    assert hass.states.get("switch.name").state == "unavailable"
+    wide_func.assert_not_called()
+    specific_func.assert_not_called()
+
+
+async def test_update_availability_chunks(hass, enable_custom_integrations):
+    """Test that a wide update writes all the entities over several iterations."""
+    host = "1.2.3.4"
+    entry = MockConfigEntry(domain=DOMAIN, data={dynalite.CONF_HOST: host})
+    entry.add_to_hass(hass)
+    with patch("custom_components.dynalite2.bridge.DynaliteDevices") as mock_dyn_dev:
+        mock_dyn_dev().async_setup = AsyncMock(return_value=True)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        new_device_func = mock_dyn_dev.mock_calls[1][2]["new_device_func"]
+        update_device_func = mock_dyn_dev.mock_calls[1][2]["update_device_func"]
+    devices = []
+    for index in range(5):
+        device = Mock()
+        device.category = "switch"
+        device.name = f"NAME{index}"
+        device.unique_id = f"unique{index}"
+        device.is_on = False
+        devices.append(device)
+    new_device_func(devices)
+    await hass.async_block_till_done()
+    bridge = hass.data[DOMAIN][entry.entry_id]
+    for device in devices:
+        device.available = False
+    with patch("custom_components.dynalite2.bridge.AVAILABILITY_CHUNK_SIZE", 2):
+        update_device_func()
+        await hass.async_block_till_done()
+    for index in range(5):
+        assert hass.states.get(f"switch.name{index}").state == "unavailable"
+    assert bridge.availability_fanout_time > 0
+
+
+async def test_update_device_coalesced(hass, enable_custom_integrations):
+    """Test that updates in the same loop iteration are sent once."""
+    host = "1.2.3.4"
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={dynalite.CONF_HOST: host},
+        options={CONF_UPDATE_SIGNALS: True},
+        version=2,
+    )
+    entry.add_to_hass(hass)
+    with patch("custom_components.dynalite2.bridge.DynaliteDevices") as mock_dyn_dev:
+        mock_dyn_dev().async_setup = AsyncMock(return_value=True)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        update_device_func = mock_dyn_dev.mock_calls[1][2]["update_device_func"]
+    device1 = Mock()
+    device1.unique_id = "abcdef"
+    device2 = Mock()
+    device2.unique_id = "ghijkl"
+    wide_func = Mock()
+    async_dispatcher_connect(hass, f"dynalite-update-{host}", wide_func)
+    specific_func1 = Mock()
+    async_dispatcher_connect(
+        hass, f"dynalite-update-{host}-{device1.unique_id}", specific_func1
+    )
+    specific_func2 = Mock()
+    async_dispatcher_connect(
+        hass, f"dynalite-update-{host}-{device2.unique_id}", specific_func2
+    )
+    for _ in range(5):
+        update_device_func(device1)
+        update_device_func(device2)
+    await hass.async_block_till_done()
+    wide_func.assert_not_called()
+    specific_func1.assert_called_once()
+    specific_func2.assert_called_once()
+    # a wide update covers the specific ones in the same iteration
+    update_device_func(device1)
+    update_device_func()
+    await hass.async_block_till_done()
+    wide_func.assert_called_once()
+    specific_func1.assert_called_once()
+
+
 async def test_add_devices_then_register(hass, enable_custom_integrations):
     """Test that add_devices work."""
     host = "1.2.3.4"
@@ -76,10 +217,17 @@ async def test_add_devices_then_register(hass, enable_custom_integrations):
     device3.name = "NAME3"
     device3.unique_id = "unique3"
     new_device_func([device3])
+    # a device that the library reports again is not queued twice
+    new_device_func([device1])
     await hass.async_block_till_done()
     assert hass.states.get("light.name")
     assert hass.states.get("switch.name2")
     assert hass.states.get("switch.name3")
+    pending_devices = hass.data[DOMAIN][entry.entry_id].pending_devices
+    assert len(pending_devices) == 0
+    assert pending_devices.queued == 3
+    assert pending_devices.replayed == 3
+    assert pending_devices.deduped == 1
 
 
 async def test_register_then_add_devices(hass, enable_custom_integrations):
@@ -107,6 +255,32 @@ async def test_register_then_add_devices(hass, enable_custom_integrations):
     assert hass.states.get("switch.name2")
 
 
+async def test_discovered_devices_batched(hass, enable_custom_integrations):
+    """Test that discovered devices are added together when the window closes."""
+    bridge = await create_bridge_with_library(
+        hass, {**area_options(["Hall"]), dynalite.CONF_AUTO_DISCOVER: True}
+    )
+    add_lights = Mock(wraps=bridge.async_add_devices["light"])
+    add_switches = Mock(wraps=bridge.async_add_devices["switch"])
+    bridge.async_add_devices["light"] = add_lights
+    bridge.async_add_devices["switch"] = add_switches
+    dynalite_devices = bridge.dynalite_devices
+    for area, channel in ((1, 2), (1, 3), (5, 1)):
+        dynalite_devices.create_channel_if_new(area, channel)
+    # a device that was reported before is not added again
+    bridge.add_devices_when_registered([dynalite_devices._added_channels[1][1]])
+    await hass.async_block_till_done()
+    add_lights.assert_not_called()
+    assert hass.states.get("light.hall_channel_2") is None
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=1))
+    await hass.async_block_till_done()
+    add_lights.assert_called_once()
+    assert len(add_lights.mock_calls[0][1][0]) == 3
+    add_switches.assert_not_called()
+    assert hass.states.get("light.hall_channel_2")
+    assert hass.states.get("light.area_5_channel_1")
+
+
 async def test_notifications(hass, enable_custom_integrations):
     """Test that update works."""
     host = "1.2.3.4"
@@ -141,3 +315,242 @@ async def test_notifications(hass, enable_custom_integrations):
     assert my_event.data[ATTR_HOST] == host
     assert my_event.data[ATTR_AREA] == 7
     assert my_event.data[ATTR_PRESET] == 2
+
+
+async def test_packet_events_filtered(hass, enable_custom_integrations):
+    """Test that packet events are filtered but preset events are not."""
+    host = "1.2.3.4"
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={dynalite.CONF_HOST: host},
+        options={CONF_PACKET_EVENTS: {"area": [7]}},
+        version=2,
+    )
+    entry.add_to_hass(hass)
+    with patch("custom_components.dynalite2.bridge.DynaliteDevices") as mock_dyn_dev:
+        mock_dyn_dev().async_setup = AsyncMock(return_value=True)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        notification_func = mock_dyn_dev.mock_calls[1][2]["notification_func"]
+    bridge = hass.data[DOMAIN][entry.entry_id]
+    packet_listener = Mock()
+    hass.bus.async_listen("dynalite_packet", packet_listener)
+    preset_listener = Mock()
+    hass.bus.async_listen("dynalite_preset", preset_listener)
+    for packet in [[28, 6, 0, 0, 0, 0, 255, 222], [28, 7, 0, 0, 0, 0, 255, 221]]:
+        notification_func(
+            DynaliteNotification(NOTIFICATION_PACKET, {NOTIFICATION_PACKET: packet})
+        )
+    notification_func(
+        DynaliteNotification(
+            NOTIFICATION_PRESET, {dyn_CONF_AREA: 6, dyn_CONF_PRESET: 1}
+        )
+    )
+    await hass.async_block_till_done()
+    packet_listener.assert_called_once()
+    assert packet_listener.mock_calls[0][1][0].data[ATTR_PACKET][1] == 7
+    preset_listener.assert_called_once()
+    assert bridge.packet_events.forwarded == 1
+    assert bridge.packet_events.dropped == 1
+
+
+async def test_packet_events_sent_and_reload(hass, enable_custom_integrations):
+    """Test that sent packets can be fired and a reload keeps the counters."""
+    host = "1.2.3.4"
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={dynalite.CONF_HOST: host},
+        options={CONF_PACKET_EVENTS: {"direction": ["in", "out"]}},
+        version=2,
+    )
+    entry.add_to_hass(hass)
+    with patch(
+        "custom_components.dynalite2.bridge.DynaliteDevices.async_setup",
+        return_value=True,
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+    bridge = hass.data[DOMAIN][entry.entry_id]
+    packet_events = bridge.packet_events
+    packet_listener = Mock()
+    hass.bus.async_listen("dynalite_packet", packet_listener)
+    bridge.handle_notification(
+        DynaliteNotification(
+            NOTIFICATION_PACKET, {NOTIFICATION_PACKET: [28, 7, 0, 98, 0, 0, 255, 110]}
+        )
+    )
+    bridge.dynalite_devices.request_channel_level(3, 4)
+    await hass.async_block_till_done()
+    assert [
+        event_call[1][0].data["direction"] for event_call in packet_listener.mock_calls
+    ] == ["in", "out"]
+    assert packet_listener.mock_calls[1][1][0].data[ATTR_PACKET][1] == 3
+    hass.config_entries.async_update_entry(
+        entry, options={CONF_PACKET_EVENTS: {"enabled": False}}
+    )
+    await hass.async_block_till_done()
+    bridge.dynalite_devices.request_channel_level(3, 4)
+    assert bridge.packet_events is packet_events
+    assert not packet_events.enabled
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    assert diagnostics["packet_events"] == {"forwarded": 2, "dropped": 0}
+
+
+async def test_packet_capture(hass, enable_custom_integrations):
+    """Test that received and sent packets are captured and can be dumped."""
+    host = "1.2.3.4"
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={dynalite.CONF_HOST: host},
+        options={CONF_CAPTURE_SIZE: 10},
+        version=2,
+    )
+    entry.add_to_hass(hass)
+    with patch(
+        "custom_components.dynalite2.bridge.DynaliteDevices.async_setup",
+        return_value=True,
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+    bridge = hass.data[DOMAIN][entry.entry_id]
+    packet = [28, 7, 0, 98, 0, 0, 255, 110]
+    bridge.handle_notification(
+        DynaliteNotification(NOTIFICATION_PACKET, {NOTIFICATION_PACKET: packet})
+    )
+    bridge.dynalite_devices.request_channel_level(3, 4)
+    records = list(bridge.capture.records())
+    assert len(records) == 2
+    assert records[0][1:] == (DIRECTION_IN, bytes(packet))
+    assert records[1][1] == DIRECTION_OUT
+    assert records[1][2][1] == 3
+    with patch("custom_components.dynalite2.bridge.write_capture_file") as mock_write:
+        path = await bridge.async_dump_capture()
+    assert path.startswith(hass.config.path("dynalite_capture_1.2.3.4_"))
+    mock_write.assert_called_once_with(path, bridge.capture.to_bytes())
+
+
+async def test_packet_capture_disabled(hass, enable_custom_integrations):
+    """Test that nothing is dumped when capture is not enabled."""
+    host = "1.2.3.4"
+    entry = MockConfigEntry(domain=DOMAIN, data={dynalite.CONF_HOST: host})
+    entry.add_to_hass(hass)
+    with patch(
+        "custom_components.dynalite2.bridge.DynaliteDevices.async_setup",
+        return_value=True,
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+    bridge = hass.data[DOMAIN][entry.entry_id]
+    assert bridge.capture is None
+    assert await bridge.async_dump_capture() is None
+
+
+def area_options(names):
+    """Create options for areas with a light channel each, sent without pacing."""
+    return {
+        CONF_BUS_BUDGET: 0,
+        dynalite.CONF_AREA: {
+            str(area): {
+                dynalite.CONF_NAME: name,
+                dynalite.CONF_CHANNEL: {
+                    "1": {dynalite.CONF_NAME: "Lamp", CONF_TYPE: "light"}
+                },
+            }
+            for area, name in enumerate(names, 1)
+        }
+    }
+
+
+async def test_reload_config_changed_area(hass, enable_custom_integrations):
+    """Test that a reload configures and queries only the areas that changed."""
+    bridge = await create_bridge_with_library(hass, area_options(["Hall", "Office"]))
+    entry = hass.config_entries.async_entries(DOMAIN)[0]
+    dynalite_devices = bridge.dynalite_devices
+    with patch.object(
+        dynalite_devices, "configure", wraps=dynalite_devices.configure
+    ) as mock_configure, patch.object(
+        dynalite_devices._dynalite, "request_area_preset"
+    ) as mock_area_preset, patch.object(
+        dynalite_devices._dynalite, "request_channel_level"
+    ) as mock_channel_level:
+        hass.config_entries.async_update_entry(
+            entry, options=area_options(["Hall", "Kitchen", "Garage"])
+        )
+        await hass.async_block_till_done()
+    mock_configure.assert_called_once()
+    configured_areas = mock_configure.mock_calls[0][1][0][dyn_const.CONF_AREA]
+    assert set(configured_areas) == {"2", "3"}
+    assert sorted(mock_area_preset.mock_calls) == [call(2, 1), call(3, 1)]
+    assert sorted(mock_channel_level.mock_calls) == [call(2, 1), call(3, 1)]
+    assert dynalite_devices._active == dyn_const.ACTIVE_INIT
+    assert (
+        hass.states.get("light.office_lamp").attributes[ATTR_FRIENDLY_NAME]
+        == "Kitchen Lamp"
+    )
+    assert hass.states.get("light.garage_lamp")
+    assert bridge.dynalite_devices.get_area_name(1) == "Hall"
+
+
+async def test_configured_devices_not_bounded(hass, enable_custom_integrations):
+    """Test that all the configured devices wait for their platform."""
+    with patch("custom_components.dynalite2.bridge.PENDING_DEVICES_MAX", 1):
+        bridge = await create_bridge_with_library(
+            hass, area_options(["Hall", "Office", "Garage"])
+        )
+    assert hass.states.get("light.garage_lamp")
+    entry = hass.config_entries.async_entries(DOMAIN)[0]
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    assert diagnostics["pending_devices"]["dropped"] == 0
+    assert diagnostics["pending_devices"]["queued"] == bridge.pending_devices.queued
+    assert bridge.pending_devices.queued >= 3
+
+
+async def test_reload_config_unchanged(hass, enable_custom_integrations):
+    """Test that a reload without changes leaves the library alone."""
+    options = area_options(["Hall"])
+    bridge = await create_bridge_with_library(hass, options)
+    entry = hass.config_entries.async_entries(DOMAIN)[0]
+    with patch.object(bridge.dynalite_devices, "configure") as mock_configure:
+        assert not bridge.reload_config(entry.data, options)
+    mock_configure.assert_not_called()
+
+
+async def test_reload_config_global(hass, enable_custom_integrations):
+    """Test that a global change configures the library with all the areas."""
+    bridge = await create_bridge_with_library(hass, area_options(["Hall"]))
+    entry = hass.config_entries.async_entries(DOMAIN)[0]
+    with patch.object(bridge.dynalite_devices, "configure") as mock_configure:
+        assert not bridge.reload_config(
+            entry.data, {**area_options(["Hall"]), dynalite.CONF_AUTO_DISCOVER: True}
+        )
+    mock_configure.assert_called_once()
+    assert mock_configure.mock_calls[0][1][0][dyn_const.CONF_AUTO_DISCOVER]
+
+
+async def test_reload_config_connection(hass, enable_custom_integrations):
+    """Test that a new port asks for the entry to be reloaded."""
+    bridge = await create_bridge_with_library(hass)
+    with patch.object(bridge.dynalite_devices, "configure") as mock_configure:
+        assert bridge.reload_config(
+            {dynalite.CONF_HOST: "1.2.3.4", dynalite.CONF_PORT: 2345}, {}
+        )
+    mock_configure.assert_not_called()
+
+
+async def test_cover_moving(hass, enable_custom_integrations):
+    """Test that the areas with an opening or closing cover are tracked."""
+    bridge = await create_bridge_with_library(hass)
+    cover = create_mock_device("cover", DynaliteTimeCoverDevice)
+    cover.unique_id = "dynalite_area_3_time_cover"
+    cover.is_opening = True
+    cover.is_closing = False
+    bridge.update_device(cover)
+    assert bridge._cover_moving(3)
+    assert not bridge._cover_moving(4)
+    cover.is_opening = False
+    cover.is_closing = True
+    bridge.update_device(cover)
+    assert bridge._cover_moving(3)
+    cover.is_closing = False
+    bridge.update_device(cover)
+    assert not bridge._cover_moving(3)
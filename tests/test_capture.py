@@ -0,0 +1,49 @@
+"""Test Dynalite packet capture."""
+
+import pytest
+
+from custom_components.dynalite2.capture import (
+    DIRECTION_IN,
+    DIRECTION_OUT,
+    PacketCapture,
+    read_capture_file,
+    write_capture_file,
+)
+
+
+def test_ring_buffer():
+    """Test that the oldest packets are overwritten."""
+    capture = PacketCapture(3)
+    assert len(capture) == 0
+    for area in range(1, 6):
+        capture.record(DIRECTION_IN, [28, area, 0, 0, 0, 0, 255, 0])
+    assert len(capture) == 3
+    assert capture.count == 5
+    assert [record[2][1] for record in capture.records()] == [3, 4, 5]
+    capture.clear()
+    assert len(capture) == 0
+    assert list(capture.records()) == []
+
+
+def test_short_packet():
+    """Test that short packets are padded."""
+    capture = PacketCapture(2)
+    capture.record(DIRECTION_OUT, bytearray([1, 2, 3]))
+    timestamp, direction, packet = next(capture.records())
+    assert timestamp > 0
+    assert direction == DIRECTION_OUT
+    assert packet == bytes([1, 2, 3, 0, 0, 0, 0, 0])
+
+
+def test_file_round_trip(tmp_path):
+    """Test writing and reading a capture file."""
+    capture = PacketCapture(4)
+    capture.record(DIRECTION_IN, [28, 1, 2, 3, 4, 5, 6, 7])
+    capture.record(DIRECTION_OUT, [28, 8, 9, 10, 11, 12, 13, 14])
+    path = str(tmp_path / "capture.bin")
+    write_capture_file(path, capture.to_bytes())
+    assert read_capture_file(path) == list(capture.records())
+    bad_path = str(tmp_path / "bad.bin")
+    write_capture_file(bad_path, b"garbage")
+    with pytest.raises(ValueError):
+        read_capture_file(bad_path)
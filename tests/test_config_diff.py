@@ -0,0 +1,69 @@
+"""Test the comparison of converted configs."""
+from dynalite_devices_lib import const as dyn_const
+
+from custom_components.dynalite2.config_diff import ConfigDiff
+from custom_components.dynalite2.const import CONF_CAPTURE_SIZE
+
+OLD = {
+    dyn_const.CONF_HOST: "1.2.3.4",
+    dyn_const.CONF_PORT: 12345,
+    dyn_const.CONF_AREA: {
+        "1": {dyn_const.CONF_NAME: "Hall", dyn_const.CONF_CHANNEL: {"1": {}}},
+        "2": {dyn_const.CONF_PRESET: {"1": {}, "2": {}}},
+        "3": {},
+    },
+}
+
+
+def test_diff_unchanged():
+    """Test that equal configs have no changes."""
+    diff = ConfigDiff(OLD, {**OLD})
+    assert not diff.changed
+    assert diff.summary() == (
+        "areas +0 -0 ~0, channels +0 -0 ~0, presets +0 -0 ~0, templates +0 -0 ~0"
+    )
+
+
+def test_diff_areas():
+    """Test the changes of areas, channels, presets and templates."""
+    new = {
+        **OLD,
+        dyn_const.CONF_AREA: {
+            "1": {dyn_const.CONF_NAME: "Hall", dyn_const.CONF_CHANNEL: {"2": {}}},
+            "2": {
+                dyn_const.CONF_PRESET: {"1": {dyn_const.CONF_NAME: "On"}, "2": {}},
+                dyn_const.CONF_TEMPLATE: dyn_const.CONF_ROOM,
+            },
+            "4": {},
+        },
+    }
+    diff = ConfigDiff(OLD, new)
+    assert diff.changed
+    assert not diff.connection_changed
+    assert not diff.global_changed
+    assert diff.areas_added == {"4"}
+    assert diff.areas_removed == {"3"}
+    assert diff.areas_changed == {"1", "2"}
+    assert diff.areas_to_configure == {"1", "2", "4"}
+    assert diff.summary() == (
+        "areas +1 -1 ~2, channels +1 -1 ~0, presets +0 -0 ~1, templates +1 -0 ~0"
+    )
+
+
+def test_diff_globals():
+    """Test changes outside the areas."""
+    diff = ConfigDiff(
+        OLD,
+        {
+            **OLD,
+            dyn_const.CONF_PORT: 2345,
+            dyn_const.CONF_ACTIVE: dyn_const.ACTIVE_ON,
+            CONF_CAPTURE_SIZE: 10,
+        },
+    )
+    assert diff.connection_changed
+    assert diff.global_changed == [dyn_const.CONF_ACTIVE]
+    assert diff.bridge_options_changed == [CONF_CAPTURE_SIZE]
+    assert diff.summary().endswith(
+        f"globals {dyn_const.CONF_ACTIVE}, options {CONF_CAPTURE_SIZE}, connection"
+    )
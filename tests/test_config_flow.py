@@ -1,5 +1,5 @@
 """Test Dynalite config flow."""
-
+import asyncio
 from unittest.mock import AsyncMock, patch
 
 from homeassistant import config_entries
@@ -7,8 +7,12 @@ from homeassistant.components import dynalite
 import pytest
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
+from custom_components.dynalite2.config_flow import async_probe_gateway
+
 from .common import DOMAIN
 
+PROBE = "custom_components.dynalite2.config_flow.async_probe_gateway"
+
 
 @pytest.mark.parametrize(
     "first_con, second_con,exp_type, exp_result, exp_reason",
@@ -29,10 +33,10 @@ async def test_flow(
 ):
     """Run a flow with or without errors and return result."""
     host = "1.2.3.4"
-    with patch(
+    with patch(PROBE, return_value=first_con) as mock_probe, patch(
         "custom_components.dynalite2.bridge.DynaliteDevices.async_setup",
-        side_effect=[first_con, second_con],
-    ):
+        return_value=second_con,
+    ) as mock_setup:
         result = await hass.config_entries.flow.async_init(
             DOMAIN,
             context={"source": config_entries.SOURCE_IMPORT},
@@ -40,6 +44,9 @@ async def test_flow(
         )
         await hass.async_block_till_done()
     assert result["type"] == exp_type
+    mock_probe.assert_called_once_with(host, dynalite.DEFAULT_PORT)
+    # the library connects only once, for the entry
+    assert mock_setup.call_count == (1 if first_con else 0)
     if exp_result:
         assert result["result"].state == exp_result
     if exp_reason:
@@ -127,7 +134,7 @@ async def test_user_flow(hass, enable_custom_integrations):
     host = "1.2.3.4"
     port = 724
     with patch(
-        "homeassistant.components.dynalite.bridge.DynaliteDevices.async_setup",
+        "custom_components.dynalite2.bridge.DynaliteDevices.async_setup",
         return_value=True,
     ):
         result = await hass.config_entries.flow.async_configure(
@@ -151,10 +158,7 @@ async def test_user_flow_cannot_connect(hass, enable_custom_integrations):
 
     host = "1.2.3.4"
     port = 724
-    with patch(
-        "homeassistant.components.dynalite.bridge.DynaliteDevices.async_setup",
-        return_value=False,
-    ):
+    with patch(PROBE, return_value=False):
         result = await hass.config_entries.flow.async_configure(
             result["flow_id"], {dynalite.CONF_HOST: host, dynalite.CONF_PORT: port},
         )
@@ -175,13 +179,55 @@ async def test_user_flow_generic_exception(hass, enable_custom_integrations):
 
     host = "1.2.3.4"
     port = 724
-    with patch(
-        "homeassistant.components.dynalite.bridge.DynaliteDevices.async_setup",
-        side_effect=Exception,
-    ):
+    with patch(PROBE, side_effect=Exception):
         result = await hass.config_entries.flow.async_configure(
             result["flow_id"], {dynalite.CONF_HOST: host, dynalite.CONF_PORT: port},
         )
 
     assert result["type"] == "form"
     assert result["errors"] == {"base": "unknown"}
+
+
+async def test_flow_gateway(hass, enable_custom_integrations, gateway):
+    """Test a flow that connects to the gateway simulator."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN,
+        context={"source": config_entries.SOURCE_IMPORT},
+        data={dynalite.CONF_HOST: gateway.host, dynalite.CONF_PORT: gateway.port},
+    )
+    await hass.async_block_till_done()
+    assert result["type"] == "create_entry"
+    assert result["result"].state == config_entries.ConfigEntryState.LOADED
+    assert gateway.clients >= 1
+
+
+async def test_flow_gateway_down(hass, enable_custom_integrations, gateway):
+    """Test a flow when the gateway does not accept connections."""
+    await gateway.stop()
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN,
+        context={"source": config_entries.SOURCE_IMPORT},
+        data={dynalite.CONF_HOST: gateway.host, dynalite.CONF_PORT: gateway.port},
+    )
+    await hass.async_block_till_done()
+    assert result["type"] == "abort"
+    assert result["reason"] == "no_connection"
+
+
+async def test_probe_gateway(hass, gateway):
+    """Test the probe against the gateway simulator, up and down."""
+    assert await async_probe_gateway(gateway.host, gateway.port)
+    await gateway.stop()
+    assert not await async_probe_gateway(gateway.host, gateway.port)
+
+
+async def test_probe_gateway_timeout(hass):
+    """Test that a gateway that does not answer times out."""
+
+    async def never_connect(host, port):
+        await asyncio.sleep(10)
+
+    with patch("asyncio.open_connection", never_connect), patch(
+        "custom_components.dynalite2.config_flow.CONNECT_PROBE_TIMEOUT", 0.01
+    ):
+        assert not await async_probe_gateway("1.2.3.4", 1234)
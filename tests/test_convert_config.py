@@ -0,0 +1,70 @@
+"""Test the conversion of the config to the library config."""
+from dynalite_devices_lib import const as dyn_const
+from homeassistant.components import dynalite
+from homeassistant.const import CONF_TYPE
+import pytest
+
+from custom_components.dynalite2.convert_config import (
+    CONVERT_CACHE_SIZE,
+    clear_convert_cache,
+    convert_config,
+)
+
+DATA = {dynalite.CONF_HOST: "1.2.3.4", dynalite.CONF_PORT: 1234}
+OPTIONS = {
+    dynalite.CONF_AREA: {
+        "1": {
+            dynalite.CONF_NAME: "Hall",
+            dynalite.CONF_TEMPLATE: "time_cover",
+            dynalite.CONF_CHANNEL: {
+                "2": {dynalite.CONF_NAME: "Lamp", CONF_TYPE: "light"}
+            },
+            dynalite.CONF_PRESET: {"3": {dynalite.CONF_NAME: "Scene", "level": 0.5}},
+        }
+    },
+    dynalite.CONF_ACTIVE: True,
+}
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start every test with an empty cache."""
+    clear_convert_cache()
+    yield
+    clear_convert_cache()
+
+
+def test_convert_config():
+    """Test that the keys are mapped to the library keys."""
+    result = convert_config(DATA, OPTIONS)
+    assert result[dyn_const.CONF_HOST] == "1.2.3.4"
+    assert result[dyn_const.CONF_PORT] == 1234
+    assert result[dyn_const.CONF_ACTIVE] == dyn_const.ACTIVE_ON
+    area = result[dyn_const.CONF_AREA]["1"]
+    assert area[dyn_const.CONF_NAME] == "Hall"
+    assert area[dyn_const.CONF_TEMPLATE] == dyn_const.CONF_TIME_COVER
+    assert area[dyn_const.CONF_CHANNEL]["2"] == {
+        dyn_const.CONF_NAME: "Lamp",
+        dyn_const.CONF_CHANNEL_TYPE: "light",
+    }
+    assert area[dyn_const.CONF_PRESET]["3"] == {
+        dyn_const.CONF_NAME: "Scene",
+        dyn_const.CONF_LEVEL: 0.5,
+    }
+
+
+def test_convert_config_cached():
+    """Test that an unchanged config is converted once."""
+    result = convert_config(DATA, OPTIONS)
+    assert convert_config(dict(DATA), dict(OPTIONS)) is result
+    changed = convert_config(DATA, {**OPTIONS, dynalite.CONF_ACTIVE: False})
+    assert changed is not result
+    assert changed[dyn_const.CONF_ACTIVE] == dyn_const.ACTIVE_OFF
+
+
+def test_convert_config_cache_size():
+    """Test that the least recently used conversions are dropped."""
+    first = convert_config(DATA, OPTIONS)
+    for port in range(CONVERT_CACHE_SIZE):
+        convert_config({**DATA, dynalite.CONF_PORT: port}, OPTIONS)
+    assert convert_config(DATA, OPTIONS) is not first
@@ -0,0 +1,209 @@
+"""Test the bridge against the gateway simulator."""
+import asyncio
+
+from homeassistant.components import dynalite
+from homeassistant.const import CONF_TYPE, STATE_OFF, STATE_ON, STATE_UNAVAILABLE
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.dynalite2.const import CONF_BUS_BUDGET, CONF_GROUP_COMMANDS
+
+from .common import DOMAIN
+from .gateway import (
+    OPCODE_FADE_TO_LEVEL,
+    OPCODE_SET_CHANNEL,
+    DynetGatewaySimulator,
+    SimulatedArea,
+    SimulatedCover,
+    async_wait_for,
+)
+
+LEVEL_OPCODES = [OPCODE_FADE_TO_LEVEL, *OPCODE_SET_CHANNEL]
+
+OPTIONS = {
+    CONF_BUS_BUDGET: 0,
+    dynalite.CONF_AREA: {
+        "1": {
+            dynalite.CONF_NAME: "Hall",
+            dynalite.CONF_CHANNEL: {
+                "1": {dynalite.CONF_NAME: "Lamp", CONF_TYPE: "light"}
+            },
+            dynalite.CONF_PRESET: {
+                "1": {dynalite.CONF_NAME: "On"},
+                "4": {dynalite.CONF_NAME: "Off"},
+            },
+        }
+    }
+}
+
+
+async def setup_gateway_entry(hass, gateway, options=OPTIONS):
+    """Set up an entry that connects to the gateway simulator."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={dynalite.CONF_HOST: gateway.host, dynalite.CONF_PORT: gateway.port},
+        options=options,
+        version=2,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    bridge = hass.data[DOMAIN][entry.entry_id]
+    bridge.dynalite_devices._dynalite._message_delay = 0
+    return bridge
+
+
+async def test_gateway_panel_press(hass, enable_custom_integrations, gateway):
+    """Test that presets and levels set on the bus update the entities."""
+    await setup_gateway_entry(hass, gateway)
+    assert gateway.clients == 1
+    assert hass.states.get("switch.hall_on").state == STATE_OFF
+    gateway.press_preset(1, 1)
+    await async_wait_for(lambda: hass.states.get("switch.hall_on").state == STATE_ON)
+    assert hass.states.get("switch.hall_off").state == STATE_OFF
+    gateway.set_channel_level(1, 1, 1.0)
+    await async_wait_for(lambda: hass.states.get("light.hall_lamp").state == STATE_ON)
+
+
+async def test_gateway_commands(hass, enable_custom_integrations, gateway):
+    """Test that the commands of the entities reach the gateway."""
+    gateway.areas[1] = SimulatedArea(channels=1, presets={4: {1: 0.0}})
+    await setup_gateway_entry(hass, gateway)
+    await hass.services.async_call(
+        "light", "turn_on", {"entity_id": "light.hall_lamp"}, blocking=True
+    )
+    await async_wait_for(lambda: gateway.areas[1].channels[1].target == 1.0)
+    await hass.services.async_call(
+        "switch", "turn_on", {"entity_id": "switch.hall_off"}, blocking=True
+    )
+    await async_wait_for(lambda: gateway.areas[1].preset == 4)
+    assert gateway.areas[1].channels[1].target == 0.0
+
+
+async def test_gateway_area_command(hass, enable_custom_integrations, gateway):
+    """Test that a call for every light of an area is sent as one command."""
+    gateway.areas[3] = SimulatedArea(channels=3)
+    channels = {
+        str(channel): {dynalite.CONF_NAME: f"Lamp {channel}", CONF_TYPE: "light"}
+        for channel in range(1, 4)
+    }
+    options = {
+        CONF_BUS_BUDGET: 0,
+        # no queries at startup whose replies could race the commands
+        dynalite.CONF_ACTIVE: dynalite.ACTIVE_OFF,
+        CONF_GROUP_COMMANDS: True,
+        dynalite.CONF_AREA: {
+            "3": {dynalite.CONF_NAME: "Office", dynalite.CONF_CHANNEL: channels}
+        },
+    }
+    await setup_gateway_entry(hass, gateway, options)
+    lamps = [f"light.office_lamp_{channel}" for channel in range(1, 4)]
+    await hass.services.async_call(
+        "light", "turn_on", {"entity_id": lamps}, blocking=True
+    )
+    # the gateway does not echo commands to their sender, so the state is optimistic
+    await async_wait_for(
+        lambda: all(hass.states.get(lamp).state == STATE_ON for lamp in lamps)
+    )
+    area = gateway.areas[3]
+    await async_wait_for(
+        lambda: all(channel.target == 1.0 for channel in area.channels.values())
+    )
+    level_commands = [msg for msg in gateway.received if msg[3] in LEVEL_OPCODES]
+    assert len(level_commands) == 1
+    # only some of the lights need a command per channel
+    await hass.services.async_call(
+        "light", "turn_off", {"entity_id": lamps[:2]}, blocking=True
+    )
+    await async_wait_for(lambda: area.channels[2].target == 0.0)
+    level_commands = [msg for msg in gateway.received if msg[3] in LEVEL_OPCODES]
+    assert len(level_commands) == 3
+    assert area.channels[3].target == 1.0
+    assert hass.states.get(lamps[2]).state == STATE_ON
+
+
+async def test_gateway_queries(hass, enable_custom_integrations, gateway):
+    """Test that the gateway answers preset and level queries."""
+    gateway.areas[1] = SimulatedArea(channels=1, presets={1: {1: 1.0}})
+    gateway.areas[1].select_preset(1, 0)
+    bridge = await setup_gateway_entry(hass, gateway)
+    assert hass.states.get("switch.hall_on").state == STATE_OFF
+    bridge.dynalite_devices.request_area_preset(1, 1)
+    await async_wait_for(lambda: hass.states.get("switch.hall_on").state == STATE_ON)
+    bridge.dynalite_devices.request_channel_level(1, 1)
+    await async_wait_for(lambda: hass.states.get("light.hall_lamp").state == STATE_ON)
+
+
+async def test_gateway_latency(hass, enable_custom_integrations, gateway):
+    """Test that replies arrive only after the injected latency."""
+    gateway.latency = 0.2
+    gateway.area(1).select_preset(1, 0)
+    bridge = await setup_gateway_entry(hass, gateway)
+    bridge.dynalite_devices.request_area_preset(1, 1)
+    await asyncio.sleep(0.1)
+    assert hass.states.get("switch.hall_on").state == STATE_OFF
+    await async_wait_for(lambda: hass.states.get("switch.hall_on").state == STATE_ON)
+
+
+async def test_gateway_packet_loss(hass, enable_custom_integrations, gateway):
+    """Test that lost packets are not answered."""
+    gateway.packet_loss = 1.0
+    gateway.area(1).select_preset(1, 0)
+    bridge = await setup_gateway_entry(hass, gateway)
+    bridge.dynalite_devices.request_area_preset(1, 1)
+    with pytest.raises(asyncio.TimeoutError):
+        await async_wait_for(
+            lambda: hass.states.get("switch.hall_on").state == STATE_ON, 0.2
+        )
+    assert gateway.received == []
+
+
+async def test_gateway_disconnect(hass, enable_custom_integrations, gateway):
+    """Test that the entities become unavailable and recover when the gateway drops the connection."""
+    await setup_gateway_entry(hass, gateway)
+    await gateway.disconnect()
+    await async_wait_for(
+        lambda: hass.states.get("light.hall_lamp").state == STATE_UNAVAILABLE
+    )
+    # the library retries after a second
+    await async_wait_for(lambda: gateway.clients == 1, 3)
+    await async_wait_for(
+        lambda: hass.states.get("light.hall_lamp").state != STATE_UNAVAILABLE
+    )
+
+
+async def test_gateway_cover_motion(hass, enable_custom_integrations, gateway):
+    """Test that a time cover moves with its presets."""
+    cover = SimulatedCover(open_preset=1, close_preset=2, stop_preset=4, duration=0.2)
+    gateway.areas[2] = SimulatedArea(cover=cover)
+    gateway.press_preset(2, 1)
+    await async_wait_for(lambda: cover.position() == 1.0)
+    gateway.press_preset(2, 2)
+    await asyncio.sleep(0.05)
+    gateway.press_preset(2, 4)
+    position = cover.position()
+    assert 0.0 < position < 1.0
+    await asyncio.sleep(0.05)
+    assert cover.position() == position
+
+
+async def test_gateway_port_change(hass, enable_custom_integrations, gateway):
+    """Test that a new port reloads the entry and connects to the new gateway."""
+    await setup_gateway_entry(hass, gateway)
+    entry = hass.config_entries.async_entries(DOMAIN)[0]
+    new_gateway = DynetGatewaySimulator()
+    await new_gateway.start()
+    try:
+        hass.config_entries.async_update_entry(
+            entry, data={**entry.data, dynalite.CONF_PORT: new_gateway.port}
+        )
+        await hass.async_block_till_done()
+        await async_wait_for(lambda: new_gateway.clients == 1)
+        assert gateway.clients == 0
+        new_gateway.press_preset(1, 1)
+        await async_wait_for(
+            lambda: hass.states.get("switch.hall_on").state == STATE_ON
+        )
+    finally:
+        await hass.config_entries.async_unload(entry.entry_id)
+        await new_gateway.stop()
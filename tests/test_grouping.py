@@ -0,0 +1,88 @@
+"""Test the grouping of channel levels into area commands."""
+import asyncio
+from unittest.mock import Mock, call, patch
+
+from custom_components.dynalite2.grouping import AreaLevelGrouper, area_level_packet
+
+from .common import create_bridge_with_library
+from .gateway import async_wait_for
+
+
+def test_area_level_packet():
+    """Test the packet that sets all the channels of an area."""
+    packet = area_level_packet(3, 1.0, 0.5)
+    assert packet.raw_msg[:7] == [0x1C, 3, 0xFF, 0x71, 1, 25, 255]
+    assert area_level_packet(3, 0.0, 100).raw_msg[4:6] == [255, 255]
+
+
+async def test_grouper(hass):
+    """Test that areas with the same level on all channels get one command."""
+    send_channel = Mock()
+    send_area = Mock()
+    channels = {1: {1, 2, 3}, 2: {1, 2}, 3: {1, 2}, 4: {1}}
+    grouper = AreaLevelGrouper(hass.loop, send_channel, send_area, channels.get)
+    for channel in (3, 1, 2):
+        grouper.set_channel_level(1, channel, 0.5, 1.0)
+    # only some of the channels
+    grouper.set_channel_level(2, 1, 0.0, 1.0)
+    # different levels
+    grouper.set_channel_level(3, 1, 0.0, 1.0)
+    grouper.set_channel_level(3, 2, 1.0, 1.0)
+    # a single channel does not need an area command
+    grouper.set_channel_level(4, 1, 1.0, 1.0)
+    send_channel.assert_not_called()
+    await asyncio.sleep(0)
+    send_area.assert_called_once_with(1, [1, 2, 3], 0.5, 1.0)
+    assert send_channel.mock_calls == [
+        call(2, 1, 0.0, 1.0),
+        call(3, 1, 0.0, 1.0),
+        call(3, 2, 1.0, 1.0),
+        call(4, 1, 1.0, 1.0),
+    ]
+    assert grouper.grouped == 1
+    assert grouper.saved == 2
+
+
+async def test_bridge_group_commands(hass, enable_custom_integrations):
+    """Test that the bridge groups the levels of an area when it is turned on."""
+    options = {
+        "bus_budget": 0,
+        "active": "off",
+        "group_commands": True,
+        "area": {"1": {"channel": {"1": {}, "2": {}}}},
+    }
+    bridge = await create_bridge_with_library(hass, options)
+    dynalite = bridge.dynalite_devices._dynalite
+    with patch.object(dynalite, "write") as mock_write, patch.object(
+        dynalite, "set_channel_level"
+    ) as mock_level:
+        bridge.dynalite_devices.set_channel_level(1, 1, 1.0, 0)
+        bridge.dynalite_devices.set_channel_level(1, 2, 1.0, 0)
+        await hass.async_block_till_done()
+        assert mock_write.call_args[0][0].raw_msg[:4] == [0x1C, 1, 0xFF, 0x71]
+        mock_level.assert_not_called()
+        bridge.group_commands = False
+        bridge.dynalite_devices.set_channel_level(1, 1, 0.0, 0)
+        bridge.dynalite_devices.set_channel_level(1, 2, 0.0, 0)
+        assert mock_level.call_count == 2
+    # the channels are updated as if each had its own command
+    await async_wait_for(
+        lambda: hass.states.get("light.area_1_channel_2").state == "on"
+    )
+
+
+async def test_bridge_group_commands_default(hass, enable_custom_integrations):
+    """Test that the levels are sent per channel unless grouping is turned on."""
+    options = {
+        "bus_budget": 0,
+        "active": "off",
+        "area": {"1": {"channel": {"1": {}, "2": {}}}},
+    }
+    bridge = await create_bridge_with_library(hass, options)
+    assert not bridge.group_commands
+    dynalite = bridge.dynalite_devices._dynalite
+    with patch.object(dynalite, "set_channel_level") as mock_level:
+        bridge.dynalite_devices.set_channel_level(1, 1, 1.0, 0)
+        bridge.dynalite_devices.set_channel_level(1, 2, 1.0, 0)
+        await hass.async_block_till_done()
+    assert mock_level.call_count == 2
@@ -0,0 +1,115 @@
+"""Test the startup hydration of the state of the areas."""
+from unittest.mock import Mock
+
+from dynalite_devices_lib.dynalite_devices import (
+    NOTIFICATION_PACKET,
+    DynaliteNotification,
+)
+from homeassistant.helpers import entity_registry as er
+import pytest
+from pytest_homeassistant_custom_component.common import async_capture_events
+
+from custom_components.dynalite2.hydration import (
+    StartupHydrator,
+    area_of_unique_id,
+    area_queries,
+    query_of_packet,
+)
+
+from .common import DOMAIN, create_bridge_with_library
+from .gateway import async_wait_for
+
+
+def answer(area, channel):
+    """Return the packet that answers a query."""
+    if channel is None:
+        return [0x1C, area, 0, 0x62, 0, 0, 255, 0]
+    return [0x1C, area, channel - 1, 0x60, 10, 10, 255, 0]
+
+
+@pytest.mark.parametrize(
+    "packet, query",
+    [
+        (answer(2, None), (2, None)),
+        (answer(2, 3), (2, 3)),
+        ([0x1C, 2, 0, 1, 0, 0, 255, 0], (2, None)),
+        ([0x1C, 2, 0, 0x63, 0, 0, 255, 0], None),
+        ([0x1C, 2, 0xFF, 0x71, 1, 25, 255, 0], None),
+    ],
+)
+def test_query_of_packet(packet, query):
+    """Test which query a packet answers."""
+    assert query_of_packet(packet) == query
+
+
+def test_area_queries():
+    """Test the queries of areas and the areas of unique_ids."""
+    channels = {1: {2, 1}, 2: set()}
+    assert area_queries([2, 1], channels.get) == [(2, None), (1, None), (1, 1), (1, 2)]
+    assert area_of_unique_id("dynalite_area_12_channel_3") == 12
+    assert area_of_unique_id("dynalite_area_12") is None
+
+
+async def test_hydrator(hass):
+    """Test the bound on waiting queries, the retries and the report."""
+    waiting = []
+    # the first query of (2, 1) is lost and the retry is answered
+    lost = [(2, 1)]
+
+    def send(area, channel):
+        waiting.append(len(hydrator._waiting))
+        if (area, channel) in lost:
+            lost.remove((area, channel))
+        elif (area, channel) != (3, None):
+            hass.loop.call_soon(hydrator.handle_packet, answer(area, channel))
+
+    progress = Mock()
+    hydrator = StartupHydrator(
+        {"concurrency": 2, "timeout": 0.05, "retries": 1}, send, progress
+    )
+    queries = [(1, None), (2, None), (2, 1), (3, None), (4, None)]
+    await hydrator.async_run(queries)
+    assert max(waiting) == 2
+    assert hydrator.total == 5
+    assert hydrator.answered == 4
+    assert hydrator.failed == 1
+    assert hydrator.retried == 2
+    assert hydrator.elapsed > 0
+    progress.assert_called_with(hydrator, True)
+    assert len(hydrator._waiting) == 0
+
+
+async def test_bridge_hydration(hass, enable_custom_integrations):
+    """Test that the bridge hydrates its areas in order and reports it."""
+    events = async_capture_events(hass, "dynalite_hydration")
+    options = {
+        "bus_budget": 0,
+        "area": {"1": {}, "2": {}, "3": {}, "4": {}},
+        "hydration": {"area": [4], "timeout": 0.05, "retries": 0},
+    }
+    bridge = await create_bridge_with_library(hass, options)
+    # the library keeps the setting, only its startup queries are replaced
+    assert bridge.dynalite_devices._active == "init"
+    registry = er.async_get(hass)
+    for entry in list(registry.entities.values()):
+        if entry.platform == DOMAIN and area_of_unique_id(entry.unique_id) in (1, 2):
+            registry.async_update_entity(
+                entry.entity_id, hidden_by=er.RegistryEntryHider.USER
+            )
+    assert bridge._hydration_areas() == [4, 3, 1, 2]
+    for area in (1, 2, 3):
+        bridge.handle_notification(
+            DynaliteNotification(
+                NOTIFICATION_PACKET, {NOTIFICATION_PACKET: answer(area, None)}
+            )
+        )
+    await async_wait_for(lambda: len(events) > 0 and events[-1].data["complete"])
+    assert events[-1].data["total"] == 4
+    assert events[-1].data["answered"] + events[-1].data["failed"] == 4
+    assert bridge._hydration_task is None
+
+
+async def test_bridge_no_hydration(hass, enable_custom_integrations):
+    """Test that there is no hydration when the areas are not queried."""
+    bridge = await create_bridge_with_library(hass, {"active": "off"})
+    assert bridge.hydrator is None
@@ -7,11 +7,39 @@ import homeassistant.components.dynalite.const as dynalite
 from homeassistant.const import CONF_DEFAULT, CONF_HOST, CONF_NAME, CONF_PORT, CONF_ROOM
 from homeassistant.setup import async_setup_component
 import pytest
-from pytest_homeassistant_custom_component.common import MockConfigEntry
-from voluptuous import MultipleInvalid
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+)
+from voluptuous import Invalid, MultipleInvalid
+
+from custom_components.dynalite2 import (
+    AREA_SCHEMA,
+    CONFIG_SCHEMA,
+    validate_areas,
+    validate_areas_single_pass,
+)
+from custom_components.dynalite2.const import PLATFORMS
 
 from .common import DOMAIN
 
+AREAS = {
+    1: {
+        CONF_NAME: "Name1",
+        dynalite.CONF_CHANNEL: {4: {}, "5": {CONF_NAME: "Lamp", "type": "switch"}},
+        dynalite.CONF_PRESET: {7: None, 8: {dynalite.CONF_FADE: 2}},
+        dynalite.CONF_NO_DEFAULT: "yes",
+    },
+    "2": None,
+    3: {CONF_NAME: "Name3", dynalite.CONF_TEMPLATE: CONF_ROOM, "room_on": 2},
+    4: {
+        CONF_NAME: 4,
+        dynalite.CONF_TEMPLATE: dynalite.CONF_TIME_COVER,
+        dynalite.CONF_DEVICE_CLASS: "Awning",
+        dynalite.CONF_DURATION: "3",
+    },
+}
+
 
 async def test_empty_config(hass, enable_custom_integrations):
     """Test with an empty config."""
@@ -97,8 +125,8 @@ async def test_service_request_area_preset(hass, enable_custom_integrations):
             {
                 DOMAIN: {
                     dynalite.CONF_BRIDGES: [
-                        {CONF_HOST: "1.2.3.4"},
-                        {CONF_HOST: "5.6.7.8"},
+                        {CONF_HOST: "1.2.3.4", "bus_budget": 0},
+                        {CONF_HOST: "5.6.7.8", "bus_budget": 0},
                     ]
                 }
             },
@@ -159,9 +187,10 @@ async def test_service_request_channel_level(hass, enable_custom_integrations):
                     dynalite.CONF_BRIDGES: [
                         {
                             CONF_HOST: "1.2.3.4",
+                            "bus_budget": 0,
                             dynalite.CONF_AREA: {"7": {CONF_NAME: "test"}},
                         },
-                        {CONF_HOST: "5.6.7.8"},
+                        {CONF_HOST: "5.6.7.8", "bus_budget": 0},
                     ]
                 }
             },
@@ -189,6 +218,106 @@ async def test_service_request_channel_level(hass, enable_custom_integrations):
         assert mock_req_chan_lvl.mock_calls == [call(4, 5), call(4, 5)]
 
 
+async def test_service_request_batch(hass, enable_custom_integrations):
+    """Test requesting ranges and lists of channels, paced, with a completion event."""
+    with patch(
+        "custom_components.dynalite2.bridge.DynaliteDevices.async_setup",
+        return_value=True,
+    ), patch(
+        "dynalite_devices_lib.dynalite.Dynalite.request_channel_level",
+        return_value=True,
+    ) as mock_req_chan_lvl, patch(
+        "custom_components.dynalite2.asyncio.sleep"
+    ) as mock_sleep:
+        assert await async_setup_component(
+            hass,
+            DOMAIN,
+            {
+                DOMAIN: {
+                    dynalite.CONF_BRIDGES: [{CONF_HOST: "1.2.3.4", "bus_budget": 0}]
+                }
+            },
+        )
+        await hass.async_block_till_done()
+        events = async_capture_events(hass, "dynalite_requests_completed")
+        await hass.services.async_call(
+            DOMAIN,
+            "request_channel_level",
+            {"area": ["1-2", 5], "channel": "3-4", "concurrency": 4, "interval": 2},
+            blocking=True,
+        )
+    assert mock_req_chan_lvl.mock_calls == [
+        call(area, channel) for area in (1, 2, 5) for channel in (3, 4)
+    ]
+    assert mock_sleep.mock_calls.count(call(2)) == 1
+    assert len(events) == 1
+    assert events[0].data["service"] == "request_channel_level"
+    assert events[0].data["bridges"] == 1
+    assert events[0].data["areas"] == 3
+    assert events[0].data["channels"] == 2
+    assert events[0].data["requests"] == 6
+    assert events[0].data["elapsed"] >= 0
+
+
+async def test_service_request_routed(hass, enable_custom_integrations):
+    """Test that queries go to the bridges that own the area unless broadcast."""
+    with patch(
+        "custom_components.dynalite2.bridge.DynaliteDevices.async_setup",
+        return_value=True,
+    ), patch(
+        "dynalite_devices_lib.dynalite.Dynalite.request_area_preset",
+        return_value=True,
+    ) as mock_req_area_pres:
+        assert await async_setup_component(
+            hass,
+            DOMAIN,
+            {
+                DOMAIN: {
+                    dynalite.CONF_BRIDGES: [
+                        {
+                            CONF_HOST: "1.2.3.4",
+                            "bus_budget": 0,
+                            dynalite.CONF_AREA: {"7": {CONF_NAME: "test"}},
+                        },
+                        {CONF_HOST: "5.6.7.8", "bus_budget": 0},
+                    ]
+                }
+            },
+        )
+        await hass.async_block_till_done()
+        events = async_capture_events(hass, "dynalite_requests_completed")
+        await hass.services.async_call(
+            DOMAIN, "request_area_preset", {"area": 7}, blocking=True
+        )
+        mock_req_area_pres.assert_called_once_with(7, 1)
+        assert events[-1].data["bridges"] == 1
+        mock_req_area_pres.reset_mock()
+        await hass.services.async_call(
+            DOMAIN, "request_area_preset", {"area": 7, "broadcast": True}, blocking=True
+        )
+        assert mock_req_area_pres.mock_calls == [call(7, 1), call(7, 1)]
+        assert events[-1].data["bridges"] == 2
+
+
+@pytest.mark.parametrize(
+    "area", ["3-x", [], {"a": 1}, "abc", "20-1", "1-10000000", 0, 256, [1, "-1"]],
+)
+async def test_service_request_batch_invalid(hass, enable_custom_integrations, area):
+    """Test that invalid lists of areas are rejected."""
+    with patch(
+        "custom_components.dynalite2.bridge.DynaliteDevices.async_setup",
+        return_value=True,
+    ):
+        assert await async_setup_component(
+            hass, DOMAIN, {DOMAIN: {dynalite.CONF_BRIDGES: [{CONF_HOST: "1.2.3.4"}]}}
+        )
+        await hass.async_block_till_done()
+    with pytest.raises(MultipleInvalid):
+        await hass.services.async_call(
+            DOMAIN, "request_area_preset", {"area": area}, blocking=True
+        )
+
+
 async def test_async_setup_bad_config1(hass, enable_custom_integrations):
     """Test a successful with bad config on templates."""
     with patch(
@@ -260,7 +389,78 @@ async def test_unload_entry(hass, enable_custom_integrations):
     ) as mock_unload:
         assert await hass.config_entries.async_unload(entry.entry_id)
         await hass.async_block_till_done()
-        assert mock_unload.call_count == len(dynalite.PLATFORMS)
-        expected_calls = [call(entry, platform) for platform in dynalite.PLATFORMS]
+        assert mock_unload.call_count == len(PLATFORMS)
+        expected_calls = [call(entry, platform) for platform in PLATFORMS]
         for cur_call in mock_unload.mock_calls:
             assert cur_call in expected_calls
+
+
+async def test_service_dump_capture(hass, enable_custom_integrations):
+    """Test dumping the packet capture via service call."""
+    with patch(
+        "custom_components.dynalite2.bridge.DynaliteDevices.async_setup",
+        return_value=True,
+    ), patch(
+        "custom_components.dynalite2.bridge.DynaliteBridge.async_dump_capture",
+    ) as mock_dump:
+        assert await async_setup_component(
+            hass,
+            DOMAIN,
+            {
+                DOMAIN: {
+                    dynalite.CONF_BRIDGES: [
+                        {CONF_HOST: "1.2.3.4", "capture_size": 100},
+                        {CONF_HOST: "5.6.7.8"},
+                    ]
+                }
+            },
+        )
+        await hass.async_block_till_done()
+        await hass.services.async_call(
+            DOMAIN, "dump_capture", {"host": "1.2.3.4"}, blocking=True
+        )
+        assert mock_dump.call_count == 1
+        await hass.services.async_call(DOMAIN, "dump_capture", {}, blocking=True)
+        assert mock_dump.call_count == 3
+
+
+def test_validate_areas_single_pass():
+    """Test that the single pass gives the same result as the schema."""
+    assert validate_areas_single_pass(AREAS) == AREA_SCHEMA(AREAS)
+
+
+@pytest.mark.parametrize(
+    "areas",
+    [
+        {"WRONG": {CONF_NAME: "Name"}},
+        {1: {}},
+        {1: {CONF_NAME: "Name", "unknown": 1}},
+        {1: {CONF_NAME: "Name", dynalite.CONF_CHANNEL: {1: {"type": "cover"}}}},
+        {1: {CONF_NAME: "Name", dynalite.CONF_CHANNEL: None}},
+        {1: {CONF_NAME: "Name", dynalite.CONF_CHANNEL: [1]}},
+        {1: {CONF_NAME: "Name", dynalite.CONF_PRESET: None}},
+        {1: {CONF_NAME: "Name", dynalite.CONF_ROOM_ON: 1}},
+        {1: "Name"},
+    ],
+)
+def test_validate_areas_invalid(areas):
+    """Test that invalid areas fail in both validators like the schema does."""
+    with pytest.raises(MultipleInvalid) as schema_err:
+        AREA_SCHEMA(areas)
+    with pytest.raises(MultipleInvalid) as err:
+        validate_areas(areas)
+    assert str(err.value) == str(schema_err.value)
+    with pytest.raises((Invalid, KeyError, TypeError, AttributeError)):
+        validate_areas_single_pass(areas)
+
+
+def test_config_schema_validates_areas():
+    """Test that a config check reports invalid areas."""
+    bridge = {CONF_HOST: "1.2.3.4", dynalite.CONF_AREA: AREAS}
+    config = CONFIG_SCHEMA({DOMAIN: {dynalite.CONF_BRIDGES: [bridge]}})
+    assert config[DOMAIN][dynalite.CONF_BRIDGES][0][
+        dynalite.CONF_AREA
+    ] == AREA_SCHEMA(AREAS)
+    bridge[dynalite.CONF_AREA] = {1: {CONF_NAME: "Name", dynalite.CONF_CHANNEL: None}}
+    with pytest.raises(MultipleInvalid):
+        CONFIG_SCHEMA({DOMAIN: {dynalite.CONF_BRIDGES: [bridge]}})
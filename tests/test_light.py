@@ -1,4 +1,5 @@
 """Test Dynalite light."""
+from unittest.mock import Mock
 
 from dynalite_devices_lib.light import DynaliteChannelLightDevice
 from homeassistant.components.light import SUPPORT_BRIGHTNESS
@@ -9,6 +10,8 @@ from homeassistant.const import (
 )
 import pytest
 
+from custom_components.dynalite2.light import DynaliteLight
+
 from .common import (
     ATTR_METHOD,
     ATTR_SERVICE,
@@ -61,3 +64,12 @@ async def test_remove_config_entry(hass, enable_custom_integrations, mock_device
     assert await hass.config_entries.async_remove(entry_id)
     await hass.async_block_till_done()
     assert not hass.states.get("light.name")
+
+
+async def test_light_update_before_added(hass, mock_device):
+    """Test that an update between the creation and the registration is kept."""
+    mock_device.brightness = 0
+    entity = DynaliteLight(mock_device, Mock())
+    mock_device.brightness = 200
+    await entity.async_added_to_hass()
+    assert entity.brightness == 200
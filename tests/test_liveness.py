@@ -0,0 +1,179 @@
+"""Test the detection of dead connections and the reconnect backoff."""
+from unittest.mock import AsyncMock, Mock, patch
+
+from homeassistant.const import STATE_UNAVAILABLE
+
+from custom_components.dynalite2.diagnostics import async_get_config_entry_diagnostics
+from custom_components.dynalite2.liveness import ConnectionMonitor
+
+from .common import DOMAIN, create_bridge_with_library
+from .gateway import async_wait_for
+from .test_gateway import OPTIONS, setup_gateway_entry
+
+CONFIG = {"heartbeat": 30, "deadline": 10, "max_backoff": 8}
+
+
+def create_monitor(hass, heartbeat=True):
+    """Create a connected monitor with mock heartbeat and disconnect."""
+    send_heartbeat = Mock(return_value=heartbeat)
+    declare_dead = Mock()
+    monitor = ConnectionMonitor(hass.loop, CONFIG, send_heartbeat, declare_dead)
+    monitor.connection_changed(True, 0)
+    return monitor, send_heartbeat, declare_dead
+
+
+async def test_monitor_heartbeat(hass):
+    """Test that an idle connection gets a heartbeat and stays if it answers."""
+    monitor, send_heartbeat, declare_dead = create_monitor(hass)
+    monitor.packet_received(10)
+    monitor.check(39)
+    send_heartbeat.assert_not_called()
+    monitor.check(40)
+    monitor.check(45)
+    send_heartbeat.assert_called_once()
+    monitor.packet_received(46)
+    monitor.check(60)
+    declare_dead.assert_not_called()
+    assert monitor.stats["heartbeats"] == 1
+
+
+async def test_monitor_dead(hass):
+    """Test that a connection that does not answer is declared dead."""
+    monitor, _, declare_dead = create_monitor(hass)
+    monitor.check(30)
+    monitor.heartbeat_written(30)
+    monitor.check(39)
+    declare_dead.assert_not_called()
+    monitor.check(40)
+    declare_dead.assert_called_once()
+    assert not monitor.connected
+    assert monitor.stats["detections"] == 1
+    assert monitor.stats["last_detect_time"] == 40
+    # the library reports the reconnection
+    monitor.connection_changed(True, 43)
+    assert monitor.stats["reconnects"] == 1
+    assert monitor.stats["last_recover_time"] == 3
+
+
+async def test_monitor_deadline_from_write(hass):
+    """Test that the deadline starts when the heartbeat is written."""
+    monitor, _, declare_dead = create_monitor(hass)
+    monitor.check(30)
+    monitor.heartbeat_written(35)
+    monitor.check(44)
+    declare_dead.assert_not_called()
+    monitor.check(45)
+    declare_dead.assert_called_once()
+
+
+async def test_monitor_heartbeat_not_written(hass):
+    """Test that a heartbeat that stays queued counts as written after an interval."""
+    monitor, _, declare_dead = create_monitor(hass)
+    monitor.check(30)
+    monitor.check(69)
+    declare_dead.assert_not_called()
+    monitor.check(70)
+    declare_dead.assert_called_once()
+
+
+async def test_monitor_nothing_to_query(hass):
+    """Test that a bridge without areas is not declared dead."""
+    monitor, send_heartbeat, declare_dead = create_monitor(hass, heartbeat=False)
+    for now in (30, 40, 50):
+        monitor.check(now)
+    assert send_heartbeat.call_count == 3
+    declare_dead.assert_not_called()
+
+
+async def test_monitor_off(hass):
+    """Test that a heartbeat interval of 0 turns the detection off."""
+    monitor, send_heartbeat, _ = create_monitor(hass)
+    monitor.configure({**CONFIG, "heartbeat": 0})
+    monitor.check(1000)
+    send_heartbeat.assert_not_called()
+
+
+async def test_monitor_timer(hass):
+    """Test that the checks only run while started, connected and turned on."""
+    monitor = ConnectionMonitor(
+        hass.loop, {**CONFIG, "heartbeat": 0}, Mock(return_value=True), Mock()
+    )
+    monitor.start()
+    assert monitor._timer is None
+    monitor.connection_changed(True, 0)
+    assert monitor._timer is None
+    monitor.configure(CONFIG)
+    assert monitor._timer is not None
+    monitor.connection_changed(False, 10)
+    assert monitor._timer is None
+    monitor.connection_changed(True, 20)
+    assert monitor._timer is not None
+    monitor.configure({**CONFIG, "heartbeat": 0})
+    assert monitor._timer is None
+    monitor.configure(CONFIG)
+    monitor.stop()
+    assert monitor._timer is None
+
+
+async def test_monitor_backoff(hass):
+    """Test that the waits to reconnect double up to the maximum, with jitter."""
+    monitor, _, _ = create_monitor(hass)
+    with patch("asyncio.sleep", new_callable=AsyncMock) as mock_sleep, patch(
+        "random.uniform", side_effect=lambda low, high: high
+    ) as mock_uniform:
+        await monitor.async_backoff()
+        mock_sleep.assert_not_called()
+        monitor.connection_changed(False, 100)
+        for _ in range(5):
+            await monitor.async_backoff()
+        assert [call.args for call in mock_uniform.mock_calls] == [
+            (0, 1.0),
+            (0, 2.0),
+            (0, 4.0),
+            (0, 8),
+            (0, 8),
+        ]
+        # a connection starts over
+        monitor.connection_changed(True, 110)
+        monitor.connection_changed(False, 120)
+        await monitor.async_backoff()
+        assert mock_uniform.mock_calls[-1].args == (0, 1.0)
+
+
+async def test_gateway_half_open(hass, enable_custom_integrations, gateway):
+    """Test that a gateway that goes silent is detected and reconnected."""
+    options = {**OPTIONS, "liveness": {"heartbeat": 0.2, "deadline": 0.2}}
+    # the heartbeat asks for the preset of the area
+    gateway.area(1).select_preset(1, 0)
+    bridge = await setup_gateway_entry(hass, gateway, options)
+    # the connection stays open but nothing gets through any more
+    gateway.packet_loss = 1.0
+    await async_wait_for(
+        lambda: hass.states.get("light.hall_lamp").state == STATE_UNAVAILABLE
+    )
+    assert bridge.monitor.detections == 1
+    assert bridge.monitor.last_detect_time >= 0.4
+    gateway.packet_loss = 0.0
+    await async_wait_for(lambda: bridge.monitor.reconnects == 1, 4)
+    await async_wait_for(
+        lambda: hass.states.get("light.hall_lamp").state != STATE_UNAVAILABLE
+    )
+    # the new connection answers the heartbeats
+    await async_wait_for(lambda: bridge.monitor.heartbeats >= 3)
+    assert bridge.monitor.detections == 1
+    assert gateway.clients == 1
+
+
+async def test_bridge_heartbeat_rotates(hass, enable_custom_integrations):
+    """Test that the heartbeat asks the areas for their preset in turn."""
+    bridge = await create_bridge_with_library(
+        hass, {"active": "off", "bus_budget": 0, "area": {"1": {}, "3": {}}}
+    )
+    devices = bridge.dynalite_devices
+    with patch.object(devices._dynalite, "request_area_preset") as mock_preset:
+        for _ in range(3):
+            assert bridge._send_heartbeat()
+    assert [mock_call.args[0] for mock_call in mock_preset.mock_calls] == [1, 3, 1]
+    entry = hass.config_entries.async_entries(DOMAIN)[0]
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    assert diagnostics["connection"]["heartbeats"] == 0
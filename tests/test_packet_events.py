@@ -0,0 +1,81 @@
+"""Test Dynalite packet event filter."""
+
+from unittest.mock import patch
+
+from custom_components.dynalite2.packet_events import PacketEventFilter
+
+PACKET_AREA_2 = [28, 2, 100, 98, 0, 0, 255, 15]
+PACKET_AREA_3 = [28, 3, 0, 96, 4, 5, 255, 109]
+DEVICE_PACKET = [92, 1, 2, 3, 4, 5, 6, 7]
+
+
+def test_default_forwards_all():
+    """Test that the default filter forwards every packet."""
+    packet_filter = PacketEventFilter()
+    for packet in [PACKET_AREA_2, PACKET_AREA_3, DEVICE_PACKET]:
+        assert packet_filter.forward(packet)
+    assert packet_filter.forwarded == 3
+    assert packet_filter.dropped == 0
+
+
+def test_disabled():
+    """Test that a disabled filter drops every packet."""
+    packet_filter = PacketEventFilter({"enabled": False})
+    assert not packet_filter.forward(PACKET_AREA_2)
+    assert packet_filter.forwarded == 0
+    assert packet_filter.dropped == 1
+
+
+def test_area_and_opcode():
+    """Test filtering by area and opcode."""
+    packet_filter = PacketEventFilter({"area": [2, 3]})
+    assert packet_filter.forward(PACKET_AREA_2)
+    assert packet_filter.forward(PACKET_AREA_3)
+    assert not packet_filter.forward(DEVICE_PACKET)
+    packet_filter = PacketEventFilter({"area": [2, 3], "opcode": [96]})
+    assert not packet_filter.forward(PACKET_AREA_2)
+    assert packet_filter.forward(PACKET_AREA_3)
+    assert packet_filter.forwarded == 1
+    assert packet_filter.dropped == 1
+
+
+def test_sample():
+    """Test that only one in every N packets is forwarded."""
+    packet_filter = PacketEventFilter({"sample": 3})
+    results = [packet_filter.forward(PACKET_AREA_2) for _ in range(9)]
+    assert results == [False, False, True] * 3
+
+
+def test_rate_limit():
+    """Test that the number of events per second is limited."""
+    packet_filter = PacketEventFilter({"rate_limit": 2})
+    with patch(
+        "custom_components.dynalite2.packet_events.time.monotonic", return_value=10.0
+    ):
+        results = [packet_filter.forward(PACKET_AREA_2) for _ in range(4)]
+    assert results == [True, True, False, False]
+    with patch(
+        "custom_components.dynalite2.packet_events.time.monotonic", return_value=11.5
+    ):
+        assert packet_filter.forward(PACKET_AREA_2)
+    assert packet_filter.forwarded == 3
+    assert packet_filter.dropped == 2
+
+
+def test_direction():
+    """Test that only received packets are forwarded unless sent ones are asked for."""
+    packet_filter = PacketEventFilter()
+    assert not packet_filter.wants("out")
+    assert not packet_filter.forward(PACKET_AREA_2, "out")
+    packet_filter = PacketEventFilter({"direction": ["out"]})
+    assert packet_filter.forward(PACKET_AREA_2, "out")
+    assert not packet_filter.forward(PACKET_AREA_2, "in")
+
+
+def test_configure_keeps_counters():
+    """Test that a new config applies to the same counters."""
+    packet_filter = PacketEventFilter()
+    packet_filter.forward(PACKET_AREA_2)
+    packet_filter.configure({"area": [3]})
+    assert not packet_filter.forward(PACKET_AREA_2)
+    assert packet_filter.stats == {"forwarded": 1, "dropped": 1}
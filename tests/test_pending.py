@@ -0,0 +1,57 @@
+"""Test the queue of devices that wait for their platform."""
+from unittest.mock import Mock
+
+from custom_components.dynalite2.pending import PendingDevices
+
+
+def create_devices(*unique_ids):
+    """Create mock devices with the unique_ids."""
+    devices = []
+    for unique_id in unique_ids:
+        device = Mock()
+        device.unique_id = unique_id
+        devices.append(device)
+    return devices
+
+
+def test_pending_dedupe_and_drain():
+    """Test that a device is queued once and the queue is emptied by a replay."""
+    pending = PendingDevices(10)
+    devices = create_devices("a", "b", "a")
+    new_devices = pending.new_devices(devices)
+    assert new_devices == devices[:2]
+    assert pending.new_devices(create_devices("b", "c"))[0].unique_id == "c"
+    pending.queue("light", new_devices)
+    pending.queue("light", new_devices[:1])
+    assert len(pending) == 2
+    assert pending.drain("switch") == []
+    assert pending.drain("light") == new_devices
+    assert pending.drain("light") == []
+    assert pending.stats == {
+        "pending": 0,
+        "queued": 2,
+        "replayed": 2,
+        "deduped": 3,
+        "dropped": 0,
+    }
+
+
+def test_pending_bounded():
+    """Test that the devices above the maximum are dropped."""
+    pending = PendingDevices(2)
+    pending.queue("light", pending.new_devices(create_devices("a", "b")))
+    pending.queue("switch", pending.new_devices(create_devices("c")))
+    assert len(pending) == 2
+    assert pending.dropped == 1
+    assert pending.drain("switch") == []
+    # a dropped device is added when the library reports it again
+    new_devices = pending.new_devices(create_devices("a", "c"))
+    assert [device.unique_id for device in new_devices] == ["c"]
+
+
+def test_pending_configured_not_bounded():
+    """Test that configured devices are kept above the maximum."""
+    pending = PendingDevices(1)
+    pending.queue("light", create_devices("a", "b"), bounded=False)
+    assert len(pending) == 2
+    assert pending.dropped == 0
@@ -0,0 +1,210 @@
+"""Test the adaptive polling of areas."""
+import time
+from unittest.mock import Mock, call, patch
+
+from dynalite_devices_lib.dynalite_devices import (
+    NOTIFICATION_PACKET,
+    DynaliteNotification,
+)
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.dynalite2.diagnostics import async_get_config_entry_diagnostics
+from custom_components.dynalite2.poller import AdaptivePoller, classify_packet
+
+from .common import DOMAIN, create_bridge_with_library
+
+CONFIG = {"min_interval": 10, "max_interval": 80, "budget": 10}
+
+
+def report_preset(area, preset):
+    """Return a packet that reports the preset of an area."""
+    return [0x1C, area, preset - 1, 0x62, 0, 0, 255, 0]
+
+
+def create_poller(areas, moving=None):
+    """Create a poller of some areas that sends a packet per poll."""
+    poll_area = Mock(return_value=1)
+    poller = AdaptivePoller(
+        CONFIG, lambda: areas, poll_area, moving or (lambda area: False)
+    )
+    poller.tick(0)
+    return poller, poll_area
+
+
+@pytest.mark.parametrize(
+    "packet, info",
+    [
+        (report_preset(2, 4), (2, "preset", 4, True)),
+        ([0x1C, 2, 1, 0x60, 10, 10, 255, 0], (2, ("channel", 2), 10, True)),
+        ([0x1C, 2, 0, 10, 0, 1, 255, 0], (2, "preset", 13, False)),
+        ([0x1C, 2, 100, 0x81, 0xFF, 0, 255, 0], (2, ("channel", 2), 100, False)),
+        ([0x1C, 2, 100, 0x80, 0, 0, 255, 0], (2, ("channel", 5), 100, False)),
+        ([0x1C, 2, 0xFF, 0x71, 1, 25, 255, 0], (2, None, None, False)),
+        ([0x1C, 2, 0, 0x63, 0, 0, 255, 0], None),
+        ([0x5C, 2, 0, 0x62, 0, 0, 255, 0], None),
+    ],
+)
+def test_classify_packet(packet, info):
+    """Test what the poller learns from packets."""
+    assert classify_packet(packet) == info
+
+
+def test_poller_backoff():
+    """Test that areas that do not change are polled less and less often."""
+    poller, poll_area = create_poller({1})
+    times = []
+    for now in range(0, 200):
+        poller.tick(now)
+        if len(poll_area.mock_calls) > len(times):
+            times.append(now)
+    assert times == [10, 20, 40, 80, 160]
+    assert poller.stats[1] == {
+        "interval": 80,
+        "polls": 5,
+        "changes": 0,
+        "change_ratio": 0.0,
+        "pushes": 0,
+        "commands": 0,
+    }
+
+
+def test_poller_change():
+    """Test that an area is polled at the minimum interval after a change."""
+    poller, poll_area = create_poller({1})
+    for now in (10, 20, 40):
+        poller.tick(now)
+        poller.handle_packet(report_preset(1, 1), now)
+    assert poller.stats[1]["interval"] == 40
+    poller.handle_packet(report_preset(1, 2), 41)
+    # a second change before the next poll counts once
+    poller.handle_packet(report_preset(1, 3), 42)
+    poller.tick(51)
+    assert len(poll_area.mock_calls) == 4
+    assert poller.stats[1]["interval"] == 10
+    assert poller.stats[1]["changes"] == 1
+    assert poller.stats[1]["change_ratio"] == 0.25
+
+
+def test_poller_push():
+    """Test that areas that report their own changes are polled rarely."""
+    poller, poll_area = create_poller({1})
+    poller.handle_packet([0x1C, 1, 0, 0, 0, 0, 255, 0], 5)
+    # commands from HA do not speed it up, the area will report them
+    poller.handle_sent([0x1C, 1, 100, 0x80, 0, 0, 255, 0], 6)
+    poller.tick(84)
+    poll_area.assert_not_called()
+    poller.tick(85)
+    poll_area.assert_called_once_with(1)
+    assert poller.stats[1]["pushes"] == 1
+    assert poller.stats[1]["commands"] == 1
+
+
+def test_poller_sent():
+    """Test that an area is polled soon after a command to it."""
+    poller, poll_area = create_poller({1})
+    for now in (10, 20, 40):
+        poller.tick(now)
+    poller.handle_sent([0x1C, 1, 100, 0x80, 0, 0, 255, 0], 45)
+    # queries are not commands
+    poller.handle_sent([0x1C, 1, 0, 0x63, 0, 0, 255, 0], 45)
+    poller.tick(55)
+    assert len(poll_area.mock_calls) == 4
+    assert poller.stats[1]["commands"] == 1
+
+
+def test_poller_moving():
+    """Test that an area with a moving cover is polled at the minimum interval."""
+    moving = {1: False}
+    poller, poll_area = create_poller({1}, moving.get)
+    for now in (10, 20, 40):
+        poller.tick(now)
+    moving[1] = True
+    poller.tick(41)
+    poller.tick(51)
+    assert len(poll_area.mock_calls) == 5
+    assert poller.stats[1]["interval"] == 10
+
+
+def test_poller_budget():
+    """Test that polls wait until the budget allows them."""
+    poll_area = Mock(return_value=2)
+    poller = AdaptivePoller(
+        {**CONFIG, "budget": 1}, lambda: {1, 2, 3}, poll_area, lambda area: False
+    )
+    poller.tick(0)
+    poller.tick(10)
+    assert poll_area.mock_calls == [call(1)]
+    poller.tick(11)
+    assert len(poll_area.mock_calls) == 1
+    poller.tick(12)
+    assert poll_area.mock_calls == [call(1), call(2)]
+
+
+def test_poller_configure():
+    """Test that new settings keep the intervals within the new limits."""
+    poller, _ = create_poller({1})
+    for now in (10, 20, 40, 80):
+        poller.tick(now)
+    poller.configure({**CONFIG, "max_interval": 20})
+    assert poller.stats[1]["interval"] == 20
+    poller.configure({**CONFIG, "enabled": False})
+    poller.tick(1000)
+    assert poller.stats[1]["polls"] == 4
+
+
+async def test_bridge_adaptive_poll(hass, enable_custom_integrations):
+    """Test that the bridge polls its areas and learns from the bus."""
+    options = {
+        "bus_budget": 0,
+        "active": "off",
+        "area": {"1": {"channel": {"1": {}, "2": {}}}},
+    }
+    bridge = await create_bridge_with_library(hass, options)
+    assert bridge.poller is None
+    assert bridge._poll_timer is None
+    bridge.reload_config(
+        {"host": bridge.host}, {**options, "adaptive_poll": {"budget": 10}}
+    )
+    assert bridge.poller is not None
+    assert bridge._poll_timer is not None
+    devices = bridge.dynalite_devices
+    now = time.monotonic()
+    bridge.handle_notification(
+        DynaliteNotification(
+            NOTIFICATION_PACKET, {NOTIFICATION_PACKET: report_preset(2, 1)}
+        )
+    )
+    with patch.object(devices, "request_area_preset") as mock_preset, patch.object(
+        devices, "request_channel_level"
+    ) as mock_level:
+        bridge.poller.tick(now)
+        bridge.poller.tick(now + 100)
+    assert mock_preset.mock_calls == [call(1, None), call(2, None)]
+    assert mock_level.mock_calls == [call(1, 1), call(1, 2)]
+    assert set(bridge.poller.stats) == {1, 2}
+    entry = hass.config_entries.async_entries(DOMAIN)[0]
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    assert diagnostics["poller"][1]["polls"] == 1
+    bridge.reload_config({"host": bridge.host}, options)
+    assert bridge._poll_timer is None
+
+
+async def test_bridge_poll_timer_failed_setup(hass, enable_custom_integrations):
+    """Test that a bridge that could not connect leaves no poll timer behind."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={"host": "1.2.3.4"},
+        options={"adaptive_poll": {}},
+        version=2,
+    )
+    entry.add_to_hass(hass)
+    with patch(
+        "custom_components.dynalite2.bridge.DynaliteDevices.async_setup",
+        return_value=False,
+    ), patch(
+        "custom_components.dynalite2.bridge.async_track_time_interval"
+    ) as mock_track:
+        assert not await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+    mock_track.assert_not_called()
@@ -0,0 +1,54 @@
+"""Test the packet replay harness."""
+
+import homeassistant.components.dynalite.const as dynalite
+from homeassistant.const import CONF_NAME
+
+from custom_components.dynalite2.capture import DIRECTION_IN, DIRECTION_OUT
+
+from .common import create_bridge_with_library
+from .replay import PacketReplay, evening_scenes, morning_all_on, packets_from_capture
+
+OPTIONS = {
+    dynalite.CONF_AREA: {
+        "1": {CONF_NAME: "Kitchen", dynalite.CONF_CHANNEL: {"1": {}, "2": {}}},
+        "2": {CONF_NAME: "Lounge", dynalite.CONF_CHANNEL: {"1": {}}},
+    }
+}
+
+
+async def test_replay_morning(hass, enable_custom_integrations):
+    """Test that a replay turns the real entities on and reports measurements."""
+    bridge = await create_bridge_with_library(hass, OPTIONS)
+    assert hass.states.get("light.kitchen_channel_1").state == "off"
+    packets = morning_all_on([1, 2], [1, 2])
+    result = await PacketReplay(hass, bridge).async_replay(packets)
+    assert hass.states.get("light.kitchen_channel_1").state == "on"
+    assert hass.states.get("light.kitchen_channel_2").attributes["brightness"] == 255
+    assert hass.states.get("light.lounge_channel_1").state == "on"
+    assert result["packets"] == len(packets)
+    assert result["packets_per_second"] > 0
+    assert result["state_writes"] > 0
+    assert result["latency_max"] >= result["latency_mean"] > 0
+
+
+async def test_replay_scaled(hass, enable_custom_integrations):
+    """Test a replay at scaled speed follows the timing."""
+    bridge = await create_bridge_with_library(hass, OPTIONS)
+    packets = evening_scenes([1, 2], [1, 4], rounds=2, interval=0.01)
+    result = await PacketReplay(hass, bridge).async_replay(packets, speed=2.0)
+    assert result["seconds"] >= 0.015
+    # the last scene recalled preset 1 in area 1 and preset 4 in area 2
+    assert hass.states.get("switch.kitchen_on").state == "on"
+    assert hass.states.get("switch.kitchen_off").state == "off"
+    assert hass.states.get("switch.lounge_off").state == "on"
+
+
+def test_packets_from_capture():
+    """Test that only received packets are replayed, relative to the first one."""
+    records = [
+        (100.0, DIRECTION_OUT, b"\x01"),
+        (101.0, DIRECTION_IN, b"\x02"),
+        (101.5, DIRECTION_IN, b"\x03"),
+    ]
+    assert packets_from_capture(records) == [(0.0, b"\x02"), (0.5, b"\x03")]
+    assert packets_from_capture([]) == []
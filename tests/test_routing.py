@@ -0,0 +1,66 @@
+"""Test the routing of service calls to the bridges."""
+from dynalite_devices_lib.dynalite_devices import (
+    NOTIFICATION_PACKET,
+    DynaliteNotification,
+)
+from homeassistant.components import dynalite
+
+from custom_components.dynalite2.const import DATA_ROUTER
+
+from .common import DOMAIN, create_bridge_with_library
+
+
+def area_options(*areas):
+    """Create options with some named areas."""
+    return {
+        dynalite.CONF_AREA: {str(area): {dynalite.CONF_NAME: "x"} for area in areas}
+    }
+
+
+async def test_router_areas(hass, enable_custom_integrations):
+    """Test that configured areas route to their bridges and unknown ones to all."""
+    bridge1 = await create_bridge_with_library(hass, area_options(1, 2), "1.2.3.4")
+    bridge2 = await create_bridge_with_library(hass, area_options(2, 3), "5.6.7.8")
+    router = hass.data[DATA_ROUTER]
+    assert router.bridges == [bridge1, bridge2]
+    assert router.bridges_for_area(1) == [bridge1]
+    assert router.bridges_for_area(2) == [bridge1, bridge2]
+    assert router.bridges_for_area(3) == [bridge2]
+    assert router.bridges_for_area(4) == [bridge1, bridge2]
+    assert router.bridges_for_host("5.6.7.8") == [bridge2]
+    assert router.bridges_for_host("9.9.9.9") == []
+
+
+async def test_router_discovered_area(hass, enable_custom_integrations):
+    """Test that an area seen on the bus routes to the bridge that saw it."""
+    bridge1 = await create_bridge_with_library(hass, area_options(1), "1.2.3.4")
+    bridge2 = await create_bridge_with_library(hass, area_options(2), "5.6.7.8")
+    router = hass.data[DATA_ROUTER]
+    packet = [0x1C, 9, 0, 0x00, 0, 0, 255, 0xE8]
+    bridge2.handle_notification(
+        DynaliteNotification(NOTIFICATION_PACKET, {NOTIFICATION_PACKET: packet})
+    )
+    assert bridge2.areas == {2, 9}
+    assert router.bridges_for_area(9) == [bridge2]
+    # packets that are not logical do not name an area
+    bridge1.handle_notification(
+        DynaliteNotification(NOTIFICATION_PACKET, {NOTIFICATION_PACKET: [5, 10]})
+    )
+    assert router.bridges_for_area(10) == [bridge1, bridge2]
+
+
+async def test_router_reload_and_unload(hass, enable_custom_integrations):
+    """Test that the index follows option changes and unloaded entries."""
+    bridge1 = await create_bridge_with_library(hass, area_options(1, 2), "1.2.3.4")
+    bridge2 = await create_bridge_with_library(hass, area_options(3), "5.6.7.8")
+    router = hass.data[DATA_ROUTER]
+    entry1, entry2 = hass.config_entries.async_entries(DOMAIN)
+    hass.config_entries.async_update_entry(entry1, options=area_options(1, 4))
+    await hass.async_block_till_done()
+    assert router.bridges_for_area(2) == [bridge1, bridge2]
+    assert router.bridges_for_area(4) == [bridge1]
+    assert await hass.config_entries.async_unload(entry2.entry_id)
+    await hass.async_block_till_done()
+    assert router.bridges == [bridge1]
+    assert router.bridges_for_area(3) == [bridge1]
+    assert bridge2.router is None
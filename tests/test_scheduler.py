@@ -0,0 +1,122 @@
+"""Test the scheduler of the commands sent to the bus."""
+import asyncio
+from unittest.mock import Mock, call, patch
+
+from custom_components.dynalite2.scheduler import (
+    LANE_INTERACTIVE,
+    LANE_POLL,
+    CommandScheduler,
+)
+
+from .common import create_bridge_with_library
+
+
+async def test_scheduler_unpaced(hass):
+    """Test that commands are sent right away without a budget."""
+    scheduler = CommandScheduler(hass.loop)
+    command = Mock()
+    scheduler.schedule(LANE_INTERACTIVE, 1, command, 1)
+    scheduler.schedule(LANE_INTERACTIVE, 1, command, 2)
+    assert command.mock_calls == [call(1), call(2)]
+    assert scheduler.depth == 0
+    assert scheduler.stats["sent"] == 2
+    assert scheduler.stats["coalesced"] == 0
+
+
+async def test_scheduler_coalesce_and_priority(hass):
+    """Test that waiting commands collapse and interactive ones go first."""
+    scheduler = CommandScheduler(hass.loop, budget=100)
+    command = Mock()
+    scheduler.schedule(LANE_POLL, "first", command, "first")
+    scheduler.schedule(LANE_POLL, "query", command, "query")
+    scheduler.schedule(LANE_INTERACTIVE, ("level", 1, 1), command, "level 1")
+    scheduler.schedule(LANE_INTERACTIVE, ("level", 2, 1), command, "area 2 level")
+    scheduler.schedule(LANE_INTERACTIVE, ("level", 1, 1), command, "level 2")
+    # only the first one was within the budget
+    assert command.mock_calls == [call("first")]
+    assert scheduler.stats["depth"] == {LANE_INTERACTIVE: 2, LANE_POLL: 1}
+    await asyncio.sleep(0.1)
+    # the replaced level keeps its place in front of the other area
+    assert command.mock_calls == [
+        call("first"),
+        call("level 2"),
+        call("area 2 level"),
+        call("query"),
+    ]
+    stats = scheduler.stats
+    assert stats["sent"] == 4
+    assert stats["coalesced"] == 1
+    assert stats["max_wait"] >= 0.02
+    assert stats["mean_wait"] > 0
+    waits = scheduler.sample_waits()
+    assert waits["max_wait"] == stats["max_wait"]
+    assert waits["mean_wait"] > 0
+    assert scheduler.sample_waits() == {"mean_wait": 0.0, "max_wait": 0.0}
+
+
+async def test_scheduler_coalesce_keeps_area_order(hass):
+    """Test that a replaced command is not sent before a later one of its area."""
+    scheduler = CommandScheduler(hass.loop, budget=100)
+    command = Mock()
+    scheduler.schedule(LANE_POLL, "first", command, "first")
+    scheduler.schedule(LANE_INTERACTIVE, ("set_channel_level", 1, 1), command, 0.2)
+    scheduler.schedule(LANE_INTERACTIVE, ("select_preset", 1), command, "preset")
+    scheduler.schedule(LANE_INTERACTIVE, ("set_channel_level", 1, 1), command, 0.8)
+    scheduler.schedule(LANE_INTERACTIVE, ("set_channel_level", 1, 1), command, 0.9)
+    await asyncio.sleep(0.1)
+    assert command.mock_calls == [call("first"), call("preset"), call(0.9)]
+    assert scheduler.stats["coalesced"] == 2
+
+
+async def test_scheduler_budget(hass):
+    """Test that commands are spread according to the budget."""
+    scheduler = CommandScheduler(hass.loop, budget=50)
+    sent = []
+    for area in range(5):
+        scheduler.schedule(
+            LANE_POLL, area, lambda: sent.append(hass.loop.time())
+        )
+    await asyncio.sleep(0.15)
+    assert len(sent) == 5
+    gaps = [later - earlier for earlier, later in zip(sent, sent[1:])]
+    assert min(gaps) >= 0.015
+
+
+async def test_scheduler_error_and_stop(hass):
+    """Test that a failing command does not stop the queue and stop drops it."""
+    scheduler = CommandScheduler(hass.loop, budget=20)
+    command = Mock(side_effect=[KeyError, None, None])
+    scheduler.schedule(LANE_POLL, 1, command, 1)
+    scheduler.schedule(LANE_POLL, 2, command, 2)
+    scheduler.schedule(LANE_POLL, 3, command, 3)
+    await asyncio.sleep(0.07)
+    assert command.mock_calls == [call(1), call(2)]
+    scheduler.stop()
+    assert scheduler.depth == 0
+    await asyncio.sleep(0.07)
+    assert command.call_count == 2
+
+
+async def test_bridge_schedules_commands(hass, enable_custom_integrations):
+    """Test that a slider drag on a channel reaches the bus as the last level."""
+    bridge = await create_bridge_with_library(
+        hass,
+        {
+            "bus_budget": 20,
+            "active": "off",
+            "area": {"1": {"channel": {"1": {}}, "preset": {"1": {}}}},
+        },
+    )
+    dynalite = bridge.dynalite_devices._dynalite
+    assert dynalite._message_delay == 0.05
+    with patch.object(dynalite, "set_channel_level") as mock_level, patch.object(
+        dynalite, "request_channel_level"
+    ) as mock_request:
+        bridge.dynalite_devices.request_channel_level(1, 1)
+        for level in (0.2, 0.4, 0.6, 0.8):
+            bridge.dynalite_devices.set_channel_level(1, 1, level, 0)
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.15)
+    assert mock_request.mock_calls == [call(1, 1)]
+    assert mock_level.mock_calls == [call(1, 1, 0.8, 0)]
+    assert bridge.scheduler.coalesced == 3
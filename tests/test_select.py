@@ -0,0 +1,103 @@
+"""Test Dynalite select."""
+from unittest.mock import patch
+
+from dynalite_devices_lib.const import EVENT_PRESET
+from dynalite_devices_lib.dynalite_devices import (
+    NOTIFICATION_PRESET,
+    DynaliteNotification,
+)
+from dynalite_devices_lib.event import DynetEvent
+from homeassistant.components import dynalite
+from homeassistant.const import ATTR_FRIENDLY_NAME, STATE_UNKNOWN
+
+from custom_components.dynalite2.const import CONF_BUS_BUDGET, CONF_PRESET_SELECT
+
+from .common import DOMAIN, create_bridge_with_library
+
+OPTIONS = {
+    CONF_PRESET_SELECT: True,
+    CONF_BUS_BUDGET: 0,
+    dynalite.CONF_AREA: {
+        "1": {
+            dynalite.CONF_NAME: "Hall",
+            dynalite.CONF_PRESET: {
+                "1": {dynalite.CONF_NAME: "On"},
+                "4": {dynalite.CONF_NAME: "Off"},
+            },
+        }
+    },
+}
+
+
+def preset_notification(area, preset):
+    """Create the notification of a preset selection."""
+    return DynaliteNotification(
+        NOTIFICATION_PRESET,
+        {dynalite.CONF_AREA: area, dynalite.CONF_PRESET: preset},
+    )
+
+
+async def test_select_setup(hass, enable_custom_integrations):
+    """Test that the presets of an area are one select and not switches."""
+    bridge = await create_bridge_with_library(hass, OPTIONS)
+    assert hass.states.async_entity_ids("switch") == []
+    entity_state = hass.states.get("select.hall_preset")
+    assert entity_state.attributes[ATTR_FRIENDLY_NAME] == "Hall Preset"
+    assert entity_state.attributes["options"] == ["On", "Off"]
+    assert entity_state.state == STATE_UNKNOWN
+    bridge.handle_notification(preset_notification(1, 4))
+    await hass.async_block_till_done()
+    assert hass.states.get("select.hall_preset").state == "Off"
+    # the notifications of other areas are ignored
+    bridge.handle_notification(preset_notification(2, 1))
+    await hass.async_block_till_done()
+    assert hass.states.get("select.hall_preset").state == "Off"
+
+
+async def test_select_option(hass, enable_custom_integrations):
+    """Test that selecting an option selects the preset."""
+    bridge = await create_bridge_with_library(hass, OPTIONS)
+    dynalite_lib = bridge.dynalite_devices._dynalite
+    with patch.object(dynalite_lib, "write") as mock_write:
+        await hass.services.async_call(
+            "select",
+            "select_option",
+            {"entity_id": "select.hall_preset", "option": "On"},
+            blocking=True,
+        )
+        await hass.async_block_till_done()
+    # preset 1 of area 1
+    assert mock_write.call_args[0][0].raw_msg[1:4] == [1, 0, 0]
+    assert hass.states.get("select.hall_preset").state == "On"
+
+
+async def test_select_discovered_preset(hass, enable_custom_integrations):
+    """Test that a preset seen on the bus becomes a new option."""
+    bridge = await create_bridge_with_library(
+        hass, {**OPTIONS, dynalite.CONF_AUTO_DISCOVER: True}
+    )
+    bridge.dynalite_devices.handle_event(
+        DynetEvent(
+            event_type=EVENT_PRESET,
+            data={dynalite.CONF_AREA: 1, dynalite.CONF_PRESET: 3},
+        )
+    )
+    await hass.async_block_till_done()
+    entity_state = hass.states.get("select.hall_preset")
+    assert entity_state.attributes["options"] == ["On", "Off", "Preset 3"]
+    assert entity_state.state == "Preset 3"
+
+
+async def test_select_option_changed(hass, enable_custom_integrations):
+    """Test that turning the select option on or off reloads the entry."""
+    await create_bridge_with_library(hass, OPTIONS)
+    entry = hass.config_entries.async_entries(DOMAIN)[0]
+    with patch(
+        "custom_components.dynalite2.bridge.DynaliteDevices.async_setup",
+        return_value=True,
+    ):
+        hass.config_entries.async_update_entry(
+            entry, options={**OPTIONS, CONF_PRESET_SELECT: False}
+        )
+        await hass.async_block_till_done()
+    assert hass.states.get("switch.hall_on")
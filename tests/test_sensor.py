@@ -0,0 +1,77 @@
+"""Test the performance counters of a bridge as sensors."""
+from datetime import timedelta
+
+from dynalite_devices_lib.dynalite_devices import (
+    NOTIFICATION_PACKET,
+    NOTIFICATION_PRESET,
+    DynaliteNotification,
+)
+from homeassistant.components import dynalite
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.dynalite2.const import CONF_DIAGNOSTIC_SENSORS
+from custom_components.dynalite2.counters import BridgeCounters
+
+from .common import create_bridge_with_library
+
+PACKET = [0x1C, 1, 0, 0x62, 0, 0, 255, 0]
+
+
+def test_counters_sample():
+    """Test the rates since the previous sample."""
+    counters = BridgeCounters(10)
+    counters.packets_in += 4
+    counters.bytes_in += 32
+    counters.bytes_out += 8
+    counters.presets += 2
+    rates = counters.sample(12)
+    assert rates["packets_in_rate"] == 2
+    assert rates["bytes_rate"] == 20
+    assert rates["presets_rate"] == 1
+    assert rates["packets_out_rate"] == 0
+    assert counters.sample(12)["packets_in_rate"] == 0
+
+
+async def test_sensors(hass, enable_custom_integrations):
+    """Test that the sensors are updated by the timer and not per packet."""
+    bridge = await create_bridge_with_library(hass, {CONF_DIAGNOSTIC_SENSORS: True})
+    assert hass.states.get("sensor.dynalite_1_2_3_4_packets_received").state == (
+        "unknown"
+    )
+    for _ in range(3):
+        bridge.handle_notification(
+            DynaliteNotification(NOTIFICATION_PACKET, {NOTIFICATION_PACKET: PACKET})
+        )
+    bridge.handle_notification(
+        DynaliteNotification(
+            NOTIFICATION_PRESET, {dynalite.CONF_AREA: 1, dynalite.CONF_PRESET: 1}
+        )
+    )
+    assert bridge.counters.packets_in == 3
+    assert bridge.counters.bytes_in == 24
+    assert bridge.counters.presets == 1
+    await hass.async_block_till_done()
+    assert hass.states.get("sensor.dynalite_1_2_3_4_packets_received").state == (
+        "unknown"
+    )
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=31))
+    await hass.async_block_till_done()
+    assert float(hass.states.get("sensor.dynalite_1_2_3_4_packets_received").state) > 0
+    assert hass.states.get("sensor.dynalite_1_2_3_4_command_queue_depth").state == "0"
+    assert hass.states.get("sensor.dynalite_1_2_3_4_reconnects").state == "0"
+    assert hass.states.get("sensor.dynalite_1_2_3_4_command_max_wait").state == "0.0"
+    state_classes = {
+        entity_id: hass.states.get(entity_id).attributes["state_class"]
+        for entity_id in hass.states.async_entity_ids("sensor")
+    }
+    assert state_classes.pop("sensor.dynalite_1_2_3_4_reconnects") == (
+        "total_increasing"
+    )
+    assert set(state_classes.values()) == {"measurement"}
+
+
+async def test_no_sensors(hass, enable_custom_integrations):
+    """Test that there are no sensors unless they are turned on."""
+    await create_bridge_with_library(hass)
+    assert len(hass.states.async_entity_ids("sensor")) == 0
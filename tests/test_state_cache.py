@@ -0,0 +1,97 @@
+"""Test the cache of the last known state of the devices."""
+from datetime import timedelta
+
+from dynalite_devices_lib import const as dyn_const
+from dynalite_devices_lib.event import DynetEvent
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.dynalite2.const import STATE_CACHE_STORAGE_KEY
+from custom_components.dynalite2.state_cache import level_to_byte
+
+from .common import DOMAIN, create_bridge_with_library
+from .gateway import async_wait_for
+
+KEY = f"{STATE_CACHE_STORAGE_KEY}.1.2.3.4.12345"
+OPTIONS = {
+    "active": "off",
+    "bus_budget": 0,
+    "area": {
+        "1": {"name": "Hall", "channel": {"1": {}, "3": {}}},
+        "2": {"name": "Blind", "template": "time_cover"},
+    },
+}
+
+
+def test_level_to_byte():
+    """Test the steps that levels are saved in."""
+    assert level_to_byte(0) == 0
+    assert level_to_byte(1) == 254
+    assert level_to_byte(127 / 254) == 127
+
+
+async def test_restore_state(hass, enable_custom_integrations, hass_storage):
+    """Test that the devices start from the saved state."""
+    hass_storage[KEY] = {
+        "version": 1,
+        "key": KEY,
+        "data": {
+            "levels": {"1": [127, None, 254], "9": [254]},
+            "presets": {"1": 4},
+            "covers": {"2": 0.5},
+        },
+    }
+    bridge = await create_bridge_with_library(hass, OPTIONS)
+    await async_wait_for(lambda: hass.states.get("light.hall_channel_1") is not None)
+    assert bridge.state_cache.restored == 4
+    assert hass.states.get("light.hall_channel_1").attributes["brightness"] == 127
+    assert hass.states.get("light.hall_channel_3").state == "on"
+    presets = bridge.dynalite_devices._added_presets[1]
+    assert presets[4].is_on
+    assert not presets[1].is_on
+    assert hass.states.get("cover.blind").attributes["current_position"] == 50
+
+
+async def test_save_state(hass, enable_custom_integrations, hass_storage):
+    """Test that the changes are saved together after a delay."""
+    bridge = await create_bridge_with_library(hass, OPTIONS)
+    devices = bridge.dynalite_devices
+    devices._added_channels[1][3].update_level(1.0, 1.0)
+    bridge.update_device(devices._added_channels[1][3])
+    devices.handle_event(
+        DynetEvent(
+            event_type=dyn_const.EVENT_PRESET,
+            data={dyn_const.CONF_AREA: 1, dyn_const.CONF_PRESET: 2},
+        )
+    )
+    await hass.async_block_till_done()
+    assert KEY not in hass_storage
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=11))
+    await hass.async_block_till_done()
+    assert hass_storage[KEY]["data"] == {
+        "levels": {"1": [0, None, 254]},
+        "presets": {"1": 2},
+        "covers": {},
+    }
+
+
+async def test_restore_preset_select(hass, enable_custom_integrations, hass_storage):
+    """Test that the select of an area starts from the saved preset."""
+    hass_storage[KEY] = {"version": 1, "key": KEY, "data": {"presets": {"1": 4}}}
+    options = {
+        **OPTIONS,
+        "preset_select": True,
+        "area": {"1": {"name": "Hall", "preset": {"4": {"name": "Off"}}}},
+    }
+    await create_bridge_with_library(hass, options)
+    assert hass.states.get("select.hall_preset").state == "Off"
+
+
+async def test_remove_entry(hass, enable_custom_integrations, hass_storage):
+    """Test that the saved state is removed with the entry."""
+    hass_storage[KEY] = {"version": 1, "key": KEY, "data": {"presets": {"1": 4}}}
+    await create_bridge_with_library(hass, OPTIONS)
+    entry = hass.config_entries.async_entries(DOMAIN)[0]
+    await hass.config_entries.async_remove(entry.entry_id)
+    await hass.async_block_till_done()
+    assert KEY not in hass_storage